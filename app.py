@@ -1,38 +1,192 @@
 from __future__ import annotations
 
+import asyncio
+import bisect
+import contextvars
+import copy
+import ctypes
+import ctypes.util
+import functools
+import gc
+import hashlib
+import heapq
+import http.client
+import http.server
+import importlib
 import json
 import logging
+import logging.handlers
+import multiprocessing
+import multiprocessing.connection
 import os
+import queue
+import random
+import re
+import select
 import shutil
+import sqlite3
+import struct
+import subprocess
+import sys
+import threading
 import time
 import urllib.error
+import urllib.parse
 import urllib.request
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Callable, NotRequired, TypedDict
+from types import ModuleType
+from typing import TYPE_CHECKING, Awaitable, Callable, Generator, Iterable, Iterator, NotRequired, TypedDict, TypeVar
 
-import whisper
 from dotenv import load_dotenv
-from foundry_local import FoundryLocalManager
-from openai import OpenAI
+
+_T = TypeVar("_T")
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+
+class _LazyModule:
+    # Stands in for a heavy module and imports it on first attribute access, so `import app` (and a scan of
+    # an empty inbox) does not pay for torch, Whisper, NumPy or the OpenAI / Foundry Local clients.
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __getattr__(self, attribute: str) -> object:
+        return getattr(importlib.import_module(self._name), attribute)
+
+
+np = _LazyModule("numpy")
+torch = _LazyModule("torch")
+whisper = _LazyModule("whisper")
+openai = _LazyModule("openai")
+foundry_local = _LazyModule("foundry_local")
+
+
+@functools.cache
+def _load_av() -> ModuleType | None:
+    # In-process decoding is optional; ffmpeg remains the fallback.
+    try:
+        return importlib.import_module("av")
+    except ImportError:  # pragma: no cover - depends on the environment
+        return None
 
 VOICE_INBOX_ENV = "V2A_VOICE_INBOX"
 VOICE_PROCESSED_ENV = "V2A_VOICE_PROCESSED"
 SCAN_INTERVAL_ENV = "V2A_SCAN_INTERVAL"
 CREATE_TODO_WEBHOOK_ENV = "V2A_CREATE_TODO_WEBHOOK_URL"
+CREATE_TODO_BATCH_WEBHOOK_ENV = "V2A_CREATE_TODO_BATCH_WEBHOOK_URL"
+WATCH_MODE_ENV = "V2A_WATCH_MODE"
+TRANSCRIBE_WORKERS_ENV = "V2A_TRANSCRIBE_WORKERS"
+INTENT_WORKERS_ENV = "V2A_INTENT_WORKERS"
+OUTPUT_WORKERS_ENV = "V2A_OUTPUT_WORKERS"
+ARCHIVE_WORKERS_ENV = "V2A_ARCHIVE_WORKERS"
+PIPELINE_QUEUE_SIZE_ENV = "V2A_PIPELINE_QUEUE_SIZE"
+TRANSCRIBE_BATCH_SIZE_ENV = "V2A_TRANSCRIBE_BATCH_SIZE"
+INTENT_BATCH_SIZE_ENV = "V2A_INTENT_BATCH_SIZE"
+INTENT_CONCURRENCY_ENV = "V2A_INTENT_CONCURRENCY"
+WHISPER_PROCESSES_ENV = "V2A_WHISPER_PROCESSES"
+CACHE_MAX_MB_ENV = "V2A_CACHE_MAX_MB"
+VAD_ENV = "V2A_VAD"
+VAD_THRESHOLD_DB_ENV = "V2A_VAD_THRESHOLD_DB"
+STREAM_MIN_SECONDS_ENV = "V2A_STREAM_MIN_SECONDS"
+TRANSCRIBE_BACKEND_ENV = "V2A_TRANSCRIBE_BACKEND"
+PREWARM_ENV = "V2A_PREWARM"
+PROMPT_WARMUP_ENV = "V2A_PROMPT_WARMUP"
+MODEL_IDLE_TIMEOUT_ENV = "V2A_MODEL_IDLE_TIMEOUT"
+METRICS_PORT_ENV = "V2A_METRICS_PORT"
+METRICS_HOST_ENV = "V2A_METRICS_HOST"
 
 DEFAULT_INBOX = ".voice-inbox"
 DEFAULT_PROCESSED = ".voice-processed"
 DEFAULT_WORK = ".work"
 DEFAULT_SCAN_INTERVAL_SECONDS = 30
+WATCH_MODES = ("auto", "inotify", "poll")
+DEFAULT_WATCH_MODE = "auto"
+DEFAULT_STAGE_WORKERS = 1
+DEFAULT_PIPELINE_QUEUE_SIZE = 4
+DEFAULT_TRANSCRIBE_BATCH_SIZE = 8
+DEFAULT_INTENT_BATCH_SIZE = 1
+DEFAULT_INTENT_CONCURRENCY = 4
+DEFAULT_WHISPER_PROCESSES = 0
+DEFAULT_CACHE_MAX_MB = 256
+CACHE_DIR_NAME = "cache"
+CACHE_HASH_CHUNK_BYTES = 1024 * 1024
 DEFAULT_MODEL = "base"
+DEFAULT_TRANSCRIBE_BACKEND = "whisper"
+CTRANSLATE2_COMPUTE_TYPE = "int8"
+DEFAULT_MODEL_IDLE_TIMEOUT_SECONDS = 900
+WHISPER_RESIDENCY_NAME = "whisper"
+INTENT_RESIDENCY_NAME = "intent-llm"
+DEFAULT_METRICS_HOST = "127.0.0.1"
+METRICS_PATH = "/metrics"
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; spans a fast local scan up to a multi-minute Whisper run on CPU.
+METRICS_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+AUDIO_DECODE_BUFFER_SECONDS = 60
+SAMPLE_RATE = 16000
+DEFAULT_VAD_THRESHOLD_DB = -45.0
+VAD_FRAME_MS = 30
+VAD_PADDING_MS = 300
+STREAM_WINDOW_SECONDS = 30
+STREAM_OVERLAP_SECONDS = 2
+STREAM_MAX_OVERLAP_WORDS = 12
+DEFAULT_STREAM_MIN_SECONDS = 120
 DEFAULT_INTENT_ALIAS = "qwen2.5-7b"
 INTENT_ALIAS_ENV = "V2A_INTENT_MODEL_ALIAS"
+INTENT_MODE_ENV = "V2A_INTENT_MODE"
+INTENT_FAST_PATH_ENV = "V2A_INTENT_FAST_PATH"
+INTENT_STREAM_ENV = "V2A_INTENT_STREAM"
+INTENT_CONSTRAINED_ENV = "V2A_INTENT_CONSTRAINED"
+INTENT_MODES = ("single", "multi-turn")
+DEFAULT_INTENT_MODE = "single"
+SYNTHETIC_CURRENT_DATE_CALL_ID = "call_current_date"
 INTENT_FILE_SUFFIX = "-intent.json"
 WEBHOOK_TIMEOUT_SECONDS = 10
+WEBHOOK_MAX_ATTEMPTS_ENV = "V2A_WEBHOOK_MAX_ATTEMPTS"
+WEBHOOK_CONCURRENCY_ENV = "V2A_WEBHOOK_CONCURRENCY"
+DEFAULT_WEBHOOK_WORKERS = 4
+DEFAULT_WEBHOOK_CONCURRENCY = 2
+DEFAULT_WEBHOOK_MAX_ATTEMPTS = 5
+DEFAULT_WEBHOOK_QUEUE_SIZE = 64
+WEBHOOK_RETRY_BASE_SECONDS = 1.0
+WEBHOOK_RETRY_MAX_SECONDS = 60.0
+WEBHOOK_OUTBOX_DIR_NAME = "outbox"
+WEBHOOK_BATCH_SIZE_ENV = "V2A_WEBHOOK_BATCH_SIZE"
+WEBHOOK_BATCH_WINDOW_ENV = "V2A_WEBHOOK_BATCH_WINDOW_MS"
+DEFAULT_WEBHOOK_BATCH_SIZE = 20
+DEFAULT_WEBHOOK_BATCH_WINDOW_MS = 2000
+INTENT_CLIENT_MAX_RETRIES = 1
 
 LOG_FILE_NAME = "voice-inbox.log"
+LOG_FORMAT_ENV = "V2A_LOG_FORMAT"
+LOG_MAX_MB_ENV = "V2A_LOG_MAX_MB"
+LOG_BACKUPS_ENV = "V2A_LOG_BACKUPS"
+LOG_FORMATS = ("text", "json")
+DEFAULT_LOG_FORMAT = "text"
+DEFAULT_LOG_MAX_MB = 10
+DEFAULT_LOG_BACKUPS = 5
+# Set per job by the pipeline and copied onto every record logged while handling it.
+LOG_CONTEXT_FIELDS = ("file", "stage", "correlation_id")
+JOURNAL_FILE_NAME = "jobs.sqlite3"
+JOURNAL_STAGES = ("transcribed", "intent_written", "webhook_queued", "archived")
+
+
+@dataclass(frozen=True)
+class PipelineSettings:
+    transcribe_workers: int = DEFAULT_STAGE_WORKERS
+    intent_workers: int = DEFAULT_STAGE_WORKERS
+    output_workers: int = DEFAULT_STAGE_WORKERS
+    archive_workers: int = DEFAULT_STAGE_WORKERS
+    queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE
+    transcribe_batch_size: int = DEFAULT_TRANSCRIBE_BATCH_SIZE
+    intent_batch_size: int = DEFAULT_INTENT_BATCH_SIZE
+    intent_concurrency: int = DEFAULT_INTENT_CONCURRENCY
 
 
 @dataclass(frozen=True)
@@ -41,6 +195,8 @@ class AppConfig:
     processed_dir: Path
     work_dir: Path
     scan_interval_seconds: int
+    watch_mode: str = DEFAULT_WATCH_MODE
+    pipeline: PipelineSettings = field(default_factory=PipelineSettings)
 
 
 def _project_root() -> Path:
@@ -68,6 +224,58 @@ def _parse_scan_interval(value: str | None) -> int:
     return parsed
 
 
+def _parse_positive_int(value: str | None, env_name: str, default: int) -> int:
+    if value is None or value.strip() == "":
+        return default
+    try:
+        parsed = int(value)
+    except ValueError as exc:
+        raise ValueError(f"{env_name} must be an integer") from exc
+    if parsed <= 0:
+        raise ValueError(f"{env_name} must be greater than zero")
+    return parsed
+
+
+def _parse_pipeline_settings(environ: dict[str, str]) -> PipelineSettings:
+    return PipelineSettings(
+        transcribe_workers=_parse_positive_int(
+            environ.get(TRANSCRIBE_WORKERS_ENV), TRANSCRIBE_WORKERS_ENV, DEFAULT_STAGE_WORKERS
+        ),
+        intent_workers=_parse_positive_int(
+            environ.get(INTENT_WORKERS_ENV), INTENT_WORKERS_ENV, DEFAULT_STAGE_WORKERS
+        ),
+        output_workers=_parse_positive_int(
+            environ.get(OUTPUT_WORKERS_ENV), OUTPUT_WORKERS_ENV, DEFAULT_STAGE_WORKERS
+        ),
+        archive_workers=_parse_positive_int(
+            environ.get(ARCHIVE_WORKERS_ENV), ARCHIVE_WORKERS_ENV, DEFAULT_STAGE_WORKERS
+        ),
+        queue_size=_parse_positive_int(
+            environ.get(PIPELINE_QUEUE_SIZE_ENV), PIPELINE_QUEUE_SIZE_ENV, DEFAULT_PIPELINE_QUEUE_SIZE
+        ),
+        transcribe_batch_size=_parse_positive_int(
+            environ.get(TRANSCRIBE_BATCH_SIZE_ENV),
+            TRANSCRIBE_BATCH_SIZE_ENV,
+            DEFAULT_TRANSCRIBE_BATCH_SIZE,
+        ),
+        intent_batch_size=_parse_positive_int(
+            environ.get(INTENT_BATCH_SIZE_ENV), INTENT_BATCH_SIZE_ENV, DEFAULT_INTENT_BATCH_SIZE
+        ),
+        intent_concurrency=_parse_positive_int(
+            environ.get(INTENT_CONCURRENCY_ENV), INTENT_CONCURRENCY_ENV, DEFAULT_INTENT_CONCURRENCY
+        ),
+    )
+
+
+def _parse_watch_mode(value: str | None) -> str:
+    if value is None or value.strip() == "":
+        return DEFAULT_WATCH_MODE
+    mode = value.strip().lower()
+    if mode not in WATCH_MODES:
+        raise ValueError(f"{WATCH_MODE_ENV} must be one of: {', '.join(WATCH_MODES)}")
+    return mode
+
+
 def load_config(root: Path | None = None, environ: dict[str, str] | None = None) -> AppConfig:
     root = root or _project_root()
     environ = environ or os.environ
@@ -75,11 +283,14 @@ def load_config(root: Path | None = None, environ: dict[str, str] | None = None)
     processed_dir = _resolve_path(environ.get(VOICE_PROCESSED_ENV), DEFAULT_PROCESSED, root)
     work_dir = _resolve_path(DEFAULT_WORK, DEFAULT_WORK, root)
     scan_interval = _parse_scan_interval(environ.get(SCAN_INTERVAL_ENV))
+    watch_mode = _parse_watch_mode(environ.get(WATCH_MODE_ENV))
     return AppConfig(
         inbox_dir=inbox_dir,
         processed_dir=processed_dir,
         work_dir=work_dir,
         scan_interval_seconds=scan_interval,
+        watch_mode=watch_mode,
+        pipeline=_parse_pipeline_settings(environ),
     )
 
 
@@ -89,28 +300,305 @@ def ensure_directories(config: AppConfig) -> None:
     config.work_dir.mkdir(parents=True, exist_ok=True)
 
 
-def setup_logging(work_dir: Path) -> logging.Logger:
+_log_context: contextvars.ContextVar[dict[str, str]] = contextvars.ContextVar("voice_inbox_log_context", default={})
+_log_listener: logging.handlers.QueueListener | None = None
+
+
+@contextmanager
+def log_context(**fields: str) -> Iterator[None]:
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class _LogContextFilter(logging.Filter):
+    # Runs in the logging thread, before the record is queued, so the job context is still current.
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class _LogQueueHandler(logging.handlers.QueueHandler):
+    # The stock `prepare` formats the record up front and clears `exc_info`, which leaves formatters on the
+    # listener thread nothing to render as a separate exception field. The queue never leaves the process,
+    # so only the message arguments are merged (they may change before the listener gets to them).
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonLogFormatter(logging.Formatter):
+    # One JSON object per line; job context and `extra={"duration": seconds}` become their own fields.
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, object] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for key in LOG_CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        duration = getattr(record, "duration", None)
+        if duration is not None:
+            entry["duration_ms"] = round(duration * 1000, 1)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def get_log_format(environ: dict[str, str] | None = None) -> str:
+    environ = environ or os.environ
+    value = environ.get(LOG_FORMAT_ENV, DEFAULT_LOG_FORMAT).strip().lower()
+    if value not in LOG_FORMATS:
+        raise ValueError(f"{LOG_FORMAT_ENV} must be one of: {', '.join(LOG_FORMATS)}")
+    return value
+
+
+def setup_logging(
+    work_dir: Path,
+    log_format: str = DEFAULT_LOG_FORMAT,
+    max_bytes: int = DEFAULT_LOG_MAX_MB * 1024 * 1024,
+    backup_count: int = DEFAULT_LOG_BACKUPS,
+) -> logging.Logger:
     work_dir.mkdir(parents=True, exist_ok=True)
     logger = logging.getLogger("voice_inbox")
     logger.setLevel(logging.INFO)
-    logger.handlers.clear()
+    stop_logging()
 
-    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    formatter: logging.Formatter = (
+        JsonLogFormatter() if log_format == "json" else logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    )
 
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
 
     log_file = work_dir / LOG_FILE_NAME
-    file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
     file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(formatter)
 
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # Processing threads only enqueue records; console and file I/O happen on the listener thread.
+    global _log_listener
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue()
+    queue_handler = _LogQueueHandler(log_queue)
+    queue_handler.addFilter(_LogContextFilter())
+    _log_listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler)
+    _log_listener.start()
+    logger.addHandler(queue_handler)
     return logger
 
 
+def flush_logging() -> None:
+    # Blocks until every record queued so far has been written.
+    if _log_listener is not None:
+        _log_listener.queue.join()
+
+
+def stop_logging() -> None:
+    global _log_listener
+    logger = logging.getLogger("voice_inbox")
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
+    logger.handlers.clear()
+
+
+METRIC_FAMILIES: dict[str, tuple[str, str]] = {
+    "voice_inbox_scan_seconds": ("histogram", "Time to list and check the inbox for new MP3 files."),
+    "voice_inbox_decode_seconds": ("histogram", "Time to decode one audio file to 16 kHz samples."),
+    "voice_inbox_whisper_seconds": ("histogram", "Time spent in Whisper inference per call."),
+    "voice_inbox_llm_request_seconds": ("histogram", "Total time per chat completion, streamed or not, by call."),
+    "voice_inbox_llm_time_to_first_token_seconds": (
+        "histogram",
+        "Time to the first token of streamed chat completions (including the warm-up), by call.",
+    ),
+    "voice_inbox_webhook_seconds": ("histogram", "Time per webhook POST, including failed attempts."),
+    "voice_inbox_move_seconds": ("histogram", "Time to move a processed MP3 into the processed folder."),
+    "voice_inbox_files_processed_total": ("counter", "MP3 files fully processed and archived."),
+    "voice_inbox_failures_total": ("counter", "Failures, by pipeline stage."),
+    "voice_inbox_retries_total": ("counter", "Retried operations, by stage."),
+    "voice_inbox_llm_stream_early_stops_total": ("counter", "Streamed completions closed once the tool call was done."),
+    "voice_inbox_llm_prompt_tokens_total": ("counter", "Prompt tokens sent to the LLM, by call."),
+    "voice_inbox_llm_cached_prompt_tokens_total": ("counter", "Prompt tokens reused from the server's prompt cache."),
+    "voice_inbox_intent_fast_path_total": ("counter", "Transcripts checked by the intent fast path, by result."),
+    "voice_inbox_intent_fast_path_saved_seconds_total": (
+        "counter",
+        "Estimated LLM time saved by fast-path hits, from the mean latency of misses.",
+    ),
+    "voice_inbox_vad_removed_seconds_total": ("counter", "Seconds of silence cut by the VAD before Whisper."),
+    "voice_inbox_vad_silent_files_total": ("counter", "Audio files or stream windows the VAD found silent."),
+    "voice_inbox_vad_saved_seconds_total": (
+        "counter",
+        "Estimated Whisper time saved by the VAD, from the measured inference cost per audio second.",
+    ),
+    "voice_inbox_queue_depth": ("gauge", "Items waiting in a pipeline queue, by stage."),
+    "voice_inbox_resident_memory_bytes": ("gauge", "Resident set size of the scanner process."),
+    "voice_inbox_model_resident": ("gauge", "1 while a model is loaded, by model."),
+}
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label_value(value)}"' for key, value in labels) + "}"
+
+
+def _format_metric_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    # In-process counters, gauges and latency histograms, rendered in the Prometheus text format. Recording is
+    # a dict update under one lock, so it stays on even when no metrics endpoint is running.
+    def __init__(self, buckets: tuple[float, ...] = METRICS_LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+        self._gauges: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+        self._histograms: dict[tuple[str, tuple[tuple[str, str], ...]], list[float]] = {}
+        self._gauge_callbacks: list[tuple[str, Callable[[], dict[tuple[tuple[str, str], ...], float]]]] = []
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def gauge_callback(self, name: str, callback: Callable[[], dict[tuple[tuple[str, str], ...], float]]) -> None:
+        # `callback` returns {labels: value} and is evaluated on every scrape.
+        with self._lock:
+            self._gauge_callbacks.append((name, callback))
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            # Per-bucket counts followed by sum and count; made cumulative when rendered.
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0.0] * (len(self.buckets) + 3)
+            series[bisect.bisect_left(self.buckets, seconds)] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, name: str, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def sample(self, name: str, **labels: str) -> float:
+        # Counter or gauge value, or a histogram's observation count; 0 when never recorded.
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key in self._histograms:
+                return self._histograms[key][-1]
+            return self._counters.get(key, self._gauges.get(key, 0))
+
+    def render(self) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {key: list(series) for key, series in self._histograms.items()}
+            callbacks = list(self._gauge_callbacks)
+        for name, callback in callbacks:
+            try:
+                values = callback()
+            except Exception:  # pragma: no cover - a broken callback must not break the scrape
+                continue
+            for labels, value in values.items():
+                gauges[(name, labels)] = value
+
+        lines: list[str] = []
+        for name, (kind, help_text) in METRIC_FAMILIES.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                for (series_name, labels), series in sorted(histograms.items()):
+                    if series_name != name:
+                        continue
+                    cumulative = 0.0
+                    for bound, count in zip((*self.buckets, float("inf")), series):
+                        cumulative += count
+                        bucket_labels = (*labels, ("le", _format_metric_value(bound)))
+                        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {_format_metric_value(cumulative)}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_metric_value(series[-2])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {_format_metric_value(series[-1])}")
+                continue
+            values = counters if kind == "counter" else gauges
+            for (series_name, labels), value in sorted(values.items()):
+                if series_name == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_metric_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+def get_metrics_address(environ: dict[str, str] | None = None) -> tuple[str, int] | None:
+    environ = environ or os.environ
+    value = environ.get(METRICS_PORT_ENV)
+    if value is None or value.strip() == "":
+        return None
+    try:
+        port = int(value)
+    except ValueError as exc:
+        raise ValueError(f"{METRICS_PORT_ENV} must be an integer") from exc
+    if not 0 < port < 65536:
+        raise ValueError(f"{METRICS_PORT_ENV} must be between 1 and 65535")
+    host = environ.get(METRICS_HOST_ENV, "").strip() or DEFAULT_METRICS_HOST
+    return host, port
+
+
+def start_metrics_server(
+    address: tuple[str, int],
+    registry: MetricsRegistry = METRICS,
+) -> http.server.ThreadingHTTPServer:
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming
+            if urllib.parse.urlsplit(self.path).path != METRICS_PATH:
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            return
+
+    server = http.server.ThreadingHTTPServer(address, Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
 class IntentPayload(TypedDict):
     intent: str
     content: str
@@ -126,9 +614,19 @@ def build_intent_filename(created_at: datetime) -> str:
 def write_intent_output(work_dir: Path, payload: IntentPayload) -> Path:
     work_dir.mkdir(parents=True, exist_ok=True)
     filename = build_intent_filename(datetime.now(timezone.utc))
+    content = json.dumps(payload, ensure_ascii=False, indent=2)
     output_path = work_dir / filename
-    output_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    return output_path
+    # Several notes can finish within the same second; never overwrite an earlier intent file.
+    stem = filename[: -len(INTENT_FILE_SUFFIX)]
+    counter = 1
+    while True:
+        try:
+            with output_path.open("x", encoding="utf-8") as handle:
+                handle.write(content)
+            return output_path
+        except FileExistsError:
+            counter += 1
+            output_path = work_dir / f"{stem}-{counter}{INTENT_FILE_SUFFIX}"
 
 
 def _intent_timestamp(intent_path: Path) -> str:
@@ -147,19 +645,27 @@ def build_processed_destination(
     return processed_dir / f"{timestamp}-{original_name}"
 
 
-def get_create_todo_webhook_url(environ: dict[str, str] | None = None) -> str | None:
-    environ = environ or os.environ
-    raw_value = environ.get(CREATE_TODO_WEBHOOK_ENV)
+def _parse_webhook_url(raw_value: str | None, env_name: str) -> str | None:
     if raw_value is None:
         return None
     value = raw_value.strip()
     if value == "":
         return None
     if not (value.startswith("http://") or value.startswith("https://")):
-        raise ValueError(f"{CREATE_TODO_WEBHOOK_ENV} must start with http:// or https://")
+        raise ValueError(f"{env_name} must start with http:// or https://")
     return value
 
 
+def get_create_todo_webhook_url(environ: dict[str, str] | None = None) -> str | None:
+    environ = environ or os.environ
+    return _parse_webhook_url(environ.get(CREATE_TODO_WEBHOOK_ENV), CREATE_TODO_WEBHOOK_ENV)
+
+
+def get_create_todo_batch_webhook_url(environ: dict[str, str] | None = None) -> str | None:
+    environ = environ or os.environ
+    return _parse_webhook_url(environ.get(CREATE_TODO_BATCH_WEBHOOK_ENV), CREATE_TODO_BATCH_WEBHOOK_ENV)
+
+
 def build_create_todo_payload(intent_payload: IntentPayload) -> dict[str, str]:
     payload: dict[str, str] = {"title": intent_payload["content"]}
     if "due" in intent_payload:
@@ -184,7 +690,9 @@ def send_create_todo_webhook(
         headers={"Content-Type": "application/json"},
     )
     try:
-        with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
+        with METRICS.time("voice_inbox_webhook_seconds"), urllib.request.urlopen(
+            request, timeout=timeout_seconds
+        ) as response:
             status = response.status
     except urllib.error.HTTPError as exc:
         if exc.code == 400:
@@ -205,6 +713,379 @@ def send_create_todo_webhook(
     return False
 
 
+@dataclass(order=True)
+class _OutboxItem:
+    due_at: float
+    delivery_id: str = field(compare=False)
+    url: str = field(compare=False)
+    payload: dict[str, str] | list[dict[str, str]] = field(compare=False)
+    source: str = field(compare=False, default="")
+    attempts: int = field(compare=False, default=0)
+    # Set on batch requests only: the single-item outbox records that were coalesced into `payload`.
+    members: list[_OutboxItem] = field(compare=False, default_factory=list)
+
+
+def _endpoint_key(url: str) -> tuple[str, str, int]:
+    parts = urllib.parse.urlsplit(url)
+    default_port = 443 if parts.scheme == "https" else 80
+    return parts.scheme, parts.hostname or "", parts.port or default_port
+
+
+def webhook_retry_delay(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    # Exponential backoff with "equal jitter": half fixed, half random.
+    ceiling = min(max_seconds, base_seconds * 2 ** max(attempt - 1, 0))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def _is_retryable_webhook_status(status: int) -> bool:
+    # Status 0 stands for a connection error.
+    return status == 0 or status >= 500 or status in (408, 429)
+
+
+def parse_batch_webhook_results(response_body: bytes, item_count: int, status: int) -> list[tuple[int, str]]:
+    # The batch endpoint answers with one `{"status": <int>, "error": <str>}` object per submitted item,
+    # in submission order. Without such a list the HTTP status applies to every item.
+    try:
+        results = json.loads(response_body) if response_body.strip() else None
+    except json.JSONDecodeError:
+        results = None
+    if not isinstance(results, list) or len(results) != item_count:
+        return [(status, "")] * item_count
+    parsed: list[tuple[int, str]] = []
+    for result in results:
+        if not isinstance(result, dict):
+            parsed.append((status, ""))
+            continue
+        item_status = result.get("status", status)
+        parsed.append(
+            (
+                item_status if isinstance(item_status, int) else status,
+                str(result.get("error", "")),
+            )
+        )
+    return parsed
+
+
+class WebhookDelivery:
+    # Delivers webhook payloads off the processing thread. Every payload is written to the on-disk
+    # outbox before it is queued, so undelivered payloads are picked up again after a restart.
+    # With a batch URL, payloads are coalesced for up to `batch_window_seconds` or `batch_size` items
+    # and posted as one JSON array; each payload keeps its own outbox record until its item result is known.
+    def __init__(
+        self,
+        outbox_dir: Path,
+        logger: logging.Logger,
+        workers: int = DEFAULT_WEBHOOK_WORKERS,
+        per_endpoint_concurrency: int = DEFAULT_WEBHOOK_CONCURRENCY,
+        max_attempts: int = DEFAULT_WEBHOOK_MAX_ATTEMPTS,
+        queue_size: int = DEFAULT_WEBHOOK_QUEUE_SIZE,
+        retry_base_seconds: float = WEBHOOK_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = WEBHOOK_RETRY_MAX_SECONDS,
+        timeout_seconds: int = WEBHOOK_TIMEOUT_SECONDS,
+        batch_url: str | None = None,
+        batch_size: int = DEFAULT_WEBHOOK_BATCH_SIZE,
+        batch_window_seconds: float = DEFAULT_WEBHOOK_BATCH_WINDOW_MS / 1000,
+    ) -> None:
+        self.outbox_dir = outbox_dir
+        self.failed_dir = outbox_dir / "failed"
+        self.corrupt_dir = outbox_dir / "corrupt"
+        self.failed_dir.mkdir(parents=True, exist_ok=True)
+        self._logger = logger
+        self._per_endpoint_concurrency = per_endpoint_concurrency
+        self._max_attempts = max_attempts
+        self._retry_base_seconds = retry_base_seconds
+        self._retry_max_seconds = retry_max_seconds
+        self._timeout_seconds = timeout_seconds
+        self._batch_url = batch_url
+        self._batch_size = batch_size
+        self._batch_window_seconds = batch_window_seconds
+        self._batch: list[_OutboxItem] = []
+        self._batch_deadline: float | None = None
+        self._queue: queue.Queue[_OutboxItem | None] = queue.Queue(maxsize=queue_size)
+        self._retry_heap: list[_OutboxItem] = []
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+        self._endpoint_slots: dict[tuple[str, str, int], threading.BoundedSemaphore] = {}
+        self._idle_connections: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self._threads = [
+            threading.Thread(target=self._work, name=f"webhook-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        self._threads.append(threading.Thread(target=self._schedule_retries, name="webhook-retry", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        self._recover_outbox()
+
+    def _outbox_path(self, delivery_id: str) -> Path:
+        return self.outbox_dir / f"{delivery_id}.json"
+
+    def _persist(self, item: _OutboxItem) -> None:
+        record = {
+            "url": item.url,
+            "payload": item.payload,
+            "source": item.source,
+            "attempts": item.attempts,
+        }
+        temp_path = self._outbox_path(item.delivery_id).with_suffix(".tmp")
+        temp_path.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+        os.replace(temp_path, self._outbox_path(item.delivery_id))
+
+    def _recover_outbox(self) -> None:
+        # A crash inside `_persist` can leave a temp file behind; its record was never queued.
+        for path in self.outbox_dir.glob("*.tmp"):
+            self._logger.warning("Removing incomplete webhook outbox file %s", path.name)
+            path.unlink(missing_ok=True)
+        for path in sorted(self.outbox_dir.glob("*.json")):
+            try:
+                record = json.loads(path.read_text(encoding="utf-8"))
+                item = _OutboxItem(
+                    due_at=0.0,
+                    delivery_id=path.stem,
+                    url=record["url"],
+                    payload=record["payload"],
+                    source=record.get("source", ""),
+                    attempts=record.get("attempts", 0),
+                )
+            except (json.JSONDecodeError, KeyError, TypeError, OSError) as exc:
+                # One unreadable record must not keep the service from starting; keep it for inspection.
+                self._logger.error("Unreadable webhook outbox file %s: %s", path.name, exc)
+                METRICS.increment("voice_inbox_failures_total", stage="webhook")
+                self.corrupt_dir.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.replace(path, self.corrupt_dir / path.name)
+                except OSError as move_exc:
+                    self._logger.error("Failed to move %s aside: %s", path.name, move_exc)
+                continue
+            self._logger.info("Re-queueing undelivered webhook %s", path.stem)
+            self._enqueue(item)
+
+    def _enqueue(self, item: _OutboxItem) -> None:
+        if self._batch_url is not None:
+            self._add_to_batch(item)
+            return
+        with self._condition:
+            self._in_flight += 1
+        self._queue.put(item)
+
+    def _add_to_batch(self, item: _OutboxItem) -> None:
+        with self._condition:
+            self._in_flight += 1
+            self._batch.append(item)
+            if self._batch_deadline is None:
+                self._batch_deadline = time.monotonic() + self._batch_window_seconds
+                self._condition.notify_all()
+            ready = self._take_batch() if len(self._batch) >= self._batch_size else None
+        if ready is not None:
+            self._queue.put(ready)
+
+    def _take_batch(self) -> _OutboxItem | None:
+        # Caller holds `self._condition`.
+        if not self._batch:
+            return None
+        members, self._batch = self._batch[: self._batch_size], self._batch[self._batch_size :]
+        self._batch_deadline = time.monotonic() + self._batch_window_seconds if self._batch else None
+        return self._batch_item(members)
+
+    def _batch_item(self, members: list[_OutboxItem]) -> _OutboxItem:
+        return _OutboxItem(
+            due_at=0.0,
+            delivery_id=f"batch-{members[0].delivery_id}",
+            url=self._batch_url or members[0].url,
+            payload=[member.payload for member in members],
+            source=", ".join(member.source or member.delivery_id for member in members),
+            members=members,
+        )
+
+    def submit(self, url: str, payload: dict[str, str], source: str = "", delivery_id: str | None = None) -> str:
+        # A caller-chosen `delivery_id` makes resubmitting idempotent: a record still in the outbox was
+        # re-queued by `_recover_outbox` and is not queued a second time.
+        if delivery_id is not None and self._outbox_path(delivery_id).exists():
+            self._logger.info("Webhook for %s is already queued", source or delivery_id)
+            return delivery_id
+        delivery_id = delivery_id or f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+        item = _OutboxItem(due_at=0.0, delivery_id=delivery_id, url=url, payload=payload, source=source)
+        self._persist(item)
+        self._enqueue(item)
+        return delivery_id
+
+    def pending(self) -> int:
+        with self._condition:
+            return self._in_flight
+
+    def flush(self, timeout_seconds: float | None = None) -> bool:
+        with self._condition:
+            ready = self._take_batch()
+        while ready is not None:
+            self._queue.put(ready)
+            with self._condition:
+                ready = self._take_batch()
+        with self._condition:
+            return self._condition.wait_for(lambda: self._in_flight == 0, timeout=timeout_seconds)
+
+    def close(self) -> None:
+        # Undelivered payloads stay in the outbox for the next start.
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for _ in range(len(self._threads) - 1):
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=self._timeout_seconds + 1)
+        for connections in self._idle_connections.values():
+            for connection in connections:
+                connection.close()
+
+    def _finish(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _slot(self, endpoint: tuple[str, str, int]) -> threading.BoundedSemaphore:
+        with self._condition:
+            if endpoint not in self._endpoint_slots:
+                self._endpoint_slots[endpoint] = threading.BoundedSemaphore(self._per_endpoint_concurrency)
+            return self._endpoint_slots[endpoint]
+
+    def _checkout(self, endpoint: tuple[str, str, int]) -> http.client.HTTPConnection:
+        with self._condition:
+            idle = self._idle_connections.get(endpoint)
+            if idle:
+                return idle.pop()
+        scheme, host, port = endpoint
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return connection_class(host, port, timeout=self._timeout_seconds)
+
+    def _checkin(self, endpoint: tuple[str, str, int], connection: http.client.HTTPConnection) -> None:
+        with self._condition:
+            self._idle_connections.setdefault(endpoint, []).append(connection)
+
+    def _post(self, item: _OutboxItem) -> tuple[int, bytes]:
+        endpoint = _endpoint_key(item.url)
+        parts = urllib.parse.urlsplit(item.url)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        body = json.dumps(item.payload).encode("utf-8")
+        # A pooled connection may have been closed by the server while idle; retry once on a fresh one.
+        for reuse_attempt in range(2):
+            connection = self._checkout(endpoint)
+            try:
+                connection.request("POST", target, body=body, headers={"Content-Type": "application/json"})
+                response = connection.getresponse()
+                response_body = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if reuse_attempt == 1:
+                    raise
+                continue
+            if response.will_close:
+                connection.close()
+            else:
+                self._checkin(endpoint, connection)
+            return response.status, response_body
+        raise http.client.HTTPException("unreachable")
+
+    def _deliver(self, item: _OutboxItem) -> None:
+        members = item.members or [item]
+        for member in members:
+            member.attempts += 1
+        endpoint = _endpoint_key(item.url)
+        with self._slot(endpoint), METRICS.time("voice_inbox_webhook_seconds"):
+            try:
+                status, response_body = self._post(item)
+                error = None
+            except (http.client.HTTPException, OSError) as exc:
+                status, response_body, error = 0, b"", exc
+        if error is not None:
+            self._logger.error("Webhook call failed: %s", error)
+        elif not 200 <= status < 300:
+            if status == 400:
+                self._logger.error("Webhook request payload: %s", json.dumps(item.payload))
+                self._logger.error(
+                    "Webhook response payload: %s", response_body.decode("utf-8", errors="replace")
+                )
+            self._logger.error("Webhook call failed with HTTP %s", status)
+
+        if item.members and 200 <= status < 300:
+            results = parse_batch_webhook_results(response_body, len(members), status)
+        else:
+            results = [(status, "")] * len(members)
+        retry: list[_OutboxItem] = []
+        for member, (member_status, member_error) in zip(members, results):
+            label = member.source or member.delivery_id
+            if 200 <= member_status < 300:
+                self._logger.info("Webhook delivered with status %s (%s)", member_status, label)
+                self._outbox_path(member.delivery_id).unlink(missing_ok=True)
+                self._finish()
+                continue
+            if item.members and 200 <= status < 300:
+                # The batch request went through but this item was rejected.
+                self._logger.error(
+                    "Webhook batch item for %s failed with HTTP %s: %s", label, member_status, member_error
+                )
+                if member_status == 400:
+                    self._logger.error("Webhook request payload: %s", json.dumps(member.payload))
+            if _is_retryable_webhook_status(member_status) and member.attempts < self._max_attempts:
+                self._persist(member)
+                retry.append(member)
+                METRICS.increment("voice_inbox_retries_total", stage="webhook")
+                continue
+            self._logger.error("Giving up on webhook for %s after %s attempts", label, member.attempts)
+            METRICS.increment("voice_inbox_failures_total", stage="webhook")
+            os.replace(self._outbox_path(member.delivery_id), self.failed_dir / f"{member.delivery_id}.json")
+            self._finish()
+        if not retry:
+            return
+        retry_item = self._batch_item(retry) if item.members else item
+        attempts = max(member.attempts for member in retry)
+        delay = webhook_retry_delay(attempts, self._retry_base_seconds, self._retry_max_seconds)
+        self._logger.warning(
+            "Retrying webhook for %s in %.1fs (attempt %s of %s)",
+            retry_item.source or retry_item.delivery_id,
+            delay,
+            attempts + 1,
+            self._max_attempts,
+        )
+        retry_item.due_at = time.monotonic() + delay
+        with self._condition:
+            heapq.heappush(self._retry_heap, retry_item)
+            self._condition.notify_all()
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._deliver(item)
+
+    def _next_wakeup(self) -> float | None:
+        # Caller holds `self._condition`.
+        deadlines = [self._retry_heap[0].due_at] if self._retry_heap else []
+        if self._batch_deadline is not None:
+            deadlines.append(self._batch_deadline)
+        return min(deadlines) if deadlines else None
+
+    def _schedule_retries(self) -> None:
+        # Also closes the batch window: a partial batch is sent once its window has elapsed.
+        while True:
+            with self._condition:
+                while not self._closed:
+                    wakeup = self._next_wakeup()
+                    if wakeup is not None and wakeup <= time.monotonic():
+                        break
+                    self._condition.wait(timeout=None if wakeup is None else wakeup - time.monotonic())
+                if self._closed:
+                    return
+                now = time.monotonic()
+                if self._retry_heap and self._retry_heap[0].due_at <= now:
+                    item = heapq.heappop(self._retry_heap)
+                else:
+                    item = self._take_batch()
+            if item is not None:
+                self._queue.put(item)
+
+
 def _intent_tool_schema() -> dict:
     return {
         "type": "function",
@@ -220,6 +1101,7 @@ def _intent_tool_schema() -> dict:
                     },
                     "content": {
                         "type": "string",
+                        "pattern": "\\S",
                     },
                     "due": {
                         "type": "string",
@@ -239,13 +1121,138 @@ def _intent_tool_schema() -> dict:
     }
 
 
-def _intent_messages(transcript: str) -> list[dict[str, str]]:
-    now = datetime.now(timezone.utc)
-    today = now.date().isoformat()
-    year = now.year
-    tomorrow = (now.date() + timedelta(days=1)).isoformat()
+def _batch_intent_tool_schema() -> dict:
+    # `emit_intent` for several transcripts at once: one item per transcript, tagged with its id.
+    parameters = _intent_tool_schema()["function"]["parameters"]
+    item = {
+        **parameters,
+        "properties": {"id": {"type": "string"}, **parameters["properties"]},
+        "required": ["id", *parameters["required"]],
+    }
+    return {
+        "type": "function",
+        "function": {
+            "name": "emit_intents",
+            "description": "Return one intent payload per transcript, tagged with the transcript id.",
+            "parameters": {
+                "type": "object",
+                "properties": {"items": {"type": "array", "items": item}},
+                "required": ["items"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def _strict_parameters(schema: dict) -> dict:
+    # Strict (grammar-constrained) tool calls need every property listed as required; optional ones become
+    # nullable instead, and the repair step drops the nulls again.
+    if schema.get("type") == "array":
+        return {**schema, "items": _strict_parameters(schema["items"])}
+    if schema.get("type") != "object":
+        return schema
+    required = set(schema.get("required", ()))
+    properties = {}
+    for name, spec in schema["properties"].items():
+        spec = _strict_parameters(spec)
+        properties[name] = spec if name in required else {**spec, "type": [spec["type"], "null"]}
+    return {**schema, "properties": properties, "required": list(properties), "additionalProperties": False}
+
+
+def _strict_tool_schema(tool: dict) -> dict:
+    function = tool["function"]
+    return {**tool, "function": {**function, "strict": True, "parameters": _strict_parameters(function["parameters"])}}
+
+
+def _intent_tools(constrained: bool = False) -> list[dict]:
+    emit_intent = _strict_tool_schema(_intent_tool_schema()) if constrained else _intent_tool_schema()
+    return [emit_intent, _current_date_tool_schema()]
+
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def _repair_timestamp(value: str) -> str:
+    # Date-only values get the 06:00 UTC default the prompt asks for; other offsets are converted to UTC.
+    text = value.strip().removeprefix("T")
+    if _ISO_DATE.match(text):
+        return f"{text}T06:00:00Z"
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class IntentPayloadValidator:
+    # Compiled once from the `emit_intent` parameters: enums become sets and patterns pre-compiled regexes, so a
+    # check costs microseconds rather than another LLM turn.
+    def __init__(self, parameters: dict) -> None:
+        self._required = tuple(parameters.get("required", ()))
+        self._closed = parameters.get("additionalProperties") is False
+        self._fields = {
+            name: (
+                spec.get("type"),
+                frozenset(spec["enum"]) if "enum" in spec else None,
+                re.compile(spec["pattern"]) if "pattern" in spec else None,
+            )
+            for name, spec in parameters["properties"].items()
+        }
+
+    def errors(self, payload: object) -> list[str]:
+        if not isinstance(payload, dict):
+            return ["arguments must be a JSON object"]
+        errors = [f"`{name}` is required" for name in self._required if name not in payload]
+        for name, value in payload.items():
+            if name not in self._fields:
+                if self._closed:
+                    errors.append(f"`{name}` is not allowed")
+                continue
+            kind, enum, pattern = self._fields[name]
+            if kind == "string" and not isinstance(value, str):
+                errors.append(f"`{name}` must be a string")
+            elif enum is not None and value not in enum:
+                errors.append(f"`{name}` must be one of: {', '.join(sorted(enum))}")
+            elif pattern is not None and not pattern.search(value):
+                errors.append(f"`{name}` must match {pattern.pattern}")
+        return errors
+
+    def is_valid(self, payload: object) -> bool:
+        return not self.errors(payload)
+
+    def repair(self, payload: object) -> IntentPayload | None:
+        # Fixes what small models commonly get wrong without another round trip; None if it stays invalid.
+        if not isinstance(payload, dict):
+            return None
+        if self.is_valid(payload):
+            return payload  # type: ignore[return-value]
+        repaired = {
+            name: value.strip() if isinstance(value, str) else value
+            for name, value in payload.items()
+            if value is not None and (name in self._fields or not self._closed)
+        }
+        if isinstance(repaired.get("intent"), str):
+            repaired["intent"] = repaired["intent"].lower()
+        for key in ("due", "reminder"):
+            if isinstance(repaired.get(key), str):
+                repaired[key] = _repair_timestamp(repaired[key])
+        if isinstance(repaired.get("reminder"), bool):
+            # `"reminder": true` reads as "remind me when it is due"; without a due date there is nothing to keep.
+            if repaired["reminder"] and "due" in repaired:
+                repaired["reminder"] = repaired["due"]
+            else:
+                del repaired["reminder"]
+        return repaired if self.is_valid(repaired) else None  # type: ignore[return-value]
+
+
+INTENT_VALIDATOR = IntentPayloadValidator(_intent_tool_schema()["function"]["parameters"])
+
+
+def _prefix_intent(transcript: str) -> str:
     normalized = transcript.strip().lower()
-    prefix_intent = (
+    return (
         "create-task"
         if normalized.startswith("create a task")
         or normalized.startswith("follow up")
@@ -253,64 +1260,936 @@ def _intent_messages(transcript: str) -> list[dict[str, str]]:
         or normalized.startswith("remind me")
         else "create-note"
     )
-    system_prompt = (
-        "You extract intent from voice transcripts. Respond ONLY by calling the tool `emit_intent`. "
-        "Rules: intent must be `create-task` ONLY if the transcript starts with 'create a task', 'follow up', 'follow-up', or 'remind me'. "
-        "This prefix check is case-insensitive and treats 'Follow-up' at the start as `create-task`. "
-        "If the transcript starts with anything else, you MUST use `create-note`. "
-        "Otherwise intent must be `create-note`. Always include `content` as the requested action or note, "
-        "and include key subjects/people mentioned in the transcript (e.g., 'boss'). This is REQUIRED. "
-        "Include `due` and/or `reminder` only if explicitly stated; omit them otherwise. "
-        "If only a date is provided (including relative dates), you MUST set the time to 06:00 UTC "
-        "(e.g., T06:00:00Z or T06:00:00+00:00), never the current time. "
-        "If a due or reminder date omits the year or month, you MUST call `get_current_date` before emitting intent "
-        "and assume the next occurrence of that date. Never return a year earlier than the current year. "
-        "If the transcript mentions relative dates (today, tomorrow, next, this), you MUST call `get_current_date` "
-        "before emitting intent and resolve to a concrete date. "
-        "Tomorrow means current date + 1 day (never the current date). Today means current date. "
-        "Interpret 'Latest by <date>' or 'Due by <date>' as the `due` date. "
-        "Interpret 'Remind me <date>' or 'Remind me by <date>' as the `reminder` date. Do not swap these. "
-        "The `reminder` field MUST be an ISO 8601 timestamp string, never a boolean. "
-        "Use ISO 8601 timestamps with Z or +00:00 for UTC and DO NOT prefix timestamps with 'T'. "
-        "Do NOT output date-only strings; timestamps MUST include time and timezone. "
-        "Use the `get_current_date` tool response for date math; it provides a date only, not a time. "
-        f"Current UTC date: {today} (year {year}). You MUST NOT output a year earlier than {year}. "
-        f"If the transcript says 'tomorrow', use {tomorrow} at 06:00 UTC. "
-        f"Prefix intent classification (must follow): {prefix_intent}. You MUST set intent to {prefix_intent}. "
-        "Example 1: 'Follow-up with my boss.' -> intent=create-task, content includes 'boss'. "
-        "Example 2: 'Remind me by tomorrow to upload files.' -> intent=create-task, reminder=<tomorrow at 06:00 UTC>."
+
+
+_MONTHS = {
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3, "mar": 3, "april": 4, "apr": 4,
+    "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7, "august": 8, "aug": 8,
+    "september": 9, "sep": 9, "sept": 9, "october": 10, "oct": 10,
+    "november": 11, "nov": 11, "december": 12, "dec": 12,
+}  # fmt: skip
+_MONTH_PATTERN = "|".join(sorted(_MONTHS, key=len, reverse=True))
+_DATE_PHRASE = re.compile(
+    r"\b(?:(?P<relative>today|tomorrow)"
+    rf"|(?P<month>{_MONTH_PATTERN})\.?\s+(?P<day>\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(?P<year>\d{{4}}))?"
+    rf"|(?P<day_first>\d{{1,2}})(?:st|nd|rd|th)?\s+of\s+(?P<month_after>{_MONTH_PATTERN})(?:,?\s+(?P<year_after>\d{{4}}))?)\b",
+    re.IGNORECASE,
+)
+# Anything temporal the rules below do not resolve on their own is left to the LLM. This errs on the side of
+# deferring: a needless LLM call costs latency, a date dropped here is lost without a trace.
+_UNRESOLVED_TEMPORAL = re.compile(
+    r"\b(?:yesterday|tonight|morning|afternoon|evening|noon|midnight|weekend|week|weeks|month|months|year|years"
+    r"|day|days|hour|hours|minute|minutes|second|seconds|fortnight|end of|o'clock|next|later|eod|asap"
+    r"|hr|hrs|min|mins|sec|secs|wk|wks|mo|mos|yr|yrs"
+    r"|monday|tuesday|wednesday|thursday|friday|saturday|sunday|mon|tue|tues|wed|thu|thur|thurs|fri|sat|sun"
+    # Slang and misspelt relative days, and holidays, which all stand for a date the rules cannot place.
+    r"|tonite|2nite|nite|tmrw|tmrow|tmr|tmw|2moro|2morrow|tomorow|tommorow|tommorrow|2day|eow|eom|eoy|cob"
+    r"|christmas|xmas|halloween|thanksgiving|easter|hanukkah|chanukah|diwali|passover|ramadan|eid|valentine"
+    r"|valentines|holiday|holidays|nye"
+    rf"|{'|'.join(name for name in _MONTHS if name != 'may')})\b"
+    r"|\bmay\s+\d|\d\s*(?:am|pm|a\.m\.|p\.m\.|h)\b|\d{1,2}:\d{2}|\b\d{4}\b"
+    # Ordinals ("by the 5th", "on the first"), numeric dates ("10/20", "20.11.", "20-11") and clock times
+    # ("at 5", "at five").
+    r"|\b\d{1,2}(?:st|nd|rd|th)\b|\b\d{1,2}[./-]\d{1,2}\b"
+    r"|\bthe\s+(?:(?:twenty|thirty)[\s-])?(?:first|second|third|fourth|fifth|sixth|seventh|eighth|ninth|tenth"
+    r"|eleventh|twelfth|thirteenth|fourteenth|fifteenth|sixteenth|seventeenth|eighteenth|nineteenth|twentieth"
+    r"|thirtieth)\b"
+    r"|\b(?:at|by|until|till|before|after|around|from)\s+(?:\d|one|two|three|four|five|six|seven|eight|nine|ten"
+    r"|eleven|twelve|half|quarter)\b",
+    re.IGNORECASE,
+)
+_DUE_TRIGGERS = ("latest by", "due by", "due on", "due")
+_REMINDER_TRIGGERS = ("remind me by", "remind me on", "remind me")
+
+
+def _resolve_date_phrase(match: re.Match[str], today: date) -> date | None:
+    relative = match.group("relative")
+    if relative:
+        return today if relative.lower() == "today" else today + timedelta(days=1)
+    month_name = match.group("month") or match.group("month_after")
+    day = int(match.group("day") or match.group("day_first"))
+    year_text = match.group("year") or match.group("year_after")
+    month = _MONTHS[month_name.lower()]
+    try:
+        if year_text:
+            resolved = date(int(year_text), month, day)
+            return resolved if resolved.year >= today.year else None
+        resolved = date(today.year, month, day)
+        # Dates without a year mean the next occurrence.
+        return resolved if resolved >= today else date(today.year + 1, month, day)
+    except ValueError:
+        return None
+
+
+def _date_field_for(preceding: str) -> str | None:
+    context = preceding.lower().rstrip(" ,:")
+    if context.endswith(_REMINDER_TRIGGERS):
+        return "reminder"
+    if context.endswith(_DUE_TRIGGERS):
+        return "due"
+    return None
+
+
+def classify_transcript_locally(transcript: str, today: date | None = None) -> IntentPayload | None:
+    content = transcript.strip()
+    if content == "":
+        return None
+    today = today or datetime.now(timezone.utc).date()
+    payload: IntentPayload = {"intent": _prefix_intent(content), "content": content}
+    previous_end = 0
+    for match in _DATE_PHRASE.finditer(content):
+        field_name = _date_field_for(content[previous_end : match.start()])
+        resolved = _resolve_date_phrase(match, today)
+        if field_name is None or resolved is None or field_name in payload:
+            return None
+        payload[field_name] = f"{resolved.isoformat()}T06:00:00Z"  # type: ignore[literal-required]
+        previous_end = match.end()
+    if _UNRESOLVED_TEMPORAL.search(_DATE_PHRASE.sub(" ", content)):
+        return None
+    return payload
+
+
+@dataclass(frozen=True)
+class FastPathStats:
+    hits: int
+    misses: int
+    local_seconds: float
+    llm_seconds: float
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        # Estimated from the mean latency of transcripts that did need the LLM.
+        if self.misses == 0:
+            return 0.0
+        return self.hits * (self.llm_seconds / self.misses) - self.local_seconds
+
+
+class FastPathIntentExtractor:
+    # Resolves transcripts without ambiguous temporal expressions locally; the rest go to `fallback`.
+    def __init__(
+        self,
+        fallback: Callable[[str], IntentPayload | None],
+        logger: logging.Logger | None = None,
+        fallback_batch: Callable[[list[str]], list[IntentPayload | None]] | None = None,
+        fallback_async: Callable[[str], Awaitable[IntentPayload | None]] | None = None,
+    ) -> None:
+        self._fallback = fallback
+        self._fallback_batch = fallback_batch
+        self._fallback_async = fallback_async
+        self._logger = logger or logging.getLogger("voice_inbox")
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._local_seconds = 0.0
+        self._llm_seconds = 0.0
+
+    def stats(self) -> FastPathStats:
+        with self._lock:
+            return FastPathStats(self._hits, self._misses, self._local_seconds, self._llm_seconds)
+
+    def _resolve_locally(self, transcript: str) -> tuple[IntentPayload | None, float]:
+        started = time.perf_counter()
+        payload = classify_transcript_locally(transcript)
+        elapsed = time.perf_counter() - started
+        if payload is not None:
+            with self._lock:
+                self._hits += 1
+                self._local_seconds += elapsed
+                mean_llm_seconds = self._llm_seconds / self._misses if self._misses else 0.0
+            METRICS.increment("voice_inbox_intent_fast_path_total", result="hit")
+            if mean_llm_seconds > elapsed:
+                METRICS.increment("voice_inbox_intent_fast_path_saved_seconds_total", mean_llm_seconds - elapsed)
+            stats = self.stats()
+            self._logger.info(
+                "Intent resolved by fast path (hit rate %.0f%%, ~%.1fs LLM time saved)",
+                stats.hit_rate * 100,
+                stats.saved_seconds,
+            )
+        return payload, elapsed
+
+    def _record_miss(self, local_seconds: float, llm_started: float) -> None:
+        METRICS.increment("voice_inbox_intent_fast_path_total", result="miss")
+        with self._lock:
+            self._misses += 1
+            self._local_seconds += local_seconds
+            self._llm_seconds += time.perf_counter() - llm_started
+
+    def __call__(self, transcript: str) -> IntentPayload | None:
+        payload, elapsed = self._resolve_locally(transcript)
+        if payload is not None:
+            return payload
+        started = time.perf_counter()
+        try:
+            return self._fallback(transcript)
+        finally:
+            self._record_miss(elapsed, started)
+
+    async def extract_async(self, transcript: str) -> IntentPayload | None:
+        payload, elapsed = self._resolve_locally(transcript)
+        if payload is not None:
+            return payload
+        started = time.perf_counter()
+        try:
+            if self._fallback_async is None:
+                return await asyncio.to_thread(self._fallback, transcript)
+            return await self._fallback_async(transcript)
+        finally:
+            self._record_miss(elapsed, started)
+
+    def extract_batch(self, transcripts: list[str]) -> list[IntentPayload | None]:
+        local = [classify_transcript_locally(transcript) for transcript in transcripts]
+        missing = [index for index, payload in enumerate(local) if payload is None]
+        if self._fallback_batch is None or len(missing) < 2:
+            return [self(transcript) for transcript in transcripts]
+        with self._lock:
+            self._hits += len(transcripts) - len(missing)
+            self._misses += len(missing)
+        METRICS.increment("voice_inbox_intent_fast_path_total", len(transcripts) - len(missing), result="hit")
+        METRICS.increment("voice_inbox_intent_fast_path_total", len(missing), result="miss")
+        started = time.perf_counter()
+        fresh = self._fallback_batch([transcripts[index] for index in missing])
+        with self._lock:
+            self._llm_seconds += time.perf_counter() - started
+        for index, payload in zip(missing, fresh):
+            local[index] = payload
+        return local
+
+
+def _parse_flag(value: str | None, env_name: str, default: bool) -> bool:
+    if value is None or value.strip() == "":
+        return default
+    normalized = value.strip().lower()
+    if normalized in ("1", "true", "yes", "on"):
+        return True
+    if normalized in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"{env_name} must be 0 or 1")
+
+
+def get_intent_fast_path_enabled(environ: dict[str, str] | None = None) -> bool:
+    environ = environ or os.environ
+    return _parse_flag(environ.get(INTENT_FAST_PATH_ENV), INTENT_FAST_PATH_ENV, True)
+
+
+_INTENT_RULES = (
+    "Rules: intent must be `create-task` ONLY if the transcript starts with 'create a task', 'follow up', 'follow-up', or 'remind me'. "
+    "This prefix check is case-insensitive and treats 'Follow-up' at the start as `create-task`. "
+    "If the transcript starts with anything else, you MUST use `create-note`. "
+    "Otherwise intent must be `create-note`. Always include `content` as the requested action or note, "
+    "and include key subjects/people mentioned in the transcript (e.g., 'boss'). This is REQUIRED. "
+    "Include `due` and/or `reminder` only if explicitly stated; omit them otherwise. "
+    "If only a date is provided (including relative dates), you MUST set the time to 06:00 UTC "
+    "(e.g., T06:00:00Z or T06:00:00+00:00), never the current time. "
+    "If a due or reminder date omits the year or month, you MUST call `get_current_date` before emitting intent "
+    "and assume the next occurrence of that date. Never return a year earlier than the current year. "
+    "If the transcript mentions relative dates (today, tomorrow, next, this), you MUST call `get_current_date` "
+    "before emitting intent and resolve to a concrete date. "
+    "Tomorrow means current date + 1 day (never the current date). Today means current date. "
+    "Interpret 'Latest by <date>' or 'Due by <date>' as the `due` date. "
+    "Interpret 'Remind me <date>' or 'Remind me by <date>' as the `reminder` date. Do not swap these. "
+    "The `reminder` field MUST be an ISO 8601 timestamp string, never a boolean. "
+    "Use ISO 8601 timestamps with Z or +00:00 for UTC and DO NOT prefix timestamps with 'T'. "
+    "Do NOT output date-only strings; timestamps MUST include time and timezone. "
+    "Use the `get_current_date` tool response for date math; it provides a date only, not a time. "
+    "Example 1: 'Follow-up with my boss.' -> intent=create-task, content includes 'boss'. "
+    "Example 2: 'Remind me by tomorrow to upload files.' -> intent=create-task, reminder=<tomorrow at 06:00 UTC>."
+)
+# The system prompts never change between calls, so together with the tool schemas they form a byte-stable
+# prefix that the inference server can keep in its KV cache. Everything that varies (today's date, the prefix
+# classification, the transcript) follows in later messages.
+INTENT_SYSTEM_PROMPT = (
+    "You extract intent from voice transcripts. Respond ONLY by calling the tool `emit_intent`. " + _INTENT_RULES
+)
+BATCH_INTENT_SYSTEM_PROMPT = (
+    "You extract intent from voice transcripts. Respond ONLY by calling the tool `emit_intents` with exactly one "
+    "item per transcript, copying each transcript's `id`; apply the rules below to every transcript on its own. "
+    "Each transcript lists its prefix intent classification; you MUST set that item's intent to it. " + _INTENT_RULES
+)
+
+
+def _intent_context_message(prefix_intent: str | None = None) -> dict[str, str]:
+    now = datetime.now(timezone.utc)
+    year = now.year
+    tomorrow = (now.date() + timedelta(days=1)).isoformat()
+    context = (
+        f"Current UTC date: {now.date().isoformat()} (year {year}). You MUST NOT output a year earlier than {year}. "
+        f"If the transcript says 'tomorrow', use {tomorrow} at 06:00 UTC."
     )
+    if prefix_intent is not None:
+        context += (
+            f" Prefix intent classification (must follow): {prefix_intent}. You MUST set intent to {prefix_intent}."
+        )
+    return {"role": "system", "content": context}
+
+
+def _intent_messages(transcript: str) -> list[dict[str, str]]:
     return [
-        {"role": "system", "content": system_prompt},
+        {"role": "system", "content": INTENT_SYSTEM_PROMPT},
+        _intent_context_message(_prefix_intent(transcript)),
         {"role": "user", "content": transcript.strip()},
     ]
 
 
-def extract_intent(transcript: str) -> IntentPayload | None:
-    alias = os.getenv(INTENT_ALIAS_ENV, DEFAULT_INTENT_ALIAS)
-    logging.getLogger("voice_inbox").info("Intent model alias: %s", alias)
-    manager = FoundryLocalManager(alias)
-    model_info = manager.get_model_info(alias)
+def _batch_intent_messages(transcripts: list[str]) -> list[dict[str, str]]:
+    items = [
+        {"id": str(index), "prefix_intent": _prefix_intent(transcript), "transcript": transcript.strip()}
+        for index, transcript in enumerate(transcripts, start=1)
+    ]
+    return [
+        {"role": "system", "content": BATCH_INTENT_SYSTEM_PROMPT},
+        _intent_context_message(),
+        {"role": "user", "content": json.dumps(items, ensure_ascii=False)},
+    ]
 
-    client = OpenAI(
-        base_url=manager.endpoint,
-        api_key=manager.api_key or "not-required",
-    )
 
-    input_list: list[dict[str, object]] = _intent_messages(transcript)
-    tools = [_intent_tool_schema(), _current_date_tool_schema()]
+def get_intent_stream_enabled(environ: dict[str, str] | None = None) -> bool:
+    environ = environ or os.environ
+    return _parse_flag(environ.get(INTENT_STREAM_ENV), INTENT_STREAM_ENV, False)
 
-    current_date_response = client.chat.completions.create(
-        model=model_info.id,
-        messages=input_list,
-        tools=tools,
-        tool_choice={"type": "function", "function": {"name": "get_current_date"}},
-    )
-    current_message = current_date_response.choices[0].message
-    current_calls = current_message.tool_calls or []
-    if not current_calls:
-        logging.getLogger("voice_inbox").error("Intent extraction returned no tool calls.")
-        return None
+
+def get_intent_constrained_enabled(environ: dict[str, str] | None = None) -> bool:
+    environ = environ or os.environ
+    return _parse_flag(environ.get(INTENT_CONSTRAINED_ENV), INTENT_CONSTRAINED_ENV, False)
+
+
+def get_intent_mode(environ: dict[str, str] | None = None) -> str:
+    environ = environ or os.environ
+    value = environ.get(INTENT_MODE_ENV)
+    if value is None or value.strip() == "":
+        return DEFAULT_INTENT_MODE
+    mode = value.strip().lower()
+    if mode not in INTENT_MODES:
+        raise ValueError(f"{INTENT_MODE_ENV} must be one of: {', '.join(INTENT_MODES)}")
+    return mode
+
+
+@dataclass(frozen=True)
+class IntentEndpoint:
+    base_url: str
+    api_key: str
+    model_id: str
+
+
+def resolve_intent_endpoint(alias: str) -> IntentEndpoint:
+    manager = foundry_local.FoundryLocalManager(alias)
+    model_info = manager.get_model_info(alias)
+    return IntentEndpoint(
+        base_url=manager.endpoint,
+        api_key=manager.api_key or "not-required",
+        model_id=model_info.id,
+    )
+
+
+def unload_intent_model(alias: str) -> None:
+    # bootstrap=False: only talk to a running service, never start it just to unload.
+    manager = foundry_local.FoundryLocalManager(bootstrap=False)
+    manager.unload_model(alias, force=True)
+
+
+class IntentEngine:
+    def __init__(
+        self,
+        alias: str | None = None,
+        resolver: Callable[[str], IntentEndpoint] = resolve_intent_endpoint,
+        mode: str | None = None,
+        unloader: Callable[[str], None] = unload_intent_model,
+        stream: bool | None = None,
+        constrained: bool | None = None,
+    ) -> None:
+        self.alias = alias or os.getenv(INTENT_ALIAS_ENV, DEFAULT_INTENT_ALIAS)
+        self.mode = mode or get_intent_mode()
+        self.stream = get_intent_stream_enabled() if stream is None else stream
+        self.constrained = get_intent_constrained_enabled() if constrained is None else constrained
+        self._resolver = resolver
+        self._unloader = unloader
+        self._endpoint: IntentEndpoint | None = None
+        self._client: OpenAI | None = None
+        self._connect_lock = threading.Lock()
+
+    @property
+    def endpoint(self) -> IntentEndpoint | None:
+        return self._endpoint
+
+    def _connect(self) -> tuple[OpenAI, str]:
+        # Serialised so a background pre-warm and the first intent request share one connection.
+        with self._connect_lock:
+            if self._client is None or self._endpoint is None:
+                logging.getLogger("voice_inbox").info("Intent model alias: %s", self.alias)
+                endpoint = self._resolver(self.alias)
+                self._client = openai.OpenAI(
+                    base_url=endpoint.base_url,
+                    api_key=endpoint.api_key,
+                    max_retries=INTENT_CLIENT_MAX_RETRIES,
+                )
+                self._endpoint = endpoint
+            return self._client, self._endpoint.model_id
+
+    def warm_up(self, prime_prompt: bool = True) -> None:
+        # Resolving the alias starts the Foundry Local service and loads the model if needed.
+        client, model_id = self._connect()
+        if not prime_prompt:
+            return
+        try:
+            seconds, prompt_tokens = _prime_intent_prompt(client, model_id, self.constrained)
+        except openai.OpenAIError as exc:
+            # Only an optimisation: without it the first note pays the full prefill itself.
+            logging.getLogger("voice_inbox").warning("Priming the intent prompt cache failed: %s", exc)
+            return
+        logging.getLogger("voice_inbox").info(
+            "Intent prompt prefix primed (%s prompt tokens, first token after %.0f ms)",
+            prompt_tokens if prompt_tokens is not None else "unknown",
+            seconds * 1000,
+        )
+
+    def reset(self) -> None:
+        with self._connect_lock:
+            if self._client is not None:
+                self._client.close()
+            self._client = None
+            self._endpoint = None
+
+    def close(self) -> None:
+        self.reset()
+
+    def unload(self) -> None:
+        # The next request re-resolves the alias, which loads the model again.
+        self.reset()
+        self._unloader(self.alias)
+
+    def _call(self, request: Callable[[OpenAI, str], _T]) -> _T:
+        # A restarted Foundry Local service may listen on a new port; re-resolve once.
+        for attempt in range(2):
+            client, model_id = self._connect()
+            try:
+                return request(client, model_id)
+            except openai.APIConnectionError as exc:
+                if attempt == 1:
+                    raise
+                logging.getLogger("voice_inbox").warning(
+                    "Intent service unreachable (%s); reconnecting.", exc
+                )
+                self.reset()
+        raise AssertionError("unreachable")
+
+    def extract(self, transcript: str) -> IntentPayload | None:
+        return self._call(
+            lambda client, model_id: _request_intent(
+                client, model_id, transcript, self.mode, stream=self.stream, constrained=self.constrained
+            )
+        )
+
+    def extract_batch(self, transcripts: list[str]) -> list[IntentPayload | None]:
+        # One completion for the whole batch; items it gets wrong go through `extract` one by one.
+        if len(transcripts) < 2:
+            return [self.extract(transcript) for transcript in transcripts]
+        try:
+            payloads = self._call(
+                lambda client, model_id: _request_intents_batch(client, model_id, transcripts, self.constrained)
+            )
+        except openai.OpenAIError as exc:
+            logging.getLogger("voice_inbox").warning(
+                "Batch intent extraction failed (%s); extracting %s transcripts one by one.", exc, len(transcripts)
+            )
+            payloads = [None] * len(transcripts)
+        failed = sum(payload is None for payload in payloads)
+        if failed:
+            logging.getLogger("voice_inbox").warning(
+                "Batch intent extraction left %s of %s transcripts unresolved; retrying them one by one.",
+                failed,
+                len(transcripts),
+            )
+            METRICS.increment("voice_inbox_retries_total", failed, stage="intent")
+        return [
+            payload if payload is not None else self.extract(transcript)
+            for transcript, payload in zip(transcripts, payloads)
+        ]
+
+
+def extract_intent(transcript: str) -> IntentPayload | None:
+    engine = IntentEngine()
+    try:
+        return engine.extract(transcript)
+    finally:
+        engine.close()
+
+
+class AsyncIntentEngine:
+    # IntentEngine on AsyncOpenAI. At most `concurrency` requests are in flight, so a server with continuous
+    # batching decodes several notes together while a burst still queues here rather than on the server.
+    # The client belongs to the event loop it was first used on.
+    def __init__(
+        self,
+        alias: str | None = None,
+        resolver: Callable[[str], IntentEndpoint] = resolve_intent_endpoint,
+        mode: str | None = None,
+        unloader: Callable[[str], None] = unload_intent_model,
+        stream: bool | None = None,
+        constrained: bool | None = None,
+        concurrency: int = DEFAULT_INTENT_CONCURRENCY,
+    ) -> None:
+        self.alias = alias or os.getenv(INTENT_ALIAS_ENV, DEFAULT_INTENT_ALIAS)
+        self.mode = mode or get_intent_mode()
+        self.stream = get_intent_stream_enabled() if stream is None else stream
+        self.constrained = get_intent_constrained_enabled() if constrained is None else constrained
+        self.concurrency = concurrency
+        self._resolver = resolver
+        self._unloader = unloader
+        self._endpoint: IntentEndpoint | None = None
+        self._client: AsyncOpenAI | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def endpoint(self) -> IntentEndpoint | None:
+        return self._endpoint
+
+    async def _connect(self) -> tuple[AsyncOpenAI, str]:
+        async with self._connect_lock:
+            if self._client is None or self._endpoint is None:
+                logging.getLogger("voice_inbox").info("Intent model alias: %s", self.alias)
+                # Resolving may start Foundry Local and load the model; other tasks keep running meanwhile.
+                endpoint = await asyncio.to_thread(self._resolver, self.alias)
+                self._client = openai.AsyncOpenAI(
+                    base_url=endpoint.base_url,
+                    api_key=endpoint.api_key,
+                    max_retries=INTENT_CLIENT_MAX_RETRIES,
+                )
+                self._endpoint = endpoint
+                self._loop = asyncio.get_running_loop()
+            return self._client, self._endpoint.model_id
+
+    async def reset(self) -> None:
+        async with self._connect_lock:
+            if self._client is not None:
+                await self._client.close()
+            self._client = None
+            self._endpoint = None
+
+    async def close(self) -> None:
+        await self.reset()
+
+    def unload(self) -> None:
+        # Called from the residency checker thread: the client is closed on the loop that owns it.
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.reset(), self._loop).result()
+        self._unloader(self.alias)
+
+    async def extract(self, transcript: str) -> IntentPayload | None:
+        async with self._semaphore:
+            # A restarted Foundry Local service may listen on a new port; re-resolve once.
+            for attempt in range(2):
+                client, model_id = await self._connect()
+                steps = _intent_steps(model_id, transcript, self.mode, self.stream, self.constrained)
+                try:
+                    return await _run_chat_steps_async(client, steps)
+                except openai.APIConnectionError as exc:
+                    if attempt == 1:
+                        raise
+                    logging.getLogger("voice_inbox").warning(
+                        "Intent service unreachable (%s); reconnecting.", exc
+                    )
+                    await self.reset()
+        raise AssertionError("unreachable")
+
+
+class EventLoopThread:
+    # An asyncio loop on a daemon thread that lives as long as the scanner, so async clients (whose connections
+    # are bound to one loop) can be driven from the threaded pipeline across scans.
+    def __init__(self, name: str = "asyncio") -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine: Awaitable[_T]) -> _T:
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
+
+
+def _create_chat_completion(client: OpenAI, call: str, **kwargs: object) -> object:
+    started = time.perf_counter()
+    response = None
+    try:
+        response = client.chat.completions.create(**kwargs)
+    finally:
+        _record_llm_call(call, time.perf_counter() - started, getattr(response, "usage", None))
+    return response
+
+
+async def _create_chat_completion_async(client: AsyncOpenAI, call: str, **kwargs: object) -> object:
+    started = time.perf_counter()
+    response = None
+    try:
+        response = await client.chat.completions.create(**kwargs)
+    finally:
+        _record_llm_call(call, time.perf_counter() - started, getattr(response, "usage", None))
+    return response
+
+
+def _record_llm_call(
+    call: str, seconds: float, usage: object | None = None, first_token_seconds: float | None = None
+) -> None:
+    # Every completion, streamed or not, records its total latency and prefill work. Only streamed calls can
+    # see their first token; a non-streamed call's total latency includes the whole decode.
+    METRICS.observe("voice_inbox_llm_request_seconds", seconds, call=call)
+    if first_token_seconds is not None:
+        METRICS.observe("voice_inbox_llm_time_to_first_token_seconds", first_token_seconds, call=call)
+    prompt_tokens, cached = _record_prompt_usage(call, usage)
+    logging.getLogger("voice_inbox").info(
+        "LLM call %s: %.0f ms total, first token %s, %s prompt tokens (%s cached)",
+        call,
+        seconds * 1000,
+        f"after {first_token_seconds * 1000:.0f} ms" if first_token_seconds is not None else "not streamed",
+        prompt_tokens if prompt_tokens is not None else "unknown",
+        cached if cached is not None else "unknown",
+    )
+
+
+def _record_prompt_usage(call: str, usage: object | None) -> tuple[int | None, int | None]:
+    # Prefill work per call; `cached_tokens` is only reported by servers with prompt (KV) caching.
+    if usage is None:
+        return None, None
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    METRICS.increment("voice_inbox_llm_prompt_tokens_total", prompt_tokens, call=call)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached:
+        METRICS.increment("voice_inbox_llm_cached_prompt_tokens_total", cached, call=call)
+    return prompt_tokens, cached
+
+
+def _prime_intent_prompt(client: OpenAI, model_id: str, constrained: bool = False) -> tuple[float, int | None]:
+    # Runs the static prompt prefix through the model once, generating a single token, so the server's prompt
+    # cache holds it before the first note arrives. Streams to time the first token.
+    started = time.perf_counter()
+    first_token: float | None = None
+    prompt_tokens: int | None = None
+    stream = client.chat.completions.create(
+        model=model_id,
+        messages=_intent_messages("warm-up") + _synthetic_current_date_messages(),
+        tools=_intent_tools(constrained),
+        tool_choice={"type": "function", "function": {"name": "emit_intent"}},
+        max_tokens=1,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    usage = None
+    for chunk in stream:
+        if first_token is None and chunk.choices:
+            first_token = time.perf_counter() - started
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+            prompt_tokens = usage.prompt_tokens
+    total = time.perf_counter() - started
+    elapsed = first_token if first_token is not None else total
+    _record_llm_call("warm_up", total, usage, elapsed)
+    return elapsed, prompt_tokens
+
+
+class _JsonObjectScanner:
+    # Follows brace depth and string/escape state across chunks to find where the first JSON object ends.
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> str | None:
+        for index, char in enumerate(text):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}" and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    return "".join(self._parts) + text[: index + 1]
+        self._parts.append(text)
+        return None
+
+
+class _StreamedToolCall:
+    # Collects `tool_name`'s arguments from streamed chunks; `feed` returns them once the JSON object is complete.
+    def __init__(self, call: str, tool_name: str) -> None:
+        self._call = call
+        self._tool_name = tool_name
+        self._scanner = _JsonObjectScanner()
+        self._tool_index: int | None = None
+        self._started = time.perf_counter()
+        self.first_token_seconds: float | None = None
+
+    def record(self) -> None:
+        _record_llm_call(self._call, time.perf_counter() - self._started, None, self.first_token_seconds)
+
+    def feed(self, chunk: object) -> str | None:
+        if not chunk.choices:
+            return None
+        if self.first_token_seconds is None:
+            self.first_token_seconds = time.perf_counter() - self._started
+        choice = chunk.choices[0]
+        for delta in choice.delta.tool_calls or []:
+            function = delta.function
+            if function is not None and function.name == self._tool_name:
+                self._tool_index = delta.index
+            if delta.index != self._tool_index or function is None or not function.arguments:
+                continue
+            arguments = self._scanner.feed(function.arguments)
+            if arguments is not None:
+                if choice.finish_reason is None:
+                    METRICS.increment("voice_inbox_llm_stream_early_stops_total", call=self._call)
+                return arguments
+        return None
+
+
+def _loads_or_none(arguments: str) -> object | None:
+    try:
+        return json.loads(arguments)
+    except json.JSONDecodeError:
+        return None
+
+
+def _stream_tool_arguments(client: OpenAI, call: str, tool_name: str, **kwargs: object) -> object | None:
+    # Parses `tool_name`'s arguments while they stream in and closes the stream as soon as the JSON object is
+    # complete, so whatever the model would generate after it (closing tokens, trailing chatter) is never decoded.
+    collector = _StreamedToolCall(call, tool_name)
+    try:
+        stream = client.chat.completions.create(stream=True, **kwargs)
+        try:
+            for chunk in stream:
+                arguments = collector.feed(chunk)
+                if arguments is not None:
+                    return _loads_or_none(arguments)
+        finally:
+            stream.close()
+    finally:
+        collector.record()
+    return None
+
+
+async def _stream_tool_arguments_async(
+    client: AsyncOpenAI, call: str, tool_name: str, **kwargs: object
+) -> object | None:
+    collector = _StreamedToolCall(call, tool_name)
+    try:
+        stream = await client.chat.completions.create(stream=True, **kwargs)
+        try:
+            async for chunk in stream:
+                arguments = collector.feed(chunk)
+                if arguments is not None:
+                    return _loads_or_none(arguments)
+        finally:
+            await stream.close()
+    finally:
+        collector.record()
+    return None
+
+
+@dataclass(frozen=True)
+class _ChatCall:
+    # One completion a request flow needs. Streamed calls are answered with the parsed tool arguments,
+    # the others with the completion itself.
+    call: str
+    request: dict[str, object]
+    stream_tool: str | None = None
+
+
+_ChatSteps = Generator[_ChatCall, object, _T]
+
+
+def _run_chat_steps(client: OpenAI, steps: _ChatSteps[_T]) -> _T:
+    try:
+        step = next(steps)
+        while True:
+            if step.stream_tool is None:
+                result = _create_chat_completion(client, step.call, **step.request)
+            else:
+                result = _stream_tool_arguments(client, step.call, step.stream_tool, **step.request)
+            step = steps.send(result)
+    except StopIteration as done:
+        return done.value
+
+
+async def _run_chat_steps_async(client: AsyncOpenAI, steps: _ChatSteps[_T]) -> _T:
+    # The same request flows as `_run_chat_steps`, so sync and async extraction cannot drift apart.
+    try:
+        step = next(steps)
+        while True:
+            if step.stream_tool is None:
+                result = await _create_chat_completion_async(client, step.call, **step.request)
+            else:
+                result = await _stream_tool_arguments_async(client, step.call, step.stream_tool, **step.request)
+            step = steps.send(result)
+    except StopIteration as done:
+        return done.value
+
+
+def _request_intent(
+    client: OpenAI,
+    model_id: str,
+    transcript: str,
+    mode: str = DEFAULT_INTENT_MODE,
+    stream: bool = False,
+    constrained: bool = False,
+) -> IntentPayload | None:
+    return _run_chat_steps(client, _intent_steps(model_id, transcript, mode, stream, constrained))
+
+
+def _intent_steps(
+    model_id: str,
+    transcript: str,
+    mode: str = DEFAULT_INTENT_MODE,
+    stream: bool = False,
+    constrained: bool = False,
+) -> _ChatSteps[IntentPayload | None]:
+    if mode == "single":
+        payload = yield from _single_round_trip_steps(model_id, transcript, stream, constrained)
+        if payload is not None or constrained:
+            # With constrained decoding the server already enforced the schema; another turn would not help.
+            return payload
+        logging.getLogger("voice_inbox").warning(
+            "Single-round-trip intent failed validation; falling back to multi-turn extraction."
+        )
+        METRICS.increment("voice_inbox_retries_total", stage="intent")
+    return (yield from _multi_turn_steps(model_id, transcript, constrained))
+
+
+def _request_intents_batch(
+    client: OpenAI,
+    model_id: str,
+    transcripts: list[str],
+    constrained: bool = False,
+) -> list[IntentPayload | None]:
+    # Single round trip for several transcripts. Missing, duplicate or invalid items come back as None.
+    input_list: list[dict[str, object]] = _batch_intent_messages(transcripts) + _synthetic_current_date_messages()
+    response = _create_chat_completion(
+        client,
+        "batch",
+        model=model_id,
+        messages=input_list,
+        tools=[
+            _strict_tool_schema(_batch_intent_tool_schema()) if constrained else _batch_intent_tool_schema(),
+            _current_date_tool_schema(),
+        ],
+        tool_choice={"type": "function", "function": {"name": "emit_intents"}},
+    )
+    payloads: list[IntentPayload | None] = [None] * len(transcripts)
+    tool_calls = response.choices[0].message.tool_calls or []
+    emit_call = next((call for call in tool_calls if call.function.name == "emit_intents"), None)
+    if emit_call is None:
+        return payloads
+    arguments = emit_call.function.arguments
+    try:
+        parsed = json.loads(arguments) if isinstance(arguments, str) else arguments
+    except json.JSONDecodeError:
+        return payloads
+    items = parsed.get("items") if isinstance(parsed, dict) else parsed
+    if not isinstance(items, list):
+        return payloads
+    seen: set[int] = set()
+    for item in items:
+        if not isinstance(item, dict) or not str(item.get("id", "")).isdigit():
+            continue
+        index = int(item["id"]) - 1
+        payload = {key: value for key, value in item.items() if key != "id"}
+        if not 0 <= index < len(transcripts):
+            continue
+        if index in seen:
+            # A repeated id is ambiguous; let the single-item path settle it.
+            payloads[index] = None
+            continue
+        seen.add(index)
+        payloads[index] = INTENT_VALIDATOR.repair(payload)
+    return payloads
+
+
+def _synthetic_current_date_messages() -> list[dict[str, object]]:
+    # The answer `get_current_date` would produce, so the model can go straight to `emit_intent`.
+    return [
+        {
+            "role": "assistant",
+            "tool_calls": [
+                {
+                    "id": SYNTHETIC_CURRENT_DATE_CALL_ID,
+                    "type": "function",
+                    "function": {"name": "get_current_date", "arguments": "{}"},
+                }
+            ],
+        },
+        {
+            "role": "tool",
+            "tool_call_id": SYNTHETIC_CURRENT_DATE_CALL_ID,
+            "content": json.dumps(_current_date_payload()),
+        },
+    ]
+
+
+def _single_round_trip_steps(
+    model_id: str,
+    transcript: str,
+    stream: bool = False,
+    constrained: bool = False,
+) -> _ChatSteps[IntentPayload | None]:
+    input_list: list[dict[str, object]] = _intent_messages(transcript) + _synthetic_current_date_messages()
+    request = {
+        "model": model_id,
+        "messages": input_list,
+        "tools": _intent_tools(constrained),
+        "tool_choice": {"type": "function", "function": {"name": "emit_intent"}},
+    }
+    if stream:
+        payload = yield _ChatCall("single", request, stream_tool="emit_intent")
+    else:
+        response = yield _ChatCall("single", request)
+        tool_calls = response.choices[0].message.tool_calls or []
+        emit_call = next((call for call in tool_calls if call.function.name == "emit_intent"), None)
+        if emit_call is None:
+            return None
+        arguments = emit_call.function.arguments
+        try:
+            payload = json.loads(arguments) if isinstance(arguments, str) else arguments
+        except json.JSONDecodeError:
+            return None
+    return INTENT_VALIDATOR.repair(payload)
+
+
+def _multi_turn_steps(
+    model_id: str,
+    transcript: str,
+    constrained: bool = False,
+) -> _ChatSteps[IntentPayload | None]:
+    input_list: list[dict[str, object]] = _intent_messages(transcript)
+    tools = _intent_tools(constrained)
+
+    current_date_response = yield _ChatCall(
+        "get_current_date",
+        {
+            "model": model_id,
+            "messages": input_list,
+            "tools": tools,
+            "tool_choice": {"type": "function", "function": {"name": "get_current_date"}},
+        },
+    )
+    current_message = current_date_response.choices[0].message
+    current_calls = current_message.tool_calls or []
+    if not current_calls:
+        logging.getLogger("voice_inbox").error("Intent extraction returned no tool calls.")
+        return None
     input_list.append(
         {
             "role": "assistant",
@@ -344,11 +2223,11 @@ def extract_intent(transcript: str) -> IntentPayload | None:
             if attempt == 0
             else "auto"
         )
-        response = client.chat.completions.create(
-            model=model_info.id,
-            messages=input_list,
-            tools=tools,
-            tool_choice=tool_choice,
+        if attempt:
+            METRICS.increment("voice_inbox_retries_total", stage="intent")
+        response = yield _ChatCall(
+            "emit_intent",
+            {"model": model_id, "messages": input_list, "tools": tools, "tool_choice": tool_choice},
         )
         message = response.choices[0].message
         tool_calls = message.tool_calls or []
@@ -361,13 +2240,40 @@ def extract_intent(transcript: str) -> IntentPayload | None:
             arguments = emit_call.function.arguments
             try:
                 payload = json.loads(arguments) if isinstance(arguments, str) else arguments
+                errors = INTENT_VALIDATOR.errors(payload)
             except json.JSONDecodeError:
-                logging.getLogger("voice_inbox").error("Intent extraction returned invalid JSON arguments.")
-                return None
-            if not isinstance(payload, dict):
-                logging.getLogger("voice_inbox").error("Intent extraction returned non-object arguments.")
+                payload, errors = None, ["arguments are not valid JSON"]
+            repaired = INTENT_VALIDATOR.repair(payload)
+            if repaired is not None:
+                return repaired
+            logging.getLogger("voice_inbox").error(
+                "Intent extraction returned invalid arguments: %s", "; ".join(errors)
+            )
+            if constrained:
                 return None
-            return payload  # type: ignore[return-value]
+            # Hand the validation errors back so the next turn corrects them instead of guessing again.
+            input_list.append(
+                {
+                    "role": "assistant",
+                    "tool_calls": [
+                        {
+                            "id": emit_call.id,
+                            "type": "function",
+                            "function": {"name": "emit_intent", "arguments": arguments},
+                        }
+                    ],
+                }
+            )
+            input_list.append(
+                {
+                    "role": "tool",
+                    "tool_call_id": emit_call.id,
+                    "content": json.dumps(
+                        {"error": f"Invalid arguments: {'; '.join(errors)}. Call emit_intent again with fixes."}
+                    ),
+                }
+            )
+            continue
 
         if any(call.function.name == "get_current_date" for call in tool_calls):
             input_list.append(
@@ -433,111 +2339,2239 @@ def _ensure_ffmpeg() -> None:
     )
 
 
-class WhisperTranscriber:
-    def __init__(self, model_name: str = DEFAULT_MODEL) -> None:
-        _ensure_ffmpeg()
-        self._model = whisper.load_model(model_name)
+def _iter_decoded_samples(audio_path: Path) -> Iterator[np.ndarray]:
+    # Yields 16 kHz mono float32 samples one decoded frame at a time.
+    av = _load_av()
+    with av.open(str(audio_path)) as container:
+        stream = container.streams.audio[0]
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+        for frame in container.decode(stream):
+            for resampled in resampler.resample(frame):
+                yield resampled.to_ndarray()[0]
+        for resampled in resampler.resample(None):
+            yield resampled.to_ndarray()[0]
 
-    def transcribe(self, audio_path: Path) -> str:
-        return transcribe_with_model(self._model, audio_path)
 
+class AudioDecoder:
+    # Decodes audio to 16 kHz mono float32 inside the process (PyAV, linked against libavcodec) instead of
+    # starting one ffmpeg subprocess per file. Samples are written into a buffer that is reused across calls,
+    # so the returned array is only valid until the next `decode` on the same instance. Files PyAV cannot
+    # read fall back to Whisper's ffmpeg loader.
+    def __init__(
+        self,
+        initial_seconds: float = AUDIO_DECODE_BUFFER_SECONDS,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self._buffer = np.empty(int(initial_seconds * SAMPLE_RATE), dtype=np.float32)
+        self._logger = logger or logging.getLogger("voice_inbox")
 
-def transcribe_with_model(model: object, audio_path: Path) -> str:
-    result = model.transcribe(str(audio_path), language="en")
-    return str(result["text"])
+    def decode(self, audio_path: Path) -> np.ndarray:
+        with METRICS.time("voice_inbox_decode_seconds"):
+            return self._decode(audio_path)
 
+    def _decode(self, audio_path: Path) -> np.ndarray:
+        av = _load_av()
+        if av is not None:
+            try:
+                return self._decode_in_process(audio_path)
+            except (av.FFmpegError, IndexError, ValueError) as exc:
+                self._logger.warning(
+                    "In-process decode failed for %s (%s); falling back to ffmpeg.", audio_path.name, exc
+                )
+        return whisper.load_audio(str(audio_path))
 
-def list_inbox_files(inbox_dir: Path) -> list[Path]:
-    if not inbox_dir.exists():
-        return []
-    return sorted([path for path in inbox_dir.iterdir() if path.is_file()])
+    def _decode_in_process(self, audio_path: Path) -> np.ndarray:
+        length = 0
+        for samples in _iter_decoded_samples(audio_path):
+            length = self._append(samples, length)
+        return self._buffer[:length]
 
+    def _append(self, samples: np.ndarray, length: int) -> int:
+        end = length + samples.shape[0]
+        if end > self._buffer.shape[0]:
+            grown = np.empty(max(end, self._buffer.shape[0] * 2), dtype=np.float32)
+            grown[:length] = self._buffer[:length]
+            self._buffer = grown
+        self._buffer[length:end] = samples
+        return end
 
-def _is_mp3(path: Path) -> bool:
-    return path.suffix.lower() == ".mp3"
+
+def get_vad_enabled(environ: dict[str, str] | None = None) -> bool:
+    environ = environ or os.environ
+    return _parse_flag(environ.get(VAD_ENV), VAD_ENV, True)
 
 
-def _is_readable(path: Path) -> bool:
+def get_vad_threshold_db(environ: dict[str, str] | None = None) -> float:
+    environ = environ or os.environ
+    value = environ.get(VAD_THRESHOLD_DB_ENV)
+    if value is None or value.strip() == "":
+        return DEFAULT_VAD_THRESHOLD_DB
     try:
-        with path.open("rb"):
-            return True
-    except OSError:
-        return False
+        parsed = float(value)
+    except ValueError as exc:
+        raise ValueError(f"{VAD_THRESHOLD_DB_ENV} must be a number") from exc
+    if parsed >= 0:
+        raise ValueError(f"{VAD_THRESHOLD_DB_ENV} must be below 0 dBFS")
+    return parsed
 
 
-def process_inbox_once(
-    config: AppConfig,
-    logger: logging.Logger,
-    transcribe_func: Callable[[Path], str],
-    warned_non_mp3: set[Path],
-    intent_func: Callable[[str], IntentPayload | None] = extract_intent,
-) -> None:
-    for audio_path in list_inbox_files(config.inbox_dir):
-        if not _is_mp3(audio_path):
-            if audio_path not in warned_non_mp3:
-                logger.warning("Ignoring non-MP3 file: %s", audio_path.name)
-                warned_non_mp3.add(audio_path)
-            continue
-        if not _is_readable(audio_path):
-            logger.error("File is locked or unreadable: %s", audio_path.name)
-            continue
-        try:
-            transcript = transcribe_func(audio_path)
-        except Exception as exc:  # pragma: no cover - defensive guard
-            logger.error("Transcription failed for %s: %s", audio_path.name, exc)
-            continue
-        logger.info("Transcript for %s: %s", audio_path.name, transcript.strip())
-        intent_payload = intent_func(transcript)
-        if intent_payload is None:
-            logger.error("Intent extraction failed for %s", audio_path.name)
-            continue
-        try:
-            intent_path = write_intent_output(config.work_dir, intent_payload)
-        except Exception as exc:  # pragma: no cover - defensive guard
-            logger.error("Failed to write intent output for %s: %s", audio_path.name, exc)
-            continue
-        logger.info("Intent output written to %s", intent_path)
-        if intent_payload.get("intent") == "create-task":
-            try:
-                webhook_url = get_create_todo_webhook_url()
-            except ValueError as exc:
-                logger.error("%s", exc)
-            else:
-                if webhook_url is None:
-                    logger.error("%s is not set.", CREATE_TODO_WEBHOOK_ENV)
-                else:
-                    payload = build_create_todo_payload(intent_payload)
-                    send_create_todo_webhook(webhook_url, payload, logger)
-        destination = build_processed_destination(
-            intent_path,
-            audio_path.name,
-            config.processed_dir,
-        )
-        if destination.exists():
-            logger.error("Processed destination already exists: %s", destination)
-            continue
-        try:
-            shutil.move(str(audio_path), str(destination))
-            logger.info("Moved processed file to %s", destination)
-        except Exception as exc:  # pragma: no cover - defensive guard
-            logger.error("Failed to move %s to processed folder: %s", audio_path.name, exc)
+def trim_silence(
+    audio: np.ndarray,
+    threshold_db: float = DEFAULT_VAD_THRESHOLD_DB,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: int = VAD_FRAME_MS,
+    padding_ms: int = VAD_PADDING_MS,
+) -> np.ndarray:
+    # Energy VAD: frames whose RMS level exceeds `threshold_db` (dBFS) are speech. Speech regions are
+    # widened by `padding_ms` on both sides so word onsets survive and short pauses are kept; everything
+    # else is cut. Returns an empty array when the clip holds no speech at all.
+    if audio.shape[0] == 0:
+        return audio
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    starts = np.arange(0, audio.shape[0], frame_length)
+    energy = np.add.reduceat(np.square(audio, dtype=np.float32), starts)
+    counts = np.diff(np.append(starts, audio.shape[0]))
+    level_db = 10 * np.log10(np.maximum(energy / counts, 1e-12))
+    speech = level_db > threshold_db
+    if not speech.any():
+        return audio[:0]
+    padding_frames = -(-padding_ms // frame_ms)
+    keep = np.convolve(speech.astype(np.float32), np.ones(2 * padding_frames + 1), mode="same") > 0
+    if keep.all():
+        return audio
+    return audio[np.repeat(keep, frame_length)[: audio.shape[0]]]
 
 
-def main() -> None:
-    load_dotenv()
-    config = load_config()
-    ensure_directories(config)
-    logger = setup_logging(config.work_dir)
-    logger.info("Voice inbox scanner started. Inbox: %s", config.inbox_dir)
-    transcriber = WhisperTranscriber()
-    warned_non_mp3: set[Path] = set()
+@dataclass(frozen=True)
+class VadStats:
+    files: int
+    silent_files: int
+    audio_seconds: float
+    removed_seconds: float
+    inference_seconds: float
+    inference_audio_seconds: float
 
-    try:
-        while True:
-            process_inbox_once(config, logger, transcriber.transcribe, warned_non_mp3)
-            time.sleep(config.scan_interval_seconds)
-    except KeyboardInterrupt:
-        logger.info("Shutdown requested. Exiting.")
+    @property
+    def inference_seconds_per_audio_second(self) -> float:
+        if self.inference_audio_seconds <= 0:
+            return 0.0
+        return self.inference_seconds / self.inference_audio_seconds
+
+    @property
+    def saved_seconds(self) -> float:
+        # Estimated from the measured Whisper cost per second of audio that was transcribed.
+        return self.removed_seconds * self.inference_seconds_per_audio_second
+
+
+class VoiceActivityDetector:
+    # Trims silence before Whisper and keeps the numbers needed to report what that saved.
+    def __init__(
+        self,
+        threshold_db: float = DEFAULT_VAD_THRESHOLD_DB,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.threshold_db = threshold_db
+        self._logger = logger or logging.getLogger("voice_inbox")
+        self._lock = threading.Lock()
+        self._files = 0
+        self._silent_files = 0
+        self._audio_seconds = 0.0
+        self._removed_seconds = 0.0
+        self._inference_seconds = 0.0
+        self._inference_audio_seconds = 0.0
+
+    def stats(self) -> VadStats:
+        with self._lock:
+            return VadStats(
+                self._files,
+                self._silent_files,
+                self._audio_seconds,
+                self._removed_seconds,
+                self._inference_seconds,
+                self._inference_audio_seconds,
+            )
+
+    def trim(self, audio: np.ndarray, name: str) -> np.ndarray:
+        trimmed = trim_silence(audio, self.threshold_db, SAMPLE_RATE)
+        self.record_trim(name, audio.shape[0] / SAMPLE_RATE, trimmed.shape[0] / SAMPLE_RATE)
+        return trimmed
+
+    def record_trim(self, name: str, total_seconds: float, kept_seconds: float) -> None:
+        removed_seconds = total_seconds - kept_seconds
+        with self._lock:
+            self._files += 1
+            self._silent_files += kept_seconds == 0
+            self._audio_seconds += total_seconds
+            self._removed_seconds += removed_seconds
+        rate = self.stats().inference_seconds_per_audio_second
+        METRICS.increment("voice_inbox_vad_removed_seconds_total", removed_seconds)
+        METRICS.increment("voice_inbox_vad_saved_seconds_total", removed_seconds * rate)
+        if kept_seconds == 0:
+            METRICS.increment("voice_inbox_vad_silent_files_total")
+            self._logger.info("No speech detected in %s (%.1fs); skipping transcription.", name, total_seconds)
+        elif removed_seconds > 0:
+            self._logger.info(
+                "VAD removed %.1fs of %.1fs from %s (~%.2fs inference saved)",
+                removed_seconds,
+                total_seconds,
+                name,
+                removed_seconds * rate,
+            )
+
+    def record_inference(self, audio_seconds: float, elapsed_seconds: float) -> None:
+        with self._lock:
+            self._inference_audio_seconds += audio_seconds
+            self._inference_seconds += elapsed_seconds
+
+
+class _WorkerVoiceActivityDetector(VoiceActivityDetector):
+    # Trims inside a pool worker process, whose log records go nowhere. The numbers are collected instead and
+    # sent back with each result, for the parent's detector to log and count.
+    def __init__(self, threshold_db: float) -> None:
+        super().__init__(threshold_db)
+        self._trims: list[tuple[str, float, float]] = []
+        self._inferences: list[tuple[float, float]] = []
+
+    def record_trim(self, name: str, total_seconds: float, kept_seconds: float) -> None:
+        self._trims.append((name, total_seconds, kept_seconds))
+
+    def record_inference(self, audio_seconds: float, elapsed_seconds: float) -> None:
+        self._inferences.append((audio_seconds, elapsed_seconds))
+
+    def take_report(self) -> tuple[list[tuple[str, float, float]], list[tuple[float, float]]]:
+        report = (self._trims, self._inferences)
+        self._trims, self._inferences = [], []
+        return report
+
+
+class WhisperTranscriber:
+    # Decoding, VAD and streaming in front of a `TranscriptionBackend`. The backend (and its model) is
+    # loaded on the first clip that contains speech, so silent files never pay for it.
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        vad: VoiceActivityDetector | None = None,
+        backend_loader: Callable[[str], TranscriptionBackend] | None = None,
+        stream_min_seconds: float = DEFAULT_STREAM_MIN_SECONDS,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self._model_name = model_name
+        self._backend_loader = backend_loader or load_transcription_backend
+        self._backend: TranscriptionBackend | None = None
+        self._backend_lock = threading.Lock()
+        self.vad = vad
+        self.stream_min_seconds = stream_min_seconds
+        self._logger = logger or logging.getLogger("voice_inbox")
+        # One decoder (and decode buffer) per transcription stage thread.
+        self._decoders = threading.local()
+
+    @property
+    def backend(self) -> TranscriptionBackend:
+        with self._backend_lock:
+            if self._backend is None:
+                self._backend = self._backend_loader(self._model_name)
+                self._logger.info("Transcription backend: %s (%s)", self._backend.name, self._model_name)
+            return self._backend
+
+    def unload(self) -> None:
+        # Drops the backend; the next clip with speech loads it again.
+        with self._backend_lock:
+            self._backend = None
+        release_freed_memory()
+
+    def _decoder(self) -> AudioDecoder:
+        decoder = getattr(self._decoders, "decoder", None)
+        if decoder is None:
+            decoder = self._decoders.decoder = AudioDecoder()
+        return decoder
+
+    def _speech(self, audio_path: Path) -> np.ndarray:
+        audio = self._decoder().decode(audio_path)
+        if self.vad is None:
+            return audio
+        return self.vad.trim(audio, audio_path.name)
+
+    def _record_inference(self, samples: int, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        METRICS.observe("voice_inbox_whisper_seconds", elapsed)
+        if self.vad is not None:
+            self.vad.record_inference(samples / SAMPLE_RATE, elapsed)
+
+    def _streams(self, audio_path: Path) -> bool:
+        duration = probe_duration_seconds(audio_path)
+        return duration is not None and duration > self.stream_min_seconds
+
+    def transcribe_segments(self, audio_path: Path) -> Iterator[str]:
+        # Text per overlapping window, available as soon as that window is decoded.
+        segments = transcribe_segments(self._transcribe_window, audio_path, vad=self.vad)
+        for index, segment in enumerate(segments):
+            self._logger.info("Transcript segment %s for %s: %s", index + 1, audio_path.name, segment)
+            yield segment
+
+    def _transcribe_window(self, audio: np.ndarray) -> str:
+        backend = self.backend
+        started = time.perf_counter()
+        text = backend.transcribe(audio)
+        self._record_inference(audio.shape[0], started)
+        return text
+
+    def transcribe(self, audio_path: Path) -> str:
+        if self._streams(audio_path):
+            # Intent extraction needs the whole note, so the pipeline gets the joined text; segments are only
+            # published (logged) early. Streaming here bounds memory, not time to intent.
+            return " ".join(self.transcribe_segments(audio_path))
+        audio = self._speech(audio_path)
+        if audio.shape[0] == 0:
+            return ""
+        backend = self.backend
+        started = time.perf_counter()
+        text = backend.transcribe(audio)
+        self._record_inference(audio.shape[0], started)
+        return text
+
+    def transcribe_batch(self, audio_paths: list[Path]) -> list[str]:
+        texts: list[str] = [""] * len(audio_paths)
+        clips: list[tuple[int, np.ndarray]] = []
+        for index, audio_path in enumerate(audio_paths):
+            if self._streams(audio_path):
+                texts[index] = self.transcribe(audio_path)
+                continue
+            audio = self._speech(audio_path)
+            if audio.shape[0]:
+                # Copy: the decoder buffer is overwritten by the next file.
+                clips.append((index, np.array(audio)))
+        if not clips:
+            return texts
+        backend = self.backend
+        started = time.perf_counter()
+        results = backend.transcribe_batch([audio for _, audio in clips])
+        self._record_inference(sum(audio.shape[0] for _, audio in clips), started)
+        for (index, _), text in zip(clips, results):
+            texts[index] = text
+        return texts
+
+
+def release_freed_memory() -> None:
+    gc.collect()
+    if "torch" in sys.modules:
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        if torch.backends.mps.is_available():
+            torch.mps.empty_cache()
+    # glibc keeps freed heap pages mapped; hand them back to the OS so RSS actually drops.
+    libc_name = ctypes.util.find_library("c")
+    if sys.platform.startswith("linux") and libc_name:
+        try:
+            ctypes.CDLL(libc_name).malloc_trim(0)
+        except (OSError, AttributeError):  # pragma: no cover - non-glibc libc
+            pass
+
+
+def process_resident_bytes() -> int | None:
+    # Current resident set size of this process (Linux); None where /proc is not available.
+    try:
+        pages = int(Path("/proc/self/statm").read_text(encoding="utf-8").split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def get_model_idle_timeout(environ: dict[str, str] | None = None) -> int:
+    environ = environ or os.environ
+    value = environ.get(MODEL_IDLE_TIMEOUT_ENV)
+    if value is None or value.strip() == "":
+        return DEFAULT_MODEL_IDLE_TIMEOUT_SECONDS
+    try:
+        parsed = int(value)
+    except ValueError as exc:
+        raise ValueError(f"{MODEL_IDLE_TIMEOUT_ENV} must be an integer") from exc
+    if parsed < 0:
+        raise ValueError(f"{MODEL_IDLE_TIMEOUT_ENV} must not be negative")
+    return parsed
+
+
+@dataclass(frozen=True)
+class ModelResidencyStats:
+    name: str
+    resident: bool
+    loads: int
+    unloads: int
+    idle_seconds: float
+    reclaimed_bytes: int
+
+
+@dataclass
+class _ResidentModel:
+    name: str
+    unload: Callable[[], None]
+    resident: bool = False
+    unloading: bool = False
+    in_use: int = 0
+    last_used: float = 0.0
+    loads: int = 0
+    unloads: int = 0
+    reclaimed_bytes: int = 0
+
+
+class ModelResidency:
+    # Unloads models that have not been used for `idle_timeout_seconds`. Models load lazily on their next
+    # use, so callers only wrap the work that needs a model in `use(name)`; a model is never unloaded
+    # while a `use` block for it is running.
+    def __init__(
+        self,
+        idle_timeout_seconds: float,
+        logger: logging.Logger | None = None,
+        check_interval_seconds: float | None = None,
+    ) -> None:
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._logger = logger or logging.getLogger("voice_inbox")
+        self._condition = threading.Condition()
+        self._models: dict[str, _ResidentModel] = {}
+        self._stop = threading.Event()
+        interval = check_interval_seconds or min(60.0, max(1.0, idle_timeout_seconds / 4))
+        self._thread = threading.Thread(target=self._watch, args=(interval,), name="model-residency", daemon=True)
+        self._thread.start()
+
+    def register(self, name: str, unload: Callable[[], None]) -> None:
+        with self._condition:
+            self._models[name] = _ResidentModel(name=name, unload=unload)
+
+    def _acquire(self, name: str) -> _ResidentModel:
+        with self._condition:
+            model = self._models[name]
+            # A use that starts during an unload waits for it instead of racing it.
+            while model.unloading:
+                self._condition.wait()
+            if not model.resident:
+                model.resident = True
+                model.loads += 1
+            model.in_use += 1
+            return model
+
+    def _release(self, model: _ResidentModel) -> None:
+        with self._condition:
+            model.in_use -= 1
+            model.last_used = time.monotonic()
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[None]:
+        model = self._acquire(name)
+        try:
+            yield
+        finally:
+            self._release(model)
+
+    def guard(self, name: str, func: Callable[..., object]) -> Callable[..., object]:
+        def guarded(*args: object, **kwargs: object) -> object:
+            with self.use(name):
+                return func(*args, **kwargs)
+
+        return guarded
+
+    def guard_async(
+        self, name: str, func: Callable[..., Awaitable[_T]]
+    ) -> Callable[..., Awaitable[_T]]:
+        # Waiting out an unload happens off the event loop: an async model's unload may need that loop.
+        # Releasing never waits, since the condition is only held for bookkeeping.
+        async def guarded(*args: object, **kwargs: object) -> _T:
+            model = await asyncio.to_thread(self._acquire, name)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self._release(model)
+
+        return guarded
+
+    def unload_idle(self, now: float | None = None) -> list[str]:
+        now = time.monotonic() if now is None else now
+        unloaded: list[str] = []
+        for model in list(self._models.values()):
+            with self._condition:
+                idle = now - model.last_used
+                if not model.resident or model.in_use or idle < self.idle_timeout_seconds:
+                    continue
+                model.unloading = True
+            # The unload runs without the lock: it may wait on threads (e.g. an event loop) that need it.
+            # New uses of this model wait on `unloading` instead.
+            before = process_resident_bytes()
+            try:
+                model.unload()
+            except Exception as exc:
+                self._logger.warning("Unloading %s failed: %s", model.name, exc)
+                with self._condition:
+                    model.unloading = False
+                    self._condition.notify_all()
+                continue
+            after = process_resident_bytes()
+            reclaimed = max(0, before - after) if before is not None and after is not None else 0
+            with self._condition:
+                model.resident = False
+                model.unloading = False
+                model.unloads += 1
+                model.reclaimed_bytes += reclaimed
+                self._condition.notify_all()
+            unloaded.append(model.name)
+            self._logger.info(
+                "Unloaded %s after %.0fs idle (%.1f MB reclaimed, resident memory %s)",
+                model.name,
+                idle,
+                reclaimed / (1024 * 1024),
+                _format_bytes(after),
+            )
+        return unloaded
+
+    def stats(self) -> list[ModelResidencyStats]:
+        now = time.monotonic()
+        with self._condition:
+            return [
+                ModelResidencyStats(
+                    name=model.name,
+                    resident=model.resident,
+                    loads=model.loads,
+                    unloads=model.unloads,
+                    idle_seconds=0.0 if model.in_use or not model.loads else now - model.last_used,
+                    reclaimed_bytes=model.reclaimed_bytes,
+                )
+                for model in self._models.values()
+            ]
+
+    def resident_memory_bytes(self) -> int | None:
+        return process_resident_bytes()
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.unload_idle()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=2)
+
+
+def _format_bytes(value: int | None) -> str:
+    if value is None:
+        return "n/a"
+    return f"{value / (1024 * 1024):.1f} MB"
+
+
+def get_prewarm_enabled(environ: dict[str, str] | None = None) -> bool:
+    environ = environ or os.environ
+    return _parse_flag(environ.get(PREWARM_ENV), PREWARM_ENV, False)
+
+
+def get_prompt_warmup_enabled(environ: dict[str, str] | None = None) -> bool:
+    environ = environ or os.environ
+    return _parse_flag(environ.get(PROMPT_WARMUP_ENV), PROMPT_WARMUP_ENV, True)
+
+
+def start_prewarm(loaders: dict[str, Callable[[], object]], logger: logging.Logger) -> threading.Thread:
+    # Loads models in the background right after startup. A scan that needs a model before it is ready
+    # waits on the same (locked) load instead of starting a second one.
+    def run() -> None:
+        for label, load in loaders.items():
+            started = time.perf_counter()
+            try:
+                load()
+            except Exception as exc:
+                logger.warning("Pre-warming %s failed: %s", label, exc)
+                continue
+            logger.info("Pre-warmed %s in %.1fs", label, time.perf_counter() - started)
+
+    thread = threading.Thread(target=run, name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def load_whisper_model(model_name: str) -> object:
+    if _load_av() is None:
+        _ensure_ffmpeg()
+    return whisper.load_model(model_name)
+
+
+class TranscriptionBackend:
+    # Turns 16 kHz mono float32 samples into text. Subclasses load their model in `__init__`.
+    name = ""
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        raise NotImplementedError
+
+    def transcribe_batch(self, clips: list[np.ndarray]) -> list[str]:
+        return [self.transcribe(clip) for clip in clips]
+
+
+class PyTorchWhisperBackend(TranscriptionBackend):
+    # Reference openai-whisper implementation (PyTorch, fp32 on CPU).
+    name = "whisper"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL) -> None:
+        self.model = load_whisper_model(model_name)
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        return transcribe_with_model(self.model, audio)
+
+    def transcribe_batch(self, clips: list[np.ndarray]) -> list[str]:
+        return transcribe_batch_with_model(self.model, clips)
+
+
+class CTranslate2WhisperBackend(TranscriptionBackend):
+    # faster-whisper: the same Whisper weights converted to CTranslate2 and quantized to int8 for CPU.
+    # `model_name` is a Whisper size (fetched from the Hugging Face hub on first use) or a local model path.
+    name = "ctranslate2"
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        compute_type: str = CTRANSLATE2_COMPUTE_TYPE,
+        cpu_threads: int = 0,
+    ) -> None:
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as exc:
+            raise RuntimeError(
+                f"{TRANSCRIBE_BACKEND_ENV}=ctranslate2 requires the faster-whisper package"
+            ) from exc
+        self.model = WhisperModel(model_name, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        # Greedy decoding and no built-in VAD, matching how the PyTorch backend is used.
+        segments, _ = self.model.transcribe(audio, language="en", beam_size=1, vad_filter=False)
+        return "".join(segment.text for segment in segments)
+
+
+TRANSCRIBE_BACKENDS: dict[str, Callable[[str], TranscriptionBackend]] = {
+    PyTorchWhisperBackend.name: PyTorchWhisperBackend,
+    CTranslate2WhisperBackend.name: CTranslate2WhisperBackend,
+}
+
+
+def get_transcribe_backend(environ: dict[str, str] | None = None) -> str:
+    environ = environ or os.environ
+    value = environ.get(TRANSCRIBE_BACKEND_ENV)
+    if value is None or value.strip() == "":
+        return DEFAULT_TRANSCRIBE_BACKEND
+    normalized = value.strip().lower()
+    if normalized not in TRANSCRIBE_BACKENDS:
+        allowed = ", ".join(TRANSCRIBE_BACKENDS)
+        raise ValueError(f"{TRANSCRIBE_BACKEND_ENV} must be one of: {allowed}")
+    return normalized
+
+
+def load_transcription_backend(
+    model_name: str = DEFAULT_MODEL,
+    backend: str | None = None,
+) -> TranscriptionBackend:
+    return TRANSCRIBE_BACKENDS[backend or get_transcribe_backend()](model_name)
+
+
+def get_whisper_process_count(environ: dict[str, str] | None = None) -> int:
+    environ = environ or os.environ
+    value = environ.get(WHISPER_PROCESSES_ENV)
+    if value is None or value.strip() == "":
+        return DEFAULT_WHISPER_PROCESSES
+    try:
+        parsed = int(value)
+    except ValueError as exc:
+        raise ValueError(f"{WHISPER_PROCESSES_ENV} must be an integer") from exc
+    if parsed < 0:
+        raise ValueError(f"{WHISPER_PROCESSES_ENV} must not be negative")
+    return parsed
+
+
+def _whisper_worker_main(
+    worker_id: int,
+    model_name: str,
+    num_threads: int,
+    model_loader: Callable[[str], object],
+    connection: multiprocessing.connection.Connection,
+    vad_threshold_db: float | None = None,
+    stream_min_seconds: float = DEFAULT_STREAM_MIN_SECONDS,
+) -> None:
+    # Both torch and CTranslate2 size their CPU thread pools from OMP_NUM_THREADS.
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)
+    try:
+        model = model_loader(model_name)
+    except Exception as exc:
+        connection.send(("failed", worker_id, repr(exc)))
+        return
+    if "torch" in sys.modules:
+        torch.set_num_threads(num_threads)
+    # Transcription backends get the in-process path (decode, VAD, streaming of long recordings); plain
+    # Whisper-style models (tests) receive the file path.
+    transcriber = None
+    vad = _WorkerVoiceActivityDetector(vad_threshold_db) if vad_threshold_db is not None else None
+    if isinstance(model, TranscriptionBackend):
+        transcriber = WhisperTranscriber(
+            model_name,
+            vad=vad,
+            backend_loader=lambda _: model,
+            stream_min_seconds=stream_min_seconds,
+        )
+    connection.send(("ready", worker_id, None))
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        task_id, audio_path = task
+        started = time.perf_counter()
+        try:
+            if transcriber is None:
+                text = transcribe_with_model(model, Path(audio_path))
+            else:
+                text = transcriber.transcribe(Path(audio_path))
+            error = None
+        except Exception as exc:
+            text = None
+            error = repr(exc)
+        report = vad.take_report() if vad is not None else ([], [])
+        connection.send(("done", worker_id, (task_id, text, error, time.perf_counter() - started, report)))
+
+
+@dataclass
+class WhisperWorkerStats:
+    worker_id: int
+    files: int = 0
+    busy_seconds: float = 0.0
+
+    @property
+    def files_per_minute(self) -> float:
+        if self.busy_seconds <= 0:
+            return 0.0
+        return self.files * 60 / self.busy_seconds
+
+
+@dataclass
+class _PoolWorker:
+    worker_id: int
+    process: multiprocessing.process.BaseProcess
+    connection: multiprocessing.connection.Connection
+    ready: bool = False
+    task_id: int | None = None
+
+
+class WhisperProcessPool:
+    # Each worker process loads its own model once and pins torch threads to its share of the cores.
+    # Every worker has its own pipe and runs one task at a time: a worker that dies (OOM kill, crash in native
+    # code) cannot wedge a queue shared with the others, and its task is known, so it is failed and the worker
+    # is replaced.
+    def __init__(
+        self,
+        size: int,
+        model_name: str = DEFAULT_MODEL,
+        threads_per_worker: int | None = None,
+        model_loader: Callable[[str], object] = load_transcription_backend,
+        logger: logging.Logger | None = None,
+        vad: VoiceActivityDetector | None = None,
+        stream_min_seconds: float = DEFAULT_STREAM_MIN_SECONDS,
+    ) -> None:
+        if size <= 0:
+            raise ValueError("Whisper process pool size must be greater than zero")
+        self.size = size
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // size)
+        self._logger = logger or logging.getLogger("voice_inbox")
+        self._context = multiprocessing.get_context("spawn")
+        self._worker_args = (model_name, self.threads_per_worker, model_loader)
+        # Workers trim with the same threshold and report back; `vad` logs and counts like in-process trimming.
+        self._vad = vad
+        self._stream_min_seconds = stream_min_seconds
+        self._lock = threading.Lock()
+        self._pending: dict[int, Future[str]] = {}
+        self._backlog: deque[tuple[int, str]] = deque()
+        self._next_task_id = 0
+        self._failure: str | None = None
+        self._closing = False
+        self._stats = {worker_id: WhisperWorkerStats(worker_id) for worker_id in range(size)}
+        self._workers = [self._spawn(worker_id) for worker_id in range(size)]
+        self._await_workers()
+        self._dispatcher = threading.Thread(target=self._dispatch_results, name="whisper-results", daemon=True)
+        self._dispatcher.start()
+        self._logger.info(
+            "Whisper process pool started: %s workers x %s torch threads",
+            size,
+            self.threads_per_worker,
+        )
+
+    def _spawn(self, worker_id: int) -> _PoolWorker:
+        connection, child_connection = self._context.Pipe()
+        process = self._context.Process(
+            target=_whisper_worker_main,
+            args=(
+                worker_id,
+                *self._worker_args,
+                child_connection,
+                self._vad.threshold_db if self._vad is not None else None,
+                self._stream_min_seconds,
+            ),
+            name=f"whisper-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        child_connection.close()
+        return _PoolWorker(worker_id, process, connection)
+
+    def _await_workers(self) -> None:
+        for worker in self._workers:
+            try:
+                kind, worker_id, detail = worker.connection.recv()
+            except EOFError:
+                kind, worker_id, detail = "failed", worker.worker_id, "exited during start-up"
+            if kind == "failed":
+                self._stop_processes()
+                for started in self._workers:
+                    started.connection.close()
+                raise RuntimeError(f"Whisper worker {worker_id} failed to load model: {detail}")
+            worker.ready = True
+
+    def _dispatch_results(self) -> None:
+        while True:
+            with self._lock:
+                if self._closing or self._failure is not None:
+                    return
+                workers = list(self._workers)
+            waitables = [worker.connection for worker in workers] + [worker.process.sentinel for worker in workers]
+            multiprocessing.connection.wait(waitables, timeout=1.0)
+            for worker in workers:
+                self._receive(worker)
+                if worker.process.exitcode is not None:
+                    self._replace(worker)
+
+    def _receive(self, worker: _PoolWorker) -> None:
+        while True:
+            try:
+                if not worker.connection.poll():
+                    return
+                kind, worker_id, detail = worker.connection.recv()
+            except (EOFError, OSError):
+                return
+            if kind == "ready":
+                self._logger.info("Whisper worker %s restarted", worker_id)
+                with self._lock:
+                    worker.ready = True
+                    self._assign(worker)
+            elif kind == "failed":
+                self._fail_pool(f"Whisper worker {worker_id} failed to reload model: {detail}")
+            else:
+                self._complete(worker, *detail)
+
+    def _complete(
+        self,
+        worker: _PoolWorker,
+        task_id: int,
+        text: str | None,
+        error: str | None,
+        elapsed: float,
+        vad_report: tuple[list[tuple[str, float, float]], list[tuple[float, float]]],
+    ) -> None:
+        with self._lock:
+            future = self._pending.pop(task_id)
+            worker.task_id = None
+            stats = self._stats[worker.worker_id]
+            stats.files += 1
+            stats.busy_seconds += elapsed
+            self._assign(worker)
+        self._logger.info(
+            "Whisper worker %s transcribed in %.2fs (%s files, %.1f files/min)",
+            worker.worker_id,
+            elapsed,
+            stats.files,
+            stats.files_per_minute,
+        )
+        if self._vad is not None:
+            trims, inferences = vad_report
+            # Same order as in-process transcription: the file is trimmed before its inference is timed.
+            for trim in trims:
+                self._vad.record_trim(*trim)
+            for audio_seconds, elapsed_seconds in inferences:
+                self._vad.record_inference(audio_seconds, elapsed_seconds)
+        if error is None:
+            future.set_result(str(text))
+        else:
+            future.set_exception(RuntimeError(error))
+
+    def _replace(self, worker: _PoolWorker) -> None:
+        exit_code = worker.process.exitcode
+        with self._lock:
+            if self._closing:
+                return
+            future = self._pending.pop(worker.task_id) if worker.task_id is not None else None
+        worker.connection.close()
+        if not worker.ready:
+            # Dying while loading the model would only repeat on every restart.
+            self._fail_pool(f"Whisper worker {worker.worker_id} exited with code {exit_code} while loading")
+            return
+        self._logger.error(
+            "Whisper worker %s exited with code %s%s; restarting it",
+            worker.worker_id,
+            exit_code,
+            " while transcribing" if future is not None else "",
+        )
+        METRICS.increment("voice_inbox_failures_total", stage="whisper_worker")
+        if future is not None:
+            future.set_exception(
+                RuntimeError(f"Whisper worker {worker.worker_id} exited with code {exit_code} while transcribing")
+            )
+        replacement = self._spawn(worker.worker_id)
+        with self._lock:
+            self._workers[self._workers.index(worker)] = replacement
+
+    def _fail_pool(self, reason: str) -> None:
+        self._logger.error("%s; the Whisper process pool is stopped", reason)
+        with self._lock:
+            self._failure = reason
+            futures = list(self._pending.values())
+            self._pending.clear()
+            self._backlog.clear()
+        for future in futures:
+            future.set_exception(RuntimeError(reason))
+
+    def _assign(self, worker: _PoolWorker) -> None:
+        # Called with `_lock` held.
+        if not worker.ready or worker.task_id is not None or not self._backlog:
+            return
+        task = self._backlog.popleft()
+        try:
+            worker.connection.send(task)
+        except OSError:
+            # The worker is gone; the dispatcher replaces it and the task waits for the next free worker.
+            self._backlog.appendleft(task)
+            return
+        worker.task_id = task[0]
+
+    def submit(self, audio_path: Path) -> Future[str]:
+        future: Future[str] = Future()
+        with self._lock:
+            if self._failure is not None:
+                future.set_exception(RuntimeError(self._failure))
+                return future
+            task_id = self._next_task_id
+            self._next_task_id += 1
+            self._pending[task_id] = future
+            self._backlog.append((task_id, str(audio_path)))
+            for worker in self._workers:
+                self._assign(worker)
+        return future
+
+    def transcribe(self, audio_path: Path) -> str:
+        # Decode and inference both happen in the worker, so the round trip is recorded as Whisper time.
+        with METRICS.time("voice_inbox_whisper_seconds"):
+            return self.submit(audio_path).result()
+
+    def worker_stats(self) -> list[WhisperWorkerStats]:
+        with self._lock:
+            return [
+                WhisperWorkerStats(stats.worker_id, stats.files, stats.busy_seconds)
+                for stats in self._stats.values()
+            ]
+
+    def _stop_processes(self) -> None:
+        for worker in self._workers:
+            try:
+                worker.connection.send(None)
+            except OSError:
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closing = True
+            futures = list(self._pending.values())
+            self._pending.clear()
+            self._backlog.clear()
+        for future in futures:
+            future.set_exception(RuntimeError("Whisper process pool is closed"))
+        # The exiting workers wake the dispatcher, which then sees `_closing`.
+        self._stop_processes()
+        self._dispatcher.join(timeout=2)
+        for worker in self._workers:
+            worker.connection.close()
+        for stats in self.worker_stats():
+            self._logger.info(
+                "Whisper worker %s: %s files, %.1f files/min",
+                stats.worker_id,
+                stats.files,
+                stats.files_per_minute,
+            )
+
+
+def transcribe_with_model(model: object, audio: Path | np.ndarray) -> str:
+    # `audio` is either a file path (decoded by Whisper via ffmpeg) or 16 kHz mono float32 samples.
+    result = model.transcribe(audio if isinstance(audio, np.ndarray) else str(audio), language="en")
+    return str(result["text"])
+
+
+def transcribe_batch_with_model(
+    model: object,
+    audio_inputs: list[Path | np.ndarray],
+    decoder: AudioDecoder | None = None,
+) -> list[str]:
+    decoder = decoder or AudioDecoder()
+    texts: list[str] = [""] * len(audio_inputs)
+    short_clips: list[tuple[int, torch.Tensor]] = []
+    for index, audio_input in enumerate(audio_inputs):
+        audio = audio_input if isinstance(audio_input, np.ndarray) else decoder.decode(audio_input)
+        if audio.shape[-1] > whisper.audio.N_SAMPLES:
+            # Longer than one 30-second window: needs the sliding-window decode of model.transcribe.
+            texts[index] = str(model.transcribe(audio, language="en")["text"])
+        else:
+            # The mel is computed right away: the next decode overwrites the decoder buffer.
+            short_clips.append(
+                (index, whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), model.dims.n_mels))
+            )
+    if not short_clips:
+        return texts
+
+    mel_batch = torch.stack([mel for _, mel in short_clips]).to(model.device)
+    options = whisper.DecodingOptions(language="en", fp16=model.device.type != "cpu")
+    results = whisper.decode(model, mel_batch, options)
+    for (index, _), result in zip(short_clips, results):
+        texts[index] = result.text
+    return texts
+
+
+def get_stream_min_seconds(environ: dict[str, str] | None = None) -> int:
+    environ = environ or os.environ
+    return _parse_positive_int(
+        environ.get(STREAM_MIN_SECONDS_ENV), STREAM_MIN_SECONDS_ENV, DEFAULT_STREAM_MIN_SECONDS
+    )
+
+
+def probe_duration_seconds(audio_path: Path) -> float | None:
+    # Reads the container header only; None when PyAV is missing or the duration is unknown.
+    av = _load_av()
+    if av is None:
+        return None
+    try:
+        with av.open(str(audio_path)) as container:
+            if container.duration is None:
+                return None
+            return container.duration / av.time_base
+    except av.FFmpegError:
+        return None
+
+
+def _iter_stream_samples(audio_path: Path) -> Iterator[np.ndarray]:
+    av = _load_av()
+    if av is not None:
+        started = False
+        try:
+            for samples in _iter_decoded_samples(audio_path):
+                started = True
+                yield samples
+            return
+        except (av.FFmpegError, IndexError, ValueError):
+            if started:
+                raise
+    # ffmpeg fallback for formats PyAV cannot open.
+    yield from _iter_ffmpeg_samples(audio_path)
+
+
+def _iter_ffmpeg_samples(audio_path: Path, chunk_seconds: float = 1.0) -> Iterator[np.ndarray]:
+    # Same conversion as `whisper.load_audio`, but read from the pipe a second at a time instead of all at once.
+    _ensure_ffmpeg()
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0", "-i", str(audio_path),
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-",
+    ]  # fmt: skip
+    chunk_bytes = int(chunk_seconds * SAMPLE_RATE) * 2
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while chunk := process.stdout.read(chunk_bytes):
+            usable = len(chunk) - len(chunk) % 2
+            yield np.frombuffer(chunk[:usable], np.int16).astype(np.float32) / 32768.0
+        errors = process.stderr.read()
+        if process.wait() != 0:
+            raise RuntimeError(f"Failed to load audio: {errors.decode(errors='replace').strip()}")
+    finally:
+        # Also reached when the consumer stops early.
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def iter_audio_windows(
+    audio_path: Path,
+    window_seconds: float = STREAM_WINDOW_SECONDS,
+    overlap_seconds: float = STREAM_OVERLAP_SECONDS,
+) -> Iterator[np.ndarray]:
+    # Decodes incrementally into one window-sized buffer and yields it each time it fills up, keeping the
+    # last `overlap_seconds` for the next window. Memory stays at one window however long the recording is;
+    # each yielded array is only valid until the generator is resumed.
+    window = int(window_seconds * SAMPLE_RATE)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    if not 0 <= overlap < window:
+        raise ValueError("Stream overlap must be shorter than the window")
+    buffer = np.empty(window, dtype=np.float32)
+    length = 0
+    yielded = False
+    for samples in _iter_stream_samples(audio_path):
+        offset = 0
+        while offset < samples.shape[0]:
+            take = min(window - length, samples.shape[0] - offset)
+            buffer[length : length + take] = samples[offset : offset + take]
+            length += take
+            offset += take
+            if length == window:
+                yield buffer
+                yielded = True
+                buffer[:overlap] = buffer[window - overlap :]
+                length = overlap
+    if length > (overlap if yielded else 0):
+        yield buffer[:length]
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def merge_overlapping_text(previous: str, text: str, max_words: int = STREAM_MAX_OVERLAP_WORDS) -> str:
+    # Consecutive windows share audio, so `text` usually starts with the last words of `previous`.
+    tail = [_normalize_word(word) for word in previous.split()[-max_words:]]
+    words = text.split()
+    head = [_normalize_word(word) for word in words[:max_words]]
+    for size in range(min(len(tail), len(head)), 0, -1):
+        if tail[-size:] == head[:size]:
+            return " ".join(words[size:])
+    return " ".join(words)
+
+
+def transcribe_segments(
+    transcribe_window: Callable[[np.ndarray], str],
+    audio_path: Path,
+    window_seconds: float = STREAM_WINDOW_SECONDS,
+    overlap_seconds: float = STREAM_OVERLAP_SECONDS,
+    vad: VoiceActivityDetector | None = None,
+) -> Iterator[str]:
+    previous = ""
+    for index, window in enumerate(iter_audio_windows(audio_path, window_seconds, overlap_seconds)):
+        audio = window if vad is None else vad.trim(window, f"{audio_path.name} window {index + 1}")
+        if audio.shape[0] == 0:
+            previous = ""
+            continue
+        text = transcribe_window(audio).strip()
+        segment = merge_overlapping_text(previous, text)
+        previous = text
+        if segment:
+            yield segment
+
+
+def get_cache_max_bytes(environ: dict[str, str] | None = None) -> int:
+    environ = environ or os.environ
+    value = environ.get(CACHE_MAX_MB_ENV)
+    if value is None or value.strip() == "":
+        return DEFAULT_CACHE_MAX_MB * 1024 * 1024
+    try:
+        parsed = int(value)
+    except ValueError as exc:
+        raise ValueError(f"{CACHE_MAX_MB_ENV} must be an integer") from exc
+    if parsed < 0:
+        raise ValueError(f"{CACHE_MAX_MB_ENV} must not be negative")
+    return parsed * 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(CACHE_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_key(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def transcript_cache_key(
+    audio_hash: str,
+    model_name: str,
+    backend: str = DEFAULT_TRANSCRIBE_BACKEND,
+    vad_threshold_db: float | None = None,
+) -> str:
+    # Everything that changes the text for the same audio: backends differ in numerics (int8 vs fp32) and VAD
+    # changes what the model hears.
+    vad = "vad-off" if vad_threshold_db is None else f"vad{vad_threshold_db:g}"
+    return _cache_key("transcript", model_name, backend, vad, audio_hash)
+
+
+def intent_cache_key(transcript: str, alias: str, today: date) -> str:
+    return _cache_key("intent", alias, today.isoformat(), transcript.strip())
+
+
+class ContentCache:
+    # JSON entries under `root`, evicted least-recently-used first once `max_bytes` is exceeded.
+    # Recency is kept in file mtimes so the order survives restarts.
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Path, int] = OrderedDict()
+        self._total_bytes = 0
+        root.mkdir(parents=True, exist_ok=True)
+        existing = [(path.stat().st_mtime, path) for path in root.glob("*/*.json")]
+        for _, path in sorted(existing):
+            size = path.stat().st_size
+            self._entries[path] = size
+            self._total_bytes += size
+        with self._lock:
+            self._evict()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.root / namespace / f"{key}.json"
+
+    def get(self, namespace: str, key: str) -> object | None:
+        path = self._path(namespace, key)
+        with self._lock:
+            if path not in self._entries:
+                return None
+            try:
+                value = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                self._total_bytes -= self._entries.pop(path)
+                return None
+            self._entries.move_to_end(path)
+            os.utime(path)
+            return value
+
+    def put(self, namespace: str, key: str, value: object) -> None:
+        path = self._path(namespace, key)
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix(".tmp")
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+            self._total_bytes += len(data) - self._entries.pop(path, 0)
+            self._entries[path] = len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and self._entries:
+            path, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            path.unlink(missing_ok=True)
+
+
+class CachedTranscriber:
+    def __init__(
+        self,
+        cache: ContentCache,
+        transcribe_func: Callable[[Path], str],
+        transcribe_batch_func: Callable[[list[Path]], list[str]] | None = None,
+        model_name: str = DEFAULT_MODEL,
+        backend: str = DEFAULT_TRANSCRIBE_BACKEND,
+        vad_threshold_db: float | None = None,
+    ) -> None:
+        self._cache = cache
+        self._transcribe_func = transcribe_func
+        self._transcribe_batch_func = transcribe_batch_func
+        self._model_name = model_name
+        self._backend = backend
+        self._vad_threshold_db = vad_threshold_db
+
+    def _key(self, audio_path: Path) -> str:
+        return transcript_cache_key(hash_file(audio_path), self._model_name, self._backend, self._vad_threshold_db)
+
+    def transcribe(self, audio_path: Path) -> str:
+        key = self._key(audio_path)
+        cached = self._cache.get("transcripts", key)
+        if isinstance(cached, str):
+            return cached
+        transcript = self._transcribe_func(audio_path)
+        self._cache.put("transcripts", key, transcript)
+        return transcript
+
+    def transcribe_batch(self, audio_paths: list[Path]) -> list[str]:
+        keys = [self._key(audio_path) for audio_path in audio_paths]
+        transcripts: list[str | None] = []
+        for key in keys:
+            cached = self._cache.get("transcripts", key)
+            transcripts.append(cached if isinstance(cached, str) else None)
+        missing = [index for index, transcript in enumerate(transcripts) if transcript is None]
+        if missing:
+            missing_paths = [audio_paths[index] for index in missing]
+            if self._transcribe_batch_func is not None and len(missing_paths) > 1:
+                fresh = self._transcribe_batch_func(missing_paths)
+            else:
+                fresh = [self._transcribe_func(audio_path) for audio_path in missing_paths]
+            for index, transcript in zip(missing, fresh):
+                transcripts[index] = transcript
+                self._cache.put("transcripts", keys[index], transcript)
+        return [transcript or "" for transcript in transcripts]
+
+
+class CachedIntentExtractor:
+    # Keyed by transcript, model alias and UTC date: relative dates resolve differently on another day.
+    def __init__(
+        self,
+        cache: ContentCache,
+        intent_func: Callable[[str], IntentPayload | None],
+        alias: str,
+        intent_batch_func: Callable[[list[str]], list[IntentPayload | None]] | None = None,
+        intent_async_func: Callable[[str], Awaitable[IntentPayload | None]] | None = None,
+    ) -> None:
+        self._cache = cache
+        self._intent_func = intent_func
+        self._intent_batch_func = intent_batch_func
+        self._intent_async_func = intent_async_func
+        self._alias = alias
+
+    def _key(self, transcript: str) -> str:
+        return intent_cache_key(transcript, self._alias, datetime.now(timezone.utc).date())
+
+    def __call__(self, transcript: str) -> IntentPayload | None:
+        key = self._key(transcript)
+        cached = self._cache.get("intents", key)
+        if isinstance(cached, dict):
+            return cached  # type: ignore[return-value]
+        payload = self._intent_func(transcript)
+        if payload is not None:
+            self._cache.put("intents", key, payload)
+        return payload
+
+    async def extract_async(self, transcript: str) -> IntentPayload | None:
+        # Cache entries are small local files; reading them inline is cheaper than a thread hop.
+        key = self._key(transcript)
+        cached = self._cache.get("intents", key)
+        if isinstance(cached, dict):
+            return cached  # type: ignore[return-value]
+        if self._intent_async_func is None:
+            payload = await asyncio.to_thread(self._intent_func, transcript)
+        else:
+            payload = await self._intent_async_func(transcript)
+        if payload is not None:
+            self._cache.put("intents", key, payload)
+        return payload
+
+    def extract_batch(self, transcripts: list[str]) -> list[IntentPayload | None]:
+        keys = [self._key(transcript) for transcript in transcripts]
+        payloads: list[IntentPayload | None] = []
+        for key in keys:
+            cached = self._cache.get("intents", key)
+            payloads.append(cached if isinstance(cached, dict) else None)  # type: ignore[arg-type]
+        missing = [index for index, payload in enumerate(payloads) if payload is None]
+        if missing:
+            missing_transcripts = [transcripts[index] for index in missing]
+            if self._intent_batch_func is not None and len(missing_transcripts) > 1:
+                fresh = self._intent_batch_func(missing_transcripts)
+            else:
+                fresh = [self._intent_func(transcript) for transcript in missing_transcripts]
+            for index, payload in zip(missing, fresh):
+                payloads[index] = payload
+                if payload is not None:
+                    self._cache.put("intents", keys[index], payload)
+        return payloads
+
+
+def list_inbox_files(inbox_dir: Path) -> list[Path]:
+    if not inbox_dir.exists():
+        return []
+    return sorted([path for path in inbox_dir.iterdir() if path.is_file()])
+
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_Q_OVERFLOW = 0x00004000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_INOTIFY_EVENT = struct.Struct("iIII")
+_INOTIFY_READ_SIZE = 64 * 1024
+
+
+class InotifyWatcher:
+    # Reports files once they are fully written (close after write) or renamed into the inbox.
+    def __init__(self, directory: Path) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        watch = libc.inotify_add_watch(fd, os.fsencode(directory), _IN_CLOSE_WRITE | _IN_MOVED_TO)
+        if watch < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, os.strerror(errno), str(directory))
+        self.directory = directory
+        self._fd = fd
+        # Set when the kernel dropped events; the caller must fall back to a full rescan.
+        self.overflowed = False
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def wait(self, timeout_seconds: float) -> list[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout_seconds)
+        if not ready:
+            return []
+        changed: dict[Path, None] = {}
+        while True:
+            try:
+                data = os.read(self._fd, _INOTIFY_READ_SIZE)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, mask, _, name_length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                name = data[offset : offset + name_length].rstrip(b"\0")
+                offset += name_length
+                if mask & _IN_Q_OVERFLOW:
+                    self.overflowed = True
+                elif name:
+                    changed[self.directory / os.fsdecode(name)] = None
+        return list(changed)
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_inbox_watcher(config: AppConfig, logger: logging.Logger) -> InotifyWatcher | None:
+    if config.watch_mode == "poll":
+        return None
+    if not sys.platform.startswith("linux"):
+        if config.watch_mode == "inotify":
+            raise ValueError(f"{WATCH_MODE_ENV}=inotify is only supported on Linux")
+        return None
+    try:
+        return InotifyWatcher(config.inbox_dir)
+    except (OSError, AttributeError) as exc:
+        if config.watch_mode == "inotify":
+            raise
+        logger.warning("inotify unavailable (%s); falling back to polling.", exc)
+        return None
+
+
+def _is_mp3(path: Path) -> bool:
+    return path.suffix.lower() == ".mp3"
+
+
+def _is_readable(path: Path) -> bool:
+    try:
+        with path.open("rb"):
+            return True
+    except OSError:
+        return False
+
+
+@dataclass
+class InboxJob:
+    sequence: int
+    audio_path: Path
+    transcript: str | None = None
+    intent_payload: IntentPayload | None = None
+    intent_path: Path | None = None
+    webhook_queued: bool = False
+    journal_key: str | None = None
+    failed: bool = False
+    silent: bool = False
+    correlation_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    started_at: float = field(default_factory=time.perf_counter)
+
+    def log_context(self, stage: str) -> AbstractContextManager[None]:
+        return log_context(file=self.audio_path.name, stage=stage, correlation_id=self.correlation_id)
+
+
+def journal_key(audio_path: Path) -> str:
+    stat = audio_path.stat()
+    return f"{audio_path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class JobJournal:
+    # Append-only record of completed stages per inbox file (SQLite in WAL mode under .work).
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS job_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "job_key TEXT NOT NULL, "
+            "stage TEXT NOT NULL, "
+            "data TEXT NOT NULL, "
+            "recorded_at TEXT NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS job_events_key ON job_events (job_key)")
+
+    def record(self, key: str, stage: str, data: dict[str, object] | None = None) -> None:
+        if stage not in JOURNAL_STAGES:
+            raise ValueError(f"Unknown journal stage: {stage}")
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO job_events (job_key, stage, data, recorded_at) VALUES (?, ?, ?, ?)",
+                (
+                    key,
+                    stage,
+                    json.dumps(data or {}, ensure_ascii=False),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def completed_stages(self, key: str) -> dict[str, dict[str, object]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT stage, data FROM job_events WHERE job_key = ? ORDER BY id",
+                (key,),
+            ).fetchall()
+        return {stage: json.loads(data) for stage, data in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def _resume_job(job: InboxJob, journal: JobJournal, logger: logging.Logger) -> None:
+    job.journal_key = journal_key(job.audio_path)
+    stages = journal.completed_stages(job.journal_key)
+    if "transcribed" in stages:
+        job.transcript = str(stages["transcribed"]["transcript"])
+    written = stages.get("intent_written")
+    if written is not None and Path(str(written["intent_path"])).exists():
+        job.intent_payload = written["payload"]  # type: ignore[assignment]
+        job.intent_path = Path(str(written["intent_path"]))
+    job.webhook_queued = "webhook_queued" in stages
+    if stages:
+        last_stage = next(stage for stage in reversed(JOURNAL_STAGES) if stage in stages)
+        logger.info("Resuming %s after stage: %s", job.audio_path.name, last_stage)
+
+
+class _OrderedRelease:
+    # Reorder buffer: hands jobs back strictly by sequence number, holding early arrivals.
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self._pending: dict[int, InboxJob] = {}
+        self._next = 0
+
+    def push(self, job: InboxJob) -> list[InboxJob]:
+        self._pending[job.sequence] = job
+        ready: list[InboxJob] = []
+        while self._next in self._pending:
+            ready.append(self._pending.pop(self._next))
+            self._next += 1
+        return ready
+
+
+_STAGE_DONE = object()
+
+
+def _drain_queue(source: queue.Queue, limit: int) -> list[object]:
+    # Whatever is already waiting, up to `limit` items, without blocking; the end marker stays queued.
+    items: list[object] = []
+    while len(items) < limit:
+        try:
+            item = source.get_nowait()
+        except queue.Empty:
+            break
+        if item is _STAGE_DONE:
+            source.put(_STAGE_DONE)
+            break
+        items.append(item)
+    return items
+
+
+def _fail_job(logger: logging.Logger, job: InboxJob, stage: str, exc: BaseException) -> None:
+    with job.log_context(stage):
+        logger.error("%s stage failed for %s: %s", stage.capitalize(), job.audio_path.name, exc, exc_info=exc)
+    METRICS.increment("voice_inbox_failures_total", stage=stage)
+    job.failed = True
+
+
+def _stage_worker(
+    handler: Callable[..., list[InboxJob] | None],
+    source: queue.Queue,
+    sink: queue.Queue | None,
+    drain: int = 1,
+    logger: logging.Logger | None = None,
+) -> None:
+    stage = handler.__name__.removesuffix("_stage")
+    while True:
+        item = source.get()
+        METRICS.set_gauge("voice_inbox_queue_depth", source.qsize(), stage=stage)
+        if item is _STAGE_DONE:
+            # Let sibling workers of this stage see the end marker as well.
+            source.put(_STAGE_DONE)
+            return
+        if drain > 1:
+            # A backlog is handed over as one batch; a lone job is not held back waiting for company.
+            item = [item, *_drain_queue(source, drain - 1)]
+        forwarded = None
+        try:
+            forwarded = handler(item)
+        except Exception as exc:
+            # The job is failed and still passed on: a dead worker would stall every later job and the scan.
+            for job in item if isinstance(item, list) else [item]:
+                _fail_job(logger or logging.getLogger("voice_inbox"), job, stage, exc)
+        if sink is not None:
+            # The transcription stage receives batches; later stages see single jobs.
+            # A handler may return the jobs to pass on instead (the ordered output stage does).
+            if forwarded is None:
+                forwarded = item if isinstance(item, list) else [item]
+            for job in forwarded:
+                sink.put(job)
+
+
+async def _drive_async_stage(
+    handler: Callable[[InboxJob], Awaitable[InboxJob]],
+    stage: str,
+    source: queue.Queue,
+    sink: queue.Queue | None,
+    concurrency: int,
+    logger: logging.Logger,
+) -> None:
+    # Keeps up to `concurrency` jobs inside `handler` at once and passes each on as soon as it finishes.
+    # The blocking queue operations run in threads so they never stall the jobs in flight.
+    in_flight: dict[asyncio.Future, InboxJob] = {}
+    getter: asyncio.Future | None = None
+    finished_input = False
+    while not finished_input or in_flight:
+        if getter is None and not finished_input and len(in_flight) < concurrency:
+            getter = asyncio.ensure_future(asyncio.to_thread(source.get))
+        waiting = set(in_flight) if getter is None else {*in_flight, getter}
+        done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task is getter:
+                getter = None
+                item = task.result()
+                METRICS.set_gauge("voice_inbox_queue_depth", source.qsize(), stage=stage)
+                if item is _STAGE_DONE:
+                    source.put(_STAGE_DONE)
+                    finished_input = True
+                else:
+                    in_flight[asyncio.ensure_future(handler(item))] = item
+                continue
+            job = in_flight.pop(task)
+            try:
+                task.result()
+            except (Exception, asyncio.CancelledError) as exc:
+                # As in `_stage_worker`: the job is failed and passed on, the other jobs keep going.
+                _fail_job(logger, job, stage, exc)
+            if sink is not None:
+                await asyncio.to_thread(sink.put, job)
+
+
+def _async_stage_worker(
+    handler: Callable[[InboxJob], Awaitable[InboxJob]],
+    stage: str,
+    source: queue.Queue,
+    sink: queue.Queue | None,
+    concurrency: int,
+    loop: EventLoopThread | None,
+    logger: logging.Logger,
+) -> None:
+    driver = _drive_async_stage(handler, stage, source, sink, concurrency, logger)
+    if loop is None:
+        # Fine for an async function created for this call; a longer-lived client needs its own loop passed in.
+        asyncio.run(driver)
+    else:
+        loop.run(driver)
+
+
+def _accept_inbox_file(
+    audio_path: Path,
+    logger: logging.Logger,
+    warned_non_mp3: set[Path],
+) -> bool:
+    if not _is_mp3(audio_path):
+        if audio_path not in warned_non_mp3:
+            logger.warning("Ignoring non-MP3 file: %s", audio_path.name)
+            warned_non_mp3.add(audio_path)
+        return False
+    if not _is_readable(audio_path):
+        logger.error("File is locked or unreadable: %s", audio_path.name)
+        return False
+    return True
+
+
+def process_inbox_once(
+    config: AppConfig,
+    logger: logging.Logger,
+    transcribe_func: Callable[[Path], str],
+    warned_non_mp3: set[Path],
+    intent_func: Callable[[str], IntentPayload | None] = extract_intent,
+    paths: Iterable[Path] | None = None,
+    transcribe_batch_func: Callable[[list[Path]], list[str]] | None = None,
+    journal: JobJournal | None = None,
+    webhook_delivery: WebhookDelivery | None = None,
+    intent_batch_func: Callable[[list[str]], list[IntentPayload | None]] | None = None,
+    intent_async_func: Callable[[str], Awaitable[IntentPayload | None]] | None = None,
+    intent_loop: EventLoopThread | None = None,
+) -> None:
+    with METRICS.time("voice_inbox_scan_seconds"):
+        candidates = (
+            list_inbox_files(config.inbox_dir)
+            if paths is None
+            else sorted({path for path in paths if path.is_file()})
+        )
+        accepted = [path for path in candidates if _accept_inbox_file(path, logger, warned_non_mp3)]
+    if not accepted:
+        return
+
+    def transcribe_one(job: InboxJob) -> None:
+        with job.log_context("transcribe"):
+            try:
+                transcript = transcribe_func(job.audio_path)
+            except Exception as exc:  # pragma: no cover - defensive guard
+                logger.error("Transcription failed for %s: %s", job.audio_path.name, exc)
+                METRICS.increment("voice_inbox_failures_total", stage="transcribe")
+                job.failed = True
+                return
+            _record_transcript(job, transcript)
+
+    def _record_transcript(job: InboxJob, transcript: str) -> None:
+        logger.info("Transcript for %s: %s", job.audio_path.name, transcript.strip())
+        job.transcript = transcript
+        if journal is not None and job.journal_key is not None:
+            journal.record(job.journal_key, "transcribed", {"transcript": transcript})
+
+    def transcribe_stage(batch: list[InboxJob]) -> None:
+        batch = [job for job in batch if job.transcript is None]
+        if transcribe_batch_func is None or len(batch) < 2:
+            for job in batch:
+                transcribe_one(job)
+            return
+        try:
+            transcripts = transcribe_batch_func([job.audio_path for job in batch])
+        except Exception as exc:
+            logger.error("Batch transcription failed (%s); transcribing files one by one.", exc)
+            METRICS.increment("voice_inbox_retries_total", stage="transcribe")
+            for job in batch:
+                transcribe_one(job)
+            return
+        for job, transcript in zip(batch, transcripts):
+            with job.log_context("transcribe"):
+                _record_transcript(job, transcript)
+
+    def intent_stage(jobs: InboxJob | list[InboxJob]) -> None:
+        batch = [
+            job
+            for job in (jobs if isinstance(jobs, list) else [jobs])
+            if not job.failed and not job.silent and job.intent_payload is None
+        ]
+        spoken = [job for job in batch if (job.transcript or "").strip()]
+        if intent_batch_func is not None and len(spoken) >= 2:
+            try:
+                payloads = intent_batch_func([job.transcript or "" for job in spoken])
+            except Exception as exc:
+                logger.error("Batch intent extraction failed (%s); extracting intents one by one.", exc)
+                METRICS.increment("voice_inbox_retries_total", stage="intent")
+            else:
+                # The batch function already retried its failures one by one.
+                for job, payload in zip(spoken, payloads):
+                    with job.log_context("intent"):
+                        _record_intent(job, payload)
+        for job in batch:
+            if not job.failed and not job.silent and job.intent_payload is None:
+                with job.log_context("intent"):
+                    _extract_job_intent(job)
+
+    def _extract_job_intent(job: InboxJob) -> None:
+        if not (job.transcript or "").strip():
+            _skip_silent_job(job)
+            return
+        payload = None
+        try:
+            payload = intent_func(job.transcript or "")
+        except Exception as exc:  # pragma: no cover - defensive guard
+            logger.error("Intent extraction failed for %s: %s", job.audio_path.name, exc)
+        _record_intent(job, payload)
+
+    async def async_intent_stage(job: InboxJob) -> InboxJob:
+        if job.failed or job.silent or job.intent_payload is not None:
+            return job
+        with job.log_context("intent"):
+            if not (job.transcript or "").strip():
+                _skip_silent_job(job)
+                return job
+            payload = None
+            try:
+                payload = await intent_async_func(job.transcript or "")
+            except Exception as exc:  # pragma: no cover - defensive guard
+                logger.error("Intent extraction failed for %s: %s", job.audio_path.name, exc)
+            _record_intent(job, payload)
+        return job
+
+    def _skip_silent_job(job: InboxJob) -> None:
+        # Nothing was said (e.g. VAD found only silence): the file is archived without the LLM or an intent file.
+        logger.info("Empty transcript for %s; archiving it without an intent.", job.audio_path.name)
+        job.silent = True
+
+    def _record_intent(job: InboxJob, payload: IntentPayload | None) -> None:
+        job.intent_payload = payload
+        if payload is None:
+            logger.error("Intent extraction failed for %s", job.audio_path.name)
+            METRICS.increment("voice_inbox_failures_total", stage="intent")
+            job.failed = True
+
+    ordered_outputs = _OrderedRelease()
+
+    def output_stage(job: InboxJob) -> list[InboxJob]:
+        # Intent files are written in inbox order regardless of which worker finished first.
+        with ordered_outputs.lock:
+            ready = ordered_outputs.push(job)
+            for ready_job in ready:
+                with ready_job.log_context("output"):
+                    try:
+                        _write_job_output(config, logger, ready_job, journal)
+                    except Exception as exc:
+                        # Released jobs are no longer buffered; each must reach the archive stage on its own.
+                        _fail_job(logger, ready_job, "output", exc)
+        for ready_job in ready:
+            with ready_job.log_context("webhook"):
+                try:
+                    _deliver_job_webhook(logger, ready_job, journal, webhook_delivery)
+                except Exception as exc:
+                    _fail_job(logger, ready_job, "webhook", exc)
+        return ready
+
+    def archive_stage(job: InboxJob) -> None:
+        if job.failed or (job.intent_path is None and not job.silent):
+            return
+        with job.log_context("archive"):
+            _archive_job(job)
+
+    def _archive_job(job: InboxJob) -> None:
+        destination = build_processed_destination(
+            job.intent_path or Path(build_intent_filename(datetime.now(timezone.utc))),
+            job.audio_path.name,
+            config.processed_dir,
+        )
+        if destination.exists():
+            logger.error("Processed destination already exists: %s", destination)
+            METRICS.increment("voice_inbox_failures_total", stage="archive")
+            return
+        try:
+            with METRICS.time("voice_inbox_move_seconds"):
+                shutil.move(str(job.audio_path), str(destination))
+            logger.info("Moved processed file to %s", destination)
+        except Exception as exc:  # pragma: no cover - defensive guard
+            logger.error("Failed to move %s to processed folder: %s", job.audio_path.name, exc)
+            METRICS.increment("voice_inbox_failures_total", stage="archive")
+            return
+        METRICS.increment("voice_inbox_files_processed_total")
+        if journal is not None and job.journal_key is not None:
+            journal.record(job.journal_key, "archived", {"destination": str(destination)})
+        duration = time.perf_counter() - job.started_at
+        logger.info("Processed %s in %.2fs", job.audio_path.name, duration, extra={"duration": duration})
+
+    # Before any stage worker starts: a file that disappears here must not leave them waiting.
+    jobs: list[InboxJob] = []
+    for audio_path in accepted:
+        job = InboxJob(sequence=len(jobs), audio_path=audio_path)
+        if journal is not None:
+            try:
+                _resume_job(job, journal, logger)
+            except OSError as exc:
+                logger.warning("Skipping %s: %s", audio_path.name, exc)
+                continue
+        jobs.append(job)
+    if not jobs:
+        return
+
+    settings = config.pipeline
+    stages: list[tuple[Callable[..., list[InboxJob] | None], int]] = [
+        (transcribe_stage, settings.transcribe_workers),
+        (intent_stage, settings.intent_workers),
+        (output_stage, settings.output_workers),
+        (archive_stage, settings.archive_workers),
+    ]
+    queues: list[queue.Queue] = [queue.Queue(maxsize=settings.queue_size) for _ in stages]
+    workers: list[list[threading.Thread]] = []
+    for index, (handler, count) in enumerate(stages):
+        sink = queues[index + 1] if index + 1 < len(queues) else None
+        if handler is intent_stage and intent_async_func is not None:
+            # One event loop keeps `intent_concurrency` transcripts in flight instead of a thread per request.
+            thread = threading.Thread(
+                target=_async_stage_worker,
+                args=(
+                    async_intent_stage, "intent", queues[index], sink, settings.intent_concurrency, intent_loop, logger
+                ),
+                name="inbox-intent_stage-async",
+                daemon=True,
+            )
+            thread.start()
+            workers.append([thread])
+            continue
+        drain = settings.intent_batch_size if handler is intent_stage and intent_batch_func is not None else 1
+        stage_threads = [
+            threading.Thread(
+                target=_stage_worker,
+                args=(handler, queues[index], sink, drain, logger),
+                name=f"inbox-{handler.__name__}-{worker}",
+                daemon=True,
+            )
+            for worker in range(count)
+        ]
+        for thread in stage_threads:
+            thread.start()
+        workers.append(stage_threads)
+
+    batch_size = settings.transcribe_batch_size if transcribe_batch_func is not None else 1
+    for start in range(0, len(jobs), batch_size):
+        queues[0].put(jobs[start : start + batch_size])
+    for index, stage_threads in enumerate(workers):
+        queues[index].put(_STAGE_DONE)
+        for thread in stage_threads:
+            thread.join()
+
+
+def _write_job_output(
+    config: AppConfig,
+    logger: logging.Logger,
+    job: InboxJob,
+    journal: JobJournal | None = None,
+) -> None:
+    if job.failed or job.intent_payload is None or job.intent_path is not None:
+        return
+    try:
+        job.intent_path = write_intent_output(config.work_dir, job.intent_payload)
+    except Exception as exc:  # pragma: no cover - defensive guard
+        logger.error("Failed to write intent output for %s: %s", job.audio_path.name, exc)
+        METRICS.increment("voice_inbox_failures_total", stage="output")
+        job.failed = True
+        return
+    logger.info("Intent output written to %s", job.intent_path)
+    if journal is not None and job.journal_key is not None:
+        journal.record(
+            job.journal_key,
+            "intent_written",
+            {"intent_path": str(job.intent_path), "payload": dict(job.intent_payload)},
+        )
+
+
+def _deliver_job_webhook(
+    logger: logging.Logger,
+    job: InboxJob,
+    journal: JobJournal | None = None,
+    webhook_delivery: WebhookDelivery | None = None,
+) -> None:
+    if job.failed or job.intent_payload is None or job.webhook_queued:
+        return
+    if job.intent_payload.get("intent") != "create-task":
+        return
+    try:
+        webhook_url = get_create_todo_webhook_url()
+        if webhook_url is None and webhook_delivery is not None:
+            # In batch mode the delivery subsystem posts to the batch URL; a single-item URL is optional.
+            webhook_url = get_create_todo_batch_webhook_url()
+    except ValueError as exc:
+        logger.error("%s", exc)
+        return
+    if webhook_url is None:
+        logger.error("%s is not set.", CREATE_TODO_WEBHOOK_ENV)
+        return
+    payload = build_create_todo_payload(job.intent_payload)
+    if webhook_delivery is not None:
+        # Once in the durable outbox, delivery and retries belong to the delivery subsystem. The id follows the
+        # file, so a crash before the journal entry below does not queue the same to-do twice on resume.
+        delivery_id = None
+        if job.journal_key is not None:
+            delivery_id = f"{hashlib.sha256(job.journal_key.encode('utf-8')).hexdigest()[:24]}-create-task"
+        webhook_delivery.submit(webhook_url, payload, source=job.audio_path.name, delivery_id=delivery_id)
+        job.webhook_queued = True
+    else:
+        job.webhook_queued = send_create_todo_webhook(webhook_url, payload, logger)
+        if not job.webhook_queued:
+            METRICS.increment("voice_inbox_failures_total", stage="webhook")
+    if job.webhook_queued and journal is not None and job.journal_key is not None:
+        journal.record(job.journal_key, "webhook_queued")
+
+
+def run_inbox_loop(
+    config: AppConfig,
+    logger: logging.Logger,
+    transcribe_func: Callable[[Path], str],
+    intent_func: Callable[[str], IntentPayload | None],
+    watcher: InotifyWatcher | None,
+    stop_event: threading.Event | None = None,
+    transcribe_batch_func: Callable[[list[Path]], list[str]] | None = None,
+    journal: JobJournal | None = None,
+    webhook_delivery: WebhookDelivery | None = None,
+    intent_batch_func: Callable[[list[str]], list[IntentPayload | None]] | None = None,
+    intent_async_func: Callable[[str], Awaitable[IntentPayload | None]] | None = None,
+    intent_loop: EventLoopThread | None = None,
+) -> None:
+    stop_event = stop_event or threading.Event()
+    warned_non_mp3: set[Path] = set()
+    process_inbox_once(
+        config,
+        logger,
+        transcribe_func,
+        warned_non_mp3,
+        intent_func,
+        transcribe_batch_func=transcribe_batch_func,
+        journal=journal,
+        webhook_delivery=webhook_delivery,
+        intent_batch_func=intent_batch_func,
+        intent_async_func=intent_async_func,
+        intent_loop=intent_loop,
+    )
+    next_rescan = time.monotonic() + config.scan_interval_seconds
+    while not stop_event.is_set():
+        if watcher is None:
+            if stop_event.wait(config.scan_interval_seconds):
+                break
+            changed = None
+        else:
+            # Full rescans run on a fixed schedule, even under steady event traffic, so files left behind by
+            # failures are retried; a queue overflow means events were dropped and forces one immediately.
+            changed = watcher.wait(max(0.0, next_rescan - time.monotonic())) or None
+            if watcher.overflowed:
+                logger.warning("Inotify event queue overflowed; rescanning the inbox")
+                watcher.overflowed = False
+                changed = None
+            elif time.monotonic() >= next_rescan:
+                changed = None
+            if changed is None:
+                next_rescan = time.monotonic() + config.scan_interval_seconds
+        process_inbox_once(
+            config,
+            logger,
+            transcribe_func,
+            warned_non_mp3,
+            intent_func,
+            paths=changed,
+            transcribe_batch_func=transcribe_batch_func,
+            journal=journal,
+            webhook_delivery=webhook_delivery,
+            intent_batch_func=intent_batch_func,
+            intent_async_func=intent_async_func,
+            intent_loop=intent_loop,
+        )
+
+
+def main() -> None:
+    load_dotenv()
+    config = load_config()
+    ensure_directories(config)
+    logger = setup_logging(
+        config.work_dir,
+        log_format=get_log_format(),
+        max_bytes=_parse_positive_int(os.environ.get(LOG_MAX_MB_ENV), LOG_MAX_MB_ENV, DEFAULT_LOG_MAX_MB)
+        * 1024
+        * 1024,
+        backup_count=_parse_positive_int(os.environ.get(LOG_BACKUPS_ENV), LOG_BACKUPS_ENV, DEFAULT_LOG_BACKUPS),
+    )
+    logger.info("Voice inbox scanner started. Inbox: %s", config.inbox_dir)
+    whisper_processes = get_whisper_process_count()
+    whisper_pool: WhisperProcessPool | None = None
+    vad = VoiceActivityDetector(get_vad_threshold_db(), logger) if get_vad_enabled() else None
+    transcribe_backend = get_transcribe_backend()
+    if whisper_processes > 0:
+        whisper_pool = WhisperProcessPool(
+            whisper_processes,
+            logger=logger,
+            vad=vad,
+            stream_min_seconds=get_stream_min_seconds(),
+        )
+        transcribe_func: Callable[[Path], str] = whisper_pool.transcribe
+        transcribe_batch_func: Callable[[list[Path]], list[str]] | None = None
+        # Keep every worker process busy: one transcription stage thread per process.
+        config = replace(
+            config,
+            pipeline=replace(
+                config.pipeline,
+                transcribe_workers=max(config.pipeline.transcribe_workers, whisper_processes),
+            ),
+        )
+    else:
+        transcriber = WhisperTranscriber(
+            vad=vad,
+            backend_loader=lambda model_name: load_transcription_backend(model_name, transcribe_backend),
+            stream_min_seconds=get_stream_min_seconds(),
+            logger=logger,
+        )
+        transcribe_func = transcriber.transcribe
+        transcribe_batch_func = transcriber.transcribe_batch
+    intent_engine = IntentEngine()
+    intent_func: Callable[[str], IntentPayload | None] = intent_engine.extract
+    intent_batch_func: Callable[[list[str]], list[IntentPayload | None]] | None = None
+    intent_async_func: Callable[[str], Awaitable[IntentPayload | None]] | None = None
+    async_intent_engine: AsyncIntentEngine | None = None
+    intent_loop: EventLoopThread | None = None
+    if config.pipeline.intent_batch_size > 1:
+        intent_batch_func = intent_engine.extract_batch
+        # The intent stage can only batch what its input queue holds.
+        config = replace(
+            config,
+            pipeline=replace(
+                config.pipeline,
+                queue_size=max(config.pipeline.queue_size, config.pipeline.intent_batch_size),
+            ),
+        )
+    elif config.pipeline.intent_concurrency > 1:
+        # Several single-note requests in flight on one event loop; the sync engine still does the warm-up.
+        intent_loop = EventLoopThread("intent-loop")
+        async_intent_engine = AsyncIntentEngine(
+            alias=intent_engine.alias,
+            mode=intent_engine.mode,
+            concurrency=config.pipeline.intent_concurrency,
+        )
+        intent_async_func = async_intent_engine.extract
+    idle_timeout = get_model_idle_timeout()
+    residency: ModelResidency | None = None
+    if idle_timeout > 0:
+        # Guard the model calls themselves, beneath the caches, so cache hits do not keep a model resident.
+        # Pool workers own their models in separate processes and are not managed here.
+        residency = ModelResidency(idle_timeout, logger)
+        if async_intent_engine is None:
+            residency.register(INTENT_RESIDENCY_NAME, intent_engine.unload)
+        else:
+
+            def unload_intent_engines() -> None:
+                intent_engine.reset()
+                async_intent_engine.unload()
+
+            residency.register(INTENT_RESIDENCY_NAME, unload_intent_engines)
+            intent_async_func = residency.guard_async(INTENT_RESIDENCY_NAME, intent_async_func)
+        intent_func = residency.guard(INTENT_RESIDENCY_NAME, intent_func)
+        if intent_batch_func is not None:
+            intent_batch_func = residency.guard(INTENT_RESIDENCY_NAME, intent_batch_func)
+        if whisper_pool is None:
+            residency.register(WHISPER_RESIDENCY_NAME, transcriber.unload)
+            transcribe_func = residency.guard(WHISPER_RESIDENCY_NAME, transcribe_func)
+            transcribe_batch_func = residency.guard(WHISPER_RESIDENCY_NAME, transcriber.transcribe_batch)
+    cache_max_bytes = get_cache_max_bytes()
+    if cache_max_bytes > 0:
+        cache = ContentCache(config.work_dir / CACHE_DIR_NAME, cache_max_bytes)
+        cached_transcriber = CachedTranscriber(
+            cache,
+            transcribe_func,
+            transcribe_batch_func,
+            backend=transcribe_backend,
+            vad_threshold_db=vad.threshold_db if vad is not None else None,
+        )
+        transcribe_func = cached_transcriber.transcribe
+        if transcribe_batch_func is not None:
+            transcribe_batch_func = cached_transcriber.transcribe_batch
+        cached_intents = CachedIntentExtractor(
+            cache, intent_func, intent_engine.alias, intent_batch_func, intent_async_func
+        )
+        intent_func = cached_intents
+        if intent_batch_func is not None:
+            intent_batch_func = cached_intents.extract_batch
+        if intent_async_func is not None:
+            intent_async_func = cached_intents.extract_async
+    if get_intent_fast_path_enabled():
+        fast_path = FastPathIntentExtractor(intent_func, logger, intent_batch_func, intent_async_func)
+        intent_func = fast_path
+        if intent_batch_func is not None:
+            intent_batch_func = fast_path.extract_batch
+        if intent_async_func is not None:
+            intent_async_func = fast_path.extract_async
+    loaders: dict[str, Callable[[], object]] = {}
+    if get_prewarm_enabled() and whisper_pool is None:
+        # Otherwise the transcription model loads on first use, keeping startup and empty-inbox scans fast.
+        loaders["transcription model"] = lambda: transcriber.backend
+    prime_prompt = get_prompt_warmup_enabled()
+    if prime_prompt or get_prewarm_enabled():
+        # The prompt warm-up needs the intent model, so by default that one is loaded in the background too:
+        # otherwise the first note pays for the cold prompt prefix.
+        loaders["intent model"] = functools.partial(intent_engine.warm_up, prime_prompt=prime_prompt)
+    if loaders:
+        if residency is not None:
+            names = {"intent model": INTENT_RESIDENCY_NAME, "transcription model": WHISPER_RESIDENCY_NAME}
+            loaders = {label: residency.guard(names[label], loader) for label, loader in loaders.items()}
+        start_prewarm(loaders, logger)
+    metrics_server: http.server.ThreadingHTTPServer | None = None
+    metrics_address = get_metrics_address()
+    if metrics_address is not None:
+        METRICS.gauge_callback(
+            "voice_inbox_resident_memory_bytes", lambda: {(): process_resident_bytes() or 0}
+        )
+        if residency is not None:
+            METRICS.gauge_callback(
+                "voice_inbox_model_resident",
+                lambda: {(("model", stats.name),): int(stats.resident) for stats in residency.stats()},
+            )
+        metrics_server = start_metrics_server(metrics_address)
+        logger.info("Metrics endpoint: http://%s:%s%s", *metrics_address, METRICS_PATH)
+    watcher = create_inbox_watcher(config, logger)
+    logger.info("Inbox watch mode: %s", "inotify" if watcher else "poll")
+    journal = JobJournal(config.work_dir / JOURNAL_FILE_NAME)
+    webhook_delivery = WebhookDelivery(
+        config.work_dir / WEBHOOK_OUTBOX_DIR_NAME,
+        logger,
+        per_endpoint_concurrency=_parse_positive_int(
+            os.environ.get(WEBHOOK_CONCURRENCY_ENV), WEBHOOK_CONCURRENCY_ENV, DEFAULT_WEBHOOK_CONCURRENCY
+        ),
+        max_attempts=_parse_positive_int(
+            os.environ.get(WEBHOOK_MAX_ATTEMPTS_ENV), WEBHOOK_MAX_ATTEMPTS_ENV, DEFAULT_WEBHOOK_MAX_ATTEMPTS
+        ),
+        batch_url=get_create_todo_batch_webhook_url(),
+        batch_size=_parse_positive_int(
+            os.environ.get(WEBHOOK_BATCH_SIZE_ENV), WEBHOOK_BATCH_SIZE_ENV, DEFAULT_WEBHOOK_BATCH_SIZE
+        ),
+        batch_window_seconds=_parse_positive_int(
+            os.environ.get(WEBHOOK_BATCH_WINDOW_ENV), WEBHOOK_BATCH_WINDOW_ENV, DEFAULT_WEBHOOK_BATCH_WINDOW_MS
+        )
+        / 1000,
+    )
+    METRICS.gauge_callback(
+        "voice_inbox_queue_depth", lambda: {(("stage", "webhook_outbox"),): webhook_delivery.pending()}
+    )
+
+    try:
+        run_inbox_loop(
+            config,
+            logger,
+            transcribe_func,
+            intent_func,
+            watcher,
+            transcribe_batch_func=transcribe_batch_func,
+            journal=journal,
+            webhook_delivery=webhook_delivery,
+            intent_batch_func=intent_batch_func,
+            intent_async_func=intent_async_func,
+            intent_loop=intent_loop,
+        )
+    except KeyboardInterrupt:
+        logger.info("Shutdown requested. Exiting.")
+    finally:
+        if watcher is not None:
+            watcher.close()
+        if whisper_pool is not None:
+            whisper_pool.close()
+        if residency is not None:
+            residency.close()
+            for model_stats in residency.stats():
+                logger.info(
+                    "Model %s: %s loads, %s idle unloads, %s reclaimed",
+                    model_stats.name,
+                    model_stats.loads,
+                    model_stats.unloads,
+                    _format_bytes(model_stats.reclaimed_bytes),
+                )
+        intent_engine.close()
+        if intent_loop is not None:
+            intent_loop.run(async_intent_engine.close())
+            intent_loop.close()
+        webhook_delivery.close()
+        journal.close()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+            metrics_server.server_close()
+        if vad is not None:
+            vad_stats = vad.stats()
+            logger.info(
+                "VAD: %.1fs of %.1fs audio removed, %s silent files skipped, ~%.1fs inference saved",
+                vad_stats.removed_seconds,
+                vad_stats.audio_seconds,
+                vad_stats.silent_files,
+                vad_stats.saved_seconds,
+            )
+        # Last: records logged after the listener stops are dropped.
+        stop_logging()
 
 
 if __name__ == "__main__":
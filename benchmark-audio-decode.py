@@ -0,0 +1,46 @@
+import argparse
+import shutil
+import statistics
+import time
+from pathlib import Path
+
+import whisper
+
+from app import AudioDecoder
+
+
+def _measure(decode, paths: list[Path], repeats: int) -> list[float]:
+    latencies: list[float] = []
+    for _ in range(repeats):
+        for path in paths:
+            started = time.perf_counter()
+            decode(path)
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _report(label: str, latencies: list[float]) -> None:
+    print(
+        f"{label:<32} mean={statistics.mean(latencies) * 1000:8.2f} ms  "
+        f"p50={statistics.median(latencies) * 1000:8.2f} ms  "
+        f"max={max(latencies) * 1000:8.2f} ms  files={len(latencies)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-file decode cost: ffmpeg subprocess vs. in-process decoder.")
+    parser.add_argument("paths", nargs="*", type=Path, help="MP3 files (default: audio_samples/*.mp3).")
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+    paths = args.paths or sorted(Path("audio_samples").glob("*.mp3"))
+
+    if shutil.which("ffmpeg"):
+        _report("before (ffmpeg per file)", _measure(lambda path: whisper.load_audio(str(path)), paths, args.repeats))
+    else:
+        print("before (ffmpeg per file)         skipped: ffmpeg not found on PATH")
+    decoder = AudioDecoder()
+    _report("after (in-process, reused buffer)", _measure(decoder.decode, paths, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
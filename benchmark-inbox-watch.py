@@ -0,0 +1,91 @@
+import argparse
+import logging
+import statistics
+import tempfile
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from app import AppConfig, create_inbox_watcher, run_inbox_loop
+
+
+def _measure(mode: str, notes: int, poll_interval: float, gap_seconds: float) -> list[float]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        config = AppConfig(
+            inbox_dir=root / "inbox",
+            processed_dir=root / "processed",
+            work_dir=root / ".work",
+            scan_interval_seconds=30,
+            watch_mode=mode,
+        )
+        for directory in (config.inbox_dir, config.processed_dir, config.work_dir, root / "staging"):
+            directory.mkdir(parents=True)
+        logger = logging.getLogger("benchmark_inbox_watch")
+        logger.addHandler(logging.NullHandler())
+        logger.propagate = False
+
+        dropped: dict[str, float] = {}
+        latencies: list[float] = []
+        picked_up = threading.Event()
+
+        def transcribe(path: Path) -> str:
+            latencies.append(time.perf_counter() - dropped[path.name])
+            picked_up.set()
+            return "hello"
+
+        def intent(_: str) -> dict[str, str]:
+            return {"intent": "create-note", "content": "hello"}
+
+        watcher = create_inbox_watcher(config, logger)
+        # Polling uses the shortened interval; the watcher keeps the default so only events wake it.
+        loop_config = replace(config, scan_interval_seconds=poll_interval) if watcher is None else config
+        stop = threading.Event()
+        loop = threading.Thread(
+            target=run_inbox_loop,
+            args=(loop_config, logger, transcribe, intent, watcher, stop),
+            daemon=True,
+        )
+        loop.start()
+        try:
+            for index in range(notes):
+                name = f"note-{index:04d}.mp3"
+                staged = root / "staging" / name
+                staged.write_bytes(b"data")
+                picked_up.clear()
+                dropped[name] = time.perf_counter()
+                staged.rename(config.inbox_dir / name)
+                picked_up.wait(poll_interval * 2 + 1)
+                time.sleep(gap_seconds)
+        finally:
+            stop.set()
+            if watcher is not None:
+                (config.inbox_dir / "stop.txt").write_bytes(b"")
+            loop.join(timeout=poll_interval * 2 + 1)
+            if watcher is not None:
+                watcher.close()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time from dropping a note into the inbox to transcription start.")
+    parser.add_argument("--notes", type=int, default=10)
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Poll interval in seconds (default 30 in app).")
+    parser.add_argument("--gap", type=float, default=0.137, help="Seconds between drops.")
+    args = parser.parse_args()
+
+    for mode in ("poll", "inotify"):
+        latencies = _measure(mode, args.notes, args.poll_interval, args.gap)
+        if not latencies:
+            print(f"{mode:<8} no pickups recorded")
+            continue
+        print(
+            f"{mode:<8} drop->transcribe mean={statistics.mean(latencies) * 1000:9.2f} ms  "
+            f"p50={statistics.median(latencies) * 1000:9.2f} ms  max={max(latencies) * 1000:9.2f} ms  "
+            f"picked_up={len(latencies)}/{args.notes}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import statistics
+import time
+
+from app import DEFAULT_INTENT_MODE, INTENT_MODES, IntentEndpoint, IntentEngine
+from tests.helpers.openai_server import start_openai_server
+
+
+def _stub_resolver(url: str, discovery_seconds: float):
+    def resolver(_: str) -> IntentEndpoint:
+        # Stand-in for FoundryLocalManager(alias) + get_model_info(alias).
+        if discovery_seconds:
+            time.sleep(discovery_seconds)
+        return IntentEndpoint(base_url=url, api_key="not-required", model_id="stub-model")
+
+    return resolver
+
+
+def _per_note_engine(resolver, notes: int, mode: str) -> list[float]:
+    latencies: list[float] = []
+    for index in range(notes):
+        started = time.perf_counter()
+        engine = IntentEngine(alias="stub", resolver=resolver, mode=mode)
+        try:
+            engine.extract(f"note {index}")
+        finally:
+            engine.close()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _shared_engine(resolver, notes: int, mode: str) -> list[float]:
+    latencies: list[float] = []
+    engine = IntentEngine(alias="stub", resolver=resolver, mode=mode)
+    try:
+        for index in range(notes):
+            started = time.perf_counter()
+            engine.extract(f"note {index}")
+            latencies.append(time.perf_counter() - started)
+    finally:
+        engine.close()
+    return latencies
+
+
+def _report(label: str, latencies: list[float], connections: int, completions: int) -> None:
+    print(
+        f"{label:<28} mean={statistics.mean(latencies) * 1000:8.2f} ms  "
+        f"p50={statistics.median(latencies) * 1000:8.2f} ms  "
+        f"max={max(latencies) * 1000:8.2f} ms  connections={connections}  "
+        f"completions/note={completions / len(latencies):.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-note intent latency: fresh client vs. shared IntentEngine.")
+    parser.add_argument("--notes", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated LLM latency per completion.")
+    parser.add_argument(
+        "--discovery-ms",
+        type=float,
+        default=0.0,
+        help="Simulated Foundry Local service discovery + model lookup cost.",
+    )
+    parser.add_argument("--mode", choices=INTENT_MODES, default=DEFAULT_INTENT_MODE)
+    args = parser.parse_args()
+
+    for label, run in (("before (engine per note)", _per_note_engine), ("after (shared engine)", _shared_engine)):
+        server = start_openai_server(latency_seconds=args.latency_ms / 1000)
+        try:
+            latencies = run(_stub_resolver(server.url, args.discovery_ms / 1000), args.notes, args.mode)
+        finally:
+            server.close()
+        _report(label, latencies, server.stats.connections, server.stats.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+from app import AsyncIntentEngine, IntentEndpoint
+from tests.helpers.openai_server import default_tool_message, start_openai_server
+
+TRANSCRIPTS = (
+    "Remind me to call Sam about the quarterly report tomorrow at nine.",
+    "Idea for the blog post: compare local transcription models on battery.",
+    "Create a task to renew the car insurance by the end of the month.",
+    "Note that the team offsite moved to the second week of June.",
+)
+
+
+def _responder(request: dict) -> dict:
+    transcript = next(message["content"] for message in request["messages"] if message["role"] == "user")
+    intent = "create-task" if "task" in transcript.lower() or "remind" in transcript.lower() else "create-note"
+    return default_tool_message(request, {"intent": intent, "content": transcript})
+
+
+async def _run(url: str, model_id: str, concurrency: int, notes: int, mode: str) -> tuple[float, list[float]]:
+    engine = AsyncIntentEngine(
+        alias="stub",
+        resolver=lambda _: IntentEndpoint(base_url=url, api_key="not-required", model_id=model_id),
+        mode=mode,
+        concurrency=concurrency,
+    )
+    latencies: list[float] = []
+
+    async def one(transcript: str) -> None:
+        # Latency includes the wait for a semaphore slot, as a note queued in the inbox would see it.
+        started = time.perf_counter()
+        await engine.extract(transcript)
+        latencies.append(time.perf_counter() - started)
+
+    try:
+        # Connect outside the measured run, like a scanner that has been up for a while.
+        await engine.extract(TRANSCRIPTS[0])
+        started = time.perf_counter()
+        await asyncio.gather(*(one(TRANSCRIPTS[index % len(TRANSCRIPTS)]) for index in range(notes)))
+        return time.perf_counter() - started, latencies
+    finally:
+        await engine.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Aggregate completion tokens/s of AsyncIntentEngine at increasing in-flight request limits "
+        "(V2A_INTENT_CONCURRENCY) against a stand-in server that batches decoding."
+    )
+    parser.add_argument("--notes", type=int, default=48)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--mode", choices=("single", "multi-turn"), default="single")
+    parser.add_argument(
+        "--decode-ms-per-token",
+        type=float,
+        default=10.0,
+        help="Simulated decode step for one sequence on the stand-in server.",
+    )
+    parser.add_argument(
+        "--batch-overhead",
+        type=float,
+        default=0.25,
+        help="Fractional slowdown of a decode step per extra sequence decoded alongside it.",
+    )
+    parser.add_argument(
+        "--latency-budget",
+        type=float,
+        default=2.0,
+        help="Recommend the highest concurrency whose per-request latency stays within this multiple of serial.",
+    )
+    parser.add_argument("--base-url", help="Use a running OpenAI-compatible server, e.g. Foundry Local's endpoint.")
+    parser.add_argument("--model", default="stub-model", help="Model id for --base-url.")
+    args = parser.parse_args()
+
+    serial_latency: float | None = None
+    recommended = 1
+    for concurrency in args.concurrency:
+        server = None
+        if args.base_url is None:
+            server = start_openai_server(
+                responder=_responder,
+                decode_seconds_per_token=args.decode_ms_per_token / 1000,
+                batch_overhead=args.batch_overhead,
+            )
+        try:
+            elapsed, latencies = asyncio.run(
+                _run(args.base_url or server.url, args.model, concurrency, args.notes, args.mode)
+            )
+            # The stub reports what it decoded; a real server's usage is not collected here.
+            completion_tokens = sum(server.stats.completion_tokens[1:]) if server is not None else None
+        finally:
+            if server is not None:
+                server.close()
+        # Queued notes wait behind the semaphore, so compare the time each request holds a slot instead.
+        service = elapsed * min(concurrency, args.notes) / args.notes
+        serial_latency = serial_latency or service
+        if service <= serial_latency * args.latency_budget:
+            recommended = max(recommended, concurrency)
+        tokens = f"{completion_tokens / elapsed:8.1f} tok/s  " if completion_tokens is not None else ""
+        print(
+            f"concurrency={concurrency:<3} {tokens}{args.notes / elapsed:7.2f} notes/s  "
+            f"per-request={service * 1000:8.2f} ms  "
+            f"p50={statistics.median(latencies) * 1000:8.2f} ms  "
+            f"p95={statistics.quantiles(latencies, n=20)[18] * 1000:8.2f} ms"
+        )
+    print(f"recommended V2A_INTENT_CONCURRENCY={recommended} (per-request latency within {args.latency_budget}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from app import AppConfig, PipelineSettings, process_inbox_once
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drain a burst of notes through the staged inbox pipeline.")
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--transcribe-ms", type=float, default=20.0)
+    parser.add_argument("--intent-ms", type=float, default=30.0)
+    parser.add_argument("--transcribe-workers", type=int, default=1)
+    parser.add_argument("--intent-workers", type=int, default=1)
+    parser.add_argument("--queue-size", type=int, default=4)
+    args = parser.parse_args()
+
+    logger = logging.getLogger("benchmark_pipeline")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    def transcribe(path: Path) -> str:
+        time.sleep(args.transcribe_ms / 1000)
+        return path.stem
+
+    def intent(transcript: str) -> dict[str, str]:
+        time.sleep(args.intent_ms / 1000)
+        return {"intent": "create-note", "content": transcript}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        config = AppConfig(
+            inbox_dir=root / "inbox",
+            processed_dir=root / "processed",
+            work_dir=root / ".work",
+            scan_interval_seconds=30,
+            pipeline=PipelineSettings(
+                transcribe_workers=args.transcribe_workers,
+                intent_workers=args.intent_workers,
+                queue_size=args.queue_size,
+            ),
+        )
+        for directory in (config.inbox_dir, config.processed_dir, config.work_dir):
+            directory.mkdir(parents=True)
+        for index in range(args.notes):
+            (config.inbox_dir / f"note-{index:04d}.mp3").write_bytes(b"data")
+
+        started = time.perf_counter()
+        process_inbox_once(config, logger, transcribe, set(), intent)
+        elapsed = time.perf_counter() - started
+        processed = len(list(config.processed_dir.iterdir()))
+
+    sequential = args.notes * (args.transcribe_ms + args.intent_ms) / 1000
+    slowest = args.notes * max(
+        args.transcribe_ms / args.transcribe_workers,
+        args.intent_ms / args.intent_workers,
+    ) / 1000
+    print(f"notes={args.notes} processed={processed} elapsed={elapsed:.2f}s ({processed / elapsed:.1f} files/s)")
+    print(f"sum of stages (sequential) ~{sequential:.2f}s, slowest stage ~{slowest:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
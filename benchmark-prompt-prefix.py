@@ -0,0 +1,110 @@
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import openai
+
+from app import (
+    INTENT_SYSTEM_PROMPT,
+    _current_date_tool_schema,
+    _intent_messages,
+    _intent_tool_schema,
+    _prefix_intent,
+    _synthetic_current_date_messages,
+)
+from tests.helpers.openai_server import start_openai_server
+
+# Alternating prefixes flip the prefix classification between notes, as a real inbox does.
+TRANSCRIPTS = (
+    "Remind me to call Sam about the quarterly report tomorrow at nine.",
+    "Idea for the blog post: compare local transcription models on battery.",
+    "Create a task to renew the car insurance by the end of the month.",
+    "Note that the team offsite moved to the second week of June.",
+)
+RULES_END = "Use the `get_current_date` tool response for date math; it provides a date only, not a time. "
+
+
+def _legacy_messages(transcript: str) -> list[dict[str, str]]:
+    # The layout before the split: date and prefix classification inside the one system message, ahead of the
+    # examples (and, once rendered, ahead of the tool schemas).
+    now = datetime.now(timezone.utc)
+    tomorrow = (now.date() + timedelta(days=1)).isoformat()
+    prefix_intent = _prefix_intent(transcript)
+    dynamic = (
+        f"Current UTC date: {now.date().isoformat()} (year {now.year}). "
+        f"You MUST NOT output a year earlier than {now.year}. If the transcript says 'tomorrow', use {tomorrow} "
+        f"at 06:00 UTC. Prefix intent classification (must follow): {prefix_intent}. "
+        f"You MUST set intent to {prefix_intent}. "
+    )
+    head, examples = INTENT_SYSTEM_PROMPT.split(RULES_END)
+    return [
+        {"role": "system", "content": head + RULES_END + dynamic + examples},
+        {"role": "user", "content": transcript.strip()},
+    ]
+
+
+def _run(client: openai.OpenAI, model_id: str, layout, notes: int) -> tuple[list[float], int, int]:
+    ttfts: list[float] = []
+    prompt_tokens = cached_tokens = 0
+    for index in range(notes):
+        started = time.perf_counter()
+        first_token: float | None = None
+        stream = client.chat.completions.create(
+            model=model_id,
+            messages=layout(TRANSCRIPTS[index % len(TRANSCRIPTS)]) + _synthetic_current_date_messages(),
+            tools=[_intent_tool_schema(), _current_date_tool_schema()],
+            tool_choice={"type": "function", "function": {"name": "emit_intent"}},
+            max_tokens=1,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        for chunk in stream:
+            if first_token is None and chunk.choices:
+                first_token = time.perf_counter() - started
+            if chunk.usage is not None:
+                prompt_tokens += chunk.usage.prompt_tokens
+                details = chunk.usage.prompt_tokens_details
+                cached_tokens += (details.cached_tokens or 0) if details is not None else 0
+        ttfts.append(first_token if first_token is not None else time.perf_counter() - started)
+    return ttfts, prompt_tokens, cached_tokens
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time to first token and cached prompt tokens per note, with the dynamic date/prefix text "
+        "inside the system prompt (before) versus after a byte-stable prefix (after)."
+    )
+    parser.add_argument("--notes", type=int, default=40)
+    parser.add_argument(
+        "--prefill-ms-per-token",
+        type=float,
+        default=0.2,
+        help="Simulated prefill cost per uncached prompt token for the stand-in server.",
+    )
+    parser.add_argument("--base-url", help="Use a running OpenAI-compatible server, e.g. Foundry Local's endpoint.")
+    parser.add_argument("--model", default="stub-model", help="Model id for --base-url.")
+    args = parser.parse_args()
+
+    layouts = (("before (dynamic in system)", _legacy_messages), ("after (static prefix)", _intent_messages))
+    for label, layout in layouts:
+        server = None
+        if args.base_url is None:
+            server = start_openai_server(prefill_seconds_per_token=args.prefill_ms_per_token / 1000)
+        client = openai.OpenAI(base_url=args.base_url or server.url, api_key="not-required")
+        try:
+            ttfts, prompt_tokens, cached_tokens = _run(client, args.model, layout, args.notes)
+        finally:
+            client.close()
+            if server is not None:
+                server.close()
+        print(
+            f"{label:<27} ttft mean={statistics.mean(ttfts) * 1000:8.2f} ms  "
+            f"p50={statistics.median(ttfts) * 1000:8.2f} ms  "
+            f"prompt tokens/note={prompt_tokens / args.notes:7.1f}  "
+            f"cached={cached_tokens / max(prompt_tokens, 1):6.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+HEAVY_MODULES = ("torch", "whisper", "numpy", "openai", "foundry_local")
+
+# Mirrors the startup part of app.main() up to the end of the first scan of an empty inbox, without
+# touching Foundry Local. With --eager the heavy modules are imported up front, as app.py used to do.
+CHILD = """
+import json, pathlib, sys, time
+started = time.perf_counter()
+if {eager}:
+    import foundry_local, openai, torch, whisper
+import app
+imported = time.perf_counter()
+config = app.load_config(pathlib.Path({root!r}))
+app.ensure_directories(config)
+logger = app.setup_logging(config.work_dir)
+transcriber = app.WhisperTranscriber(logger=logger)
+engine = app.IntentEngine()
+app.process_inbox_once(config, logger, transcriber.transcribe, set(), engine.extract)
+scanned = time.perf_counter()
+print(json.dumps({{
+    "import": imported - started,
+    "first_scan": scanned - started,
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def _run(eager: bool, root: Path) -> dict:
+    # Inbox and processed folders fall back to their defaults below `root`.
+    env = {
+        key: value for key, value in os.environ.items() if key not in ("V2A_VOICE_INBOX", "V2A_VOICE_PROCESSED")
+    }
+    code = CHILD.format(eager=eager, heavy=HEAVY_MODULES, root=str(root))
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import time and time to first (empty) inbox scan.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for label, eager in (("eager imports (before)", True), ("lazy imports (after)", False)):
+            results = [_run(eager, Path(temp_dir)) for _ in range(args.runs)]
+            print(
+                f"{label:<24} import={statistics.median(r['import'] for r in results) * 1000:8.1f} ms  "
+                f"first scan={statistics.median(r['first_scan'] for r in results) * 1000:8.1f} ms  "
+                f"heavy modules loaded: {', '.join(results[-1]['loaded']) or 'none'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import av
+import numpy as np
+
+import app
+from app import (
+    CREATE_TODO_WEBHOOK_ENV,
+    SAMPLE_RATE,
+    AppConfig,
+    IntentEndpoint,
+    IntentEngine,
+    MetricsRegistry,
+    PipelineSettings,
+    TranscriptionBackend,
+    VoiceActivityDetector,
+    WebhookDelivery,
+    WhisperTranscriber,
+    load_transcription_backend,
+    process_inbox_once,
+)
+from tests.helpers.openai_server import default_tool_message, start_openai_server
+from tests.helpers.webhook_server import start_webhook_server
+
+# Every other note becomes a task so the webhook stage is exercised as well.
+TRANSCRIPTS = (
+    "Remind me to call Sam about the quarterly report tomorrow at nine.",
+    "Idea for the blog post: compare local transcription models on battery.",
+    "Create a task to renew the car insurance by the end of the month.",
+    "Note that the team offsite moved to the second week of June.",
+)
+STAGE_METRICS = {
+    "scan": "voice_inbox_scan_seconds",
+    "decode": "voice_inbox_decode_seconds",
+    "whisper": "voice_inbox_whisper_seconds",
+    "llm": "voice_inbox_llm_request_seconds",
+    "webhook": "voice_inbox_webhook_seconds",
+    "move": "voice_inbox_move_seconds",
+}
+
+
+class RecordingMetrics(MetricsRegistry):
+    # Keeps every observation so exact percentiles can be reported, not just histogram buckets.
+    def __init__(self) -> None:
+        super().__init__()
+        self.samples: dict[str, list[float]] = {}
+        self._samples_lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        super().observe(name, seconds, **labels)
+        with self._samples_lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+
+class SimulatedWhisperBackend(TranscriptionBackend):
+    # Stand-in for Whisper: costs a fixed time per second of speech and cycles through TRANSCRIPTS.
+    name = "simulated"
+
+    def __init__(self, ms_per_audio_second: float) -> None:
+        self._ms_per_audio_second = ms_per_audio_second
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        time.sleep(audio.shape[0] / SAMPLE_RATE * self._ms_per_audio_second / 1000)
+        with self._lock:
+            text = TRANSCRIPTS[self._next % len(TRANSCRIPTS)]
+            self._next += 1
+        return text
+
+
+def synthetic_note(seconds: float, seed: int) -> np.ndarray:
+    # Tone bursts separated by short pauses, with silence before and after so VAD has something to trim.
+    rng = np.random.default_rng(seed)
+    audio = rng.normal(0, 1e-4, int(seconds * SAMPLE_RATE)).astype(np.float32)
+    t = np.arange(int(0.8 * SAMPLE_RATE)) / SAMPLE_RATE
+    start = int(0.5 * SAMPLE_RATE)
+    while start + t.shape[0] < audio.shape[0] - int(0.5 * SAMPLE_RATE):
+        frequency = rng.uniform(150, 400)
+        audio[start : start + t.shape[0]] += (0.3 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+        start += t.shape[0] + int(0.3 * SAMPLE_RATE)
+    return audio
+
+
+def write_mp3(path: Path, audio: np.ndarray) -> None:
+    with av.open(str(path), "w", format="mp3") as container:
+        stream = container.add_stream("libmp3lame", rate=SAMPLE_RATE, layout="mono")
+        frame_size = stream.codec_context.frame_size or 1152
+        for start in range(0, audio.shape[0], frame_size):
+            chunk = audio[start : start + frame_size]
+            if chunk.shape[0] < frame_size:
+                chunk = np.pad(chunk, (0, frame_size - chunk.shape[0]))
+            frame = av.AudioFrame.from_ndarray(chunk.reshape(1, -1), format="fltp", layout="mono")
+            frame.sample_rate = SAMPLE_RATE
+            container.mux(stream.encode(frame))
+        container.mux(stream.encode(None))
+
+
+def percentiles(latencies: list[float]) -> dict[str, float]:
+    if not latencies:
+        return {"count": 0}
+    ordered = sorted(latencies)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> dict:
+    metrics = RecordingMetrics()
+    app.METRICS = metrics
+    end_to_end: list[float] = []
+
+    class DurationHandler(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            duration = getattr(record, "duration", None)
+            if duration is not None:
+                end_to_end.append(duration)
+
+    logger = logging.getLogger("benchmark_throughput")
+    logger.handlers[:] = [DurationHandler()]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    def responder(request: dict) -> dict:
+        transcript = next(message["content"] for message in request["messages"] if message["role"] == "user")
+        intent = "create-task" if "task" in transcript.lower() or "remind" in transcript.lower() else "create-note"
+        return default_tool_message(request, {"intent": intent, "content": transcript[:80]})
+
+    llm = start_openai_server(latency_seconds=args.llm_latency_ms / 1000, responder=responder)
+    webhook = start_webhook_server(keep_alive=True, latency_seconds=args.webhook_latency_ms / 1000)
+    os.environ[CREATE_TODO_WEBHOOK_ENV] = webhook.url
+    engine = IntentEngine(
+        alias="stub",
+        resolver=lambda _: IntentEndpoint(base_url=llm.url, api_key="not-required", model_id="stub-model"),
+        mode=args.intent_mode,
+        stream=args.intent_stream,
+    )
+    if args.backend == "simulated":
+        backend: TranscriptionBackend = SimulatedWhisperBackend(args.whisper_ms_per_second)
+        backend_loader = lambda _: backend  # noqa: E731
+    else:
+        backend_loader = lambda model_name: load_transcription_backend(model_name, args.backend)  # noqa: E731
+    vad = VoiceActivityDetector(logger=logger) if args.vad else None
+    transcriber = WhisperTranscriber(vad=vad, backend_loader=backend_loader, logger=logger)
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            config = AppConfig(
+                inbox_dir=root / "inbox",
+                processed_dir=root / "processed",
+                work_dir=root / ".work",
+                scan_interval_seconds=30,
+                pipeline=PipelineSettings(
+                    transcribe_workers=args.transcribe_workers,
+                    intent_workers=args.intent_workers,
+                    transcribe_batch_size=args.batch_size,
+                ),
+            )
+            for directory in (config.inbox_dir, config.processed_dir, config.work_dir):
+                directory.mkdir(parents=True)
+            for index in range(args.notes):
+                write_mp3(config.inbox_dir / f"note-{index:04d}.mp3", synthetic_note(args.seconds, seed=index))
+            # Load the model outside the measured run, like a scanner that has been up for a while.
+            transcriber.backend
+            engine.warm_up()
+
+            delivery = WebhookDelivery(config.work_dir / "outbox", logger)
+            started = time.perf_counter()
+            process_inbox_once(
+                config,
+                logger,
+                transcriber.transcribe,
+                set(),
+                engine.extract,
+                transcribe_batch_func=transcriber.transcribe_batch if args.batch_size > 1 else None,
+                webhook_delivery=delivery,
+            )
+            delivery.flush(timeout_seconds=60)
+            elapsed = time.perf_counter() - started
+            delivery.close()
+            processed = len(list(config.processed_dir.iterdir()))
+    finally:
+        engine.close()
+        llm.close()
+        webhook.close()
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "settings": vars(args) | {"output": str(args.output), "compare": str(args.compare)},
+        "files": processed,
+        "elapsed_seconds": round(elapsed, 3),
+        "files_per_second": round(processed / elapsed, 3),
+        "llm_requests": llm.stats.requests,
+        "webhook_requests": webhook.queue.qsize(),
+        "stages": {stage: percentiles(metrics.samples.get(name, [])) for stage, name in STAGE_METRICS.items()},
+        "end_to_end": percentiles(end_to_end),
+    }
+
+
+def report(result: dict, baseline: dict | None) -> None:
+    print(
+        f"files={result['files']} elapsed={result['elapsed_seconds']:.2f}s "
+        f"throughput={result['files_per_second']:.2f} files/s "
+        f"llm_requests={result['llm_requests']} webhooks={result['webhook_requests']}"
+    )
+    rows = [*result["stages"].items(), ("end-to-end", result["end_to_end"])]
+    baseline_rows = {**(baseline or {}).get("stages", {}), "end-to-end": (baseline or {}).get("end_to_end")}
+    for stage, summary in rows:
+        if not summary["count"]:
+            print(f"{stage:<11} (no samples)")
+            continue
+        line = (
+            f"{stage:<11} n={summary['count']:<5} p50={summary['p50_ms']:9.2f} ms  "
+            f"p95={summary['p95_ms']:9.2f} ms  p99={summary['p99_ms']:9.2f} ms"
+        )
+        previous = baseline_rows.get(stage)
+        if previous and previous.get("count"):
+            line += f"  (p50 {summary['p50_ms'] - previous['p50_ms']:+.2f} ms vs baseline)"
+        print(line)
+    if baseline:
+        change = result["files_per_second"] / baseline["files_per_second"] - 1
+        print(f"throughput vs baseline ({baseline.get('commit')}): {change:+.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="End-to-end inbox throughput: synthetic MP3 notes through decode, VAD, transcription, "
+        "a stand-in OpenAI tool-calling server and the webhook outbox."
+    )
+    parser.add_argument("--notes", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=8.0, help="Length of each synthetic note.")
+    parser.add_argument(
+        "--backend",
+        choices=("simulated", *app.TRANSCRIBE_BACKENDS),
+        default="simulated",
+        help="`simulated` replaces Whisper with a fixed cost per second of speech; the others load real models.",
+    )
+    parser.add_argument("--whisper-ms-per-second", type=float, default=50.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--webhook-latency-ms", type=float, default=20.0)
+    parser.add_argument("--intent-mode", choices=app.INTENT_MODES, default=app.DEFAULT_INTENT_MODE)
+    parser.add_argument("--intent-stream", action="store_true", help="Stream intent completions (V2A_INTENT_STREAM).")
+    parser.add_argument("--transcribe-workers", type=int, default=1)
+    parser.add_argument("--intent-workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--no-vad", dest="vad", action="store_false")
+    parser.add_argument("--output", type=Path, help="Result file (default: .work/benchmarks/throughput-<time>.json).")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compare against.")
+    args = parser.parse_args()
+
+    result = run(args)
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    report(result, baseline)
+    output = args.output or Path(".work/benchmarks") / f"throughput-{datetime.now():%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import json
+import re
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app import DEFAULT_MODEL, TRANSCRIBE_BACKENDS, AudioDecoder, load_transcription_backend
+
+SAMPLES_DIR = Path(__file__).resolve().parent / "audio_samples"
+SAMPLE_RATE = 16000
+
+
+def _words(text: str) -> list[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref, hyp = _words(reference), _words(hypothesis)
+    # Word-level Levenshtein distance, one row at a time.
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / max(len(ref), 1)
+
+
+def _run(
+    backend_name: str,
+    model_name: str,
+    clips: dict[str, np.ndarray],
+    references: dict[str, str],
+    repeats: int,
+) -> tuple[float, list[float], list[float]]:
+    started = time.perf_counter()
+    backend = load_transcription_backend(model_name, backend_name)
+    load_seconds = time.perf_counter() - started
+    backend.transcribe(next(iter(clips.values())))  # warm-up
+    latencies: list[float] = []
+    errors: list[float] = []
+    for name, audio in clips.items():
+        for _ in range(repeats):
+            started = time.perf_counter()
+            text = backend.transcribe(audio)
+            latencies.append(time.perf_counter() - started)
+        errors.append(word_error_rate(references[name], text))
+        print(f"  {backend_name:<12} {name}: {text.strip()}")
+    return load_seconds, latencies, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Accuracy (WER) and latency of the transcription backends.")
+    parser.add_argument(
+        "--backends", nargs="+", choices=list(TRANSCRIBE_BACKENDS), default=list(TRANSCRIBE_BACKENDS)
+    )
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    references: dict[str, str] = json.loads((SAMPLES_DIR / "transcripts.json").read_text(encoding="utf-8"))
+    decoder = AudioDecoder()
+    clips = {name: np.array(decoder.decode(SAMPLES_DIR / name)) for name in references}
+    audio_seconds = sum(audio.shape[0] for audio in clips.values()) / SAMPLE_RATE
+
+    rows = []
+    for backend_name in args.backends:
+        try:
+            load_seconds, latencies, errors = _run(backend_name, args.model, clips, references, args.repeats)
+        except Exception as exc:
+            print(f"{backend_name:<12} unavailable: {exc}")
+            continue
+        per_pass = sum(latencies) / args.repeats
+        rows.append((backend_name, load_seconds, latencies, errors, per_pass))
+
+    print()
+    baseline = rows[0][4] if rows else None
+    for backend_name, load_seconds, latencies, errors, per_pass in rows:
+        print(
+            f"{backend_name:<12} load={load_seconds:6.2f}s  mean={statistics.mean(latencies) * 1000:8.1f} ms/file  "
+            f"rtf={per_pass / audio_seconds:.3f}  files/s={len(clips) / per_pass:6.2f}  "
+            f"speedup={baseline / per_pass:4.1f}x  WER={statistics.mean(errors) * 100:5.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
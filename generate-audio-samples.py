@@ -1,15 +1,12 @@
+import json
 from pathlib import Path
 
 from gtts import gTTS
 
-audio_samples = {
-    "sample-recording-1-task-with-due-date-and-reminder.mp3": "Follow up with my boss, latest by August 30th, remind me August 20th. We should talk about our AI strategy!",
-    "sample-recording-2-random-thoughts.mp3": "These are just some random thoughts. I need to think about that some time soon-ish",
-    "sample-recording-3-send-email.mp3": "send an email to myself to remind me to find out what 42 is about",
-    "sample-recording-4-remind-by-tomorrow.mp3": "Remind me by tomorrow to upload the performance review files.",
-}
-
 output_dir = Path(__file__).resolve().parent / "audio_samples"
+# Also the reference transcripts for benchmark-transcribe-backends.py.
+audio_samples = json.loads((output_dir / "transcripts.json").read_text(encoding="utf-8"))
+
 output_dir.mkdir(parents=True, exist_ok=True)
 
 for filename, text in audio_samples.items():
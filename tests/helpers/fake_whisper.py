@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+import signal
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app import TranscriptionBackend
+
+
+class EchoModel:
+    def transcribe(self, audio_path: str, language: str) -> dict[str, str]:
+        stem = Path(audio_path).stem
+        if stem.startswith("fail"):
+            raise RuntimeError(f"cannot decode {stem}")
+        if stem.startswith("crash"):
+            # Like the OOM killer or a segfault in native inference code: no result is ever sent.
+            os.kill(os.getpid(), getattr(signal, "SIGKILL", signal.SIGTERM))
+        time.sleep(0.01)
+        return {"text": stem}
+
+
+def load_echo_model(_: str) -> EchoModel:
+    return EchoModel()
+
+
+def load_failing_model(model_name: str) -> EchoModel:
+    raise FileNotFoundError(f"model {model_name} not available")
+
+
+class SampleCountBackend(TranscriptionBackend):
+    name = "sample-count"
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        return f"{audio.shape[0]} samples"
+
+
+def load_sample_count_backend(_: str) -> SampleCountBackend:
+    return SampleCountBackend()
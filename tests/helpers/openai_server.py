@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Callable
+
+DEFAULT_INTENT_PAYLOAD: dict[str, str] = {"intent": "create-note", "content": "hello"}
+
+
+@dataclass
+class OpenAIServerStats:
+    requests: int = 0
+    connections: int = 0
+    aborted_streams: int = 0
+    sockets: list[socket.socket] = field(default_factory=list)
+    prompt_tokens: list[int] = field(default_factory=list)
+    cached_tokens: list[int] = field(default_factory=list)
+    completion_tokens: list[int] = field(default_factory=list)
+    active_sequences: int = 0
+    peak_sequences: int = 0
+    lock: Lock = field(default_factory=Lock)
+
+    def record_request(self) -> None:
+        with self.lock:
+            self.requests += 1
+
+    def record_connection(self, connection: socket.socket) -> None:
+        with self.lock:
+            self.connections += 1
+            self.sockets.append(connection)
+
+
+@dataclass
+class OpenAIServer:
+    server: ThreadingHTTPServer
+    thread: Thread
+    stats: OpenAIServerStats
+    url: str
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        # Keep-alive connections outlive `shutdown`; drop them to emulate a service restart.
+        with self.stats.lock:
+            for connection in self.stats.sockets:
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        self.thread.join(timeout=2)
+
+
+def _forced_tool_name(request: dict) -> str | None:
+    tool_choice = request.get("tool_choice")
+    if isinstance(tool_choice, dict):
+        return tool_choice.get("function", {}).get("name")
+    return None
+
+
+def render_prompt(request: dict) -> str:
+    # Rough stand-in for a chat template: tool schemas follow the first system message, as in most templates.
+    messages = list(request.get("messages", []))
+    parts = []
+    if messages and messages[0].get("role") == "system":
+        parts.append(f"system: {messages.pop(0).get('content')}")
+    if request.get("tools"):
+        parts.append(f"tools: {json.dumps(request['tools'], sort_keys=True)}")
+    for message in messages:
+        parts.append(f"{message.get('role')}: {message.get('content')} {json.dumps(message.get('tool_calls'))}")
+    return "\n".join(parts)
+
+
+def _token_count(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def _stream_chunks(request: dict, message: dict, chunk_chars: int) -> list[dict]:
+    # Splits an assistant message into chat.completion.chunk deltas, tool-call arguments `chunk_chars` at a time.
+    deltas: list[dict] = [{"role": "assistant"}]
+    content = message.get("content") or ""
+    deltas.extend({"content": content[i : i + chunk_chars]} for i in range(0, len(content), chunk_chars))
+    for index, call in enumerate(message.get("tool_calls") or []):
+        function = call["function"]
+        deltas.append(
+            {
+                "tool_calls": [
+                    {
+                        "index": index,
+                        "id": call["id"],
+                        "type": "function",
+                        "function": {"name": function["name"], "arguments": ""},
+                    }
+                ]
+            }
+        )
+        arguments = function["arguments"]
+        deltas.extend(
+            {"tool_calls": [{"index": index, "function": {"arguments": arguments[i : i + chunk_chars]}}]}
+            for i in range(0, len(arguments), chunk_chars)
+        )
+    finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+    max_tokens = request.get("max_tokens")
+    if max_tokens is not None and len(deltas) > max_tokens + 1:
+        deltas = deltas[: max_tokens + 1]
+        finish_reason = "length"
+    chunks = [{"index": 0, "delta": delta, "finish_reason": None} for delta in deltas]
+    chunks.append({"index": 0, "delta": {}, "finish_reason": finish_reason})
+    return chunks
+
+
+def default_tool_message(request: dict, intent_payload: dict[str, str]) -> dict:
+    name = "get_current_date" if _forced_tool_name(request) == "get_current_date" else "emit_intent"
+    arguments = "{}" if name == "get_current_date" else json.dumps(intent_payload)
+    return {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [
+            {
+                "id": f"call_{name}",
+                "type": "function",
+                "function": {"name": name, "arguments": arguments},
+            }
+        ],
+    }
+
+
+def start_openai_server(
+    latency_seconds: float = 0.0,
+    intent_payload: dict[str, str] | None = None,
+    responder: Callable[[dict], dict] | None = None,
+    prefill_seconds_per_token: float = 0.0,
+    stream_chunk_chars: int = 16,
+    stream_chunk_seconds: float = 0.0,
+    decode_seconds_per_token: float = 0.0,
+    batch_overhead: float = 0.0,
+) -> OpenAIServer:
+    # `prefill_seconds_per_token` charges for prompt tokens not shared with the previous request, emulating a
+    # server that keeps the last prompt's KV cache; usage reports the shared part as `cached_tokens`.
+    # `decode_seconds_per_token` emulates continuous batching: every active sequence advances one token per step
+    # and each step gets `batch_overhead` slower per extra sequence, so throughput grows with concurrency while
+    # per-request latency degrades.
+    stats = OpenAIServerStats()
+    payload = intent_payload or DEFAULT_INTENT_PAYLOAD
+    cache = {"prompt": ""}
+
+    def respond(request: dict) -> dict:
+        if responder is not None:
+            return responder(request)
+        return default_tool_message(request, payload)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            stats.record_connection(self.connection)
+
+        def do_POST(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming
+            length = int(self.headers.get("Content-Length", "0"))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            stats.record_request()
+            prompt = render_prompt(request)
+            with stats.lock:
+                prompt_tokens = _token_count(prompt)
+                cached_tokens = len(os.path.commonprefix([prompt, cache["prompt"]])) // 4
+                cache["prompt"] = prompt
+                stats.prompt_tokens.append(prompt_tokens)
+                stats.cached_tokens.append(cached_tokens)
+            message = respond(request)
+            completion_tokens = max(1, _token_count(render_prompt({"messages": [message]})))
+            with stats.lock:
+                stats.completion_tokens.append(completion_tokens)
+            if latency_seconds or prefill_seconds_per_token:
+                time.sleep(latency_seconds + (prompt_tokens - cached_tokens) * prefill_seconds_per_token)
+            if decode_seconds_per_token:
+                self._decode(completion_tokens)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            }
+            envelope = {"id": "chatcmpl-stub", "created": int(time.time()), "model": request.get("model", "stub")}
+            if request.get("stream"):
+                self._stream(request, message, envelope, usage)
+                return
+            body = json.dumps(
+                {
+                    **envelope,
+                    "object": "chat.completion",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "tool_calls",
+                            "message": message,
+                        }
+                    ],
+                    "usage": usage,
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _decode(self, tokens: int) -> None:
+            with stats.lock:
+                stats.active_sequences += 1
+                stats.peak_sequences = max(stats.peak_sequences, stats.active_sequences)
+            try:
+                for _ in range(tokens):
+                    with stats.lock:
+                        active = stats.active_sequences
+                    time.sleep(decode_seconds_per_token * (1 + batch_overhead * (active - 1)))
+            finally:
+                with stats.lock:
+                    stats.active_sequences -= 1
+
+        def _stream(self, request: dict, message: dict, envelope: dict, usage: dict) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            events = [
+                {**envelope, "object": "chat.completion.chunk", "choices": [choice]}
+                for choice in _stream_chunks(request, message, stream_chunk_chars)
+            ]
+            if (request.get("stream_options") or {}).get("include_usage"):
+                events.append({**envelope, "object": "chat.completion.chunk", "choices": [], "usage": usage})
+            try:
+                for index, event in enumerate(events):
+                    if index and stream_chunk_seconds:
+                        time.sleep(stream_chunk_seconds)
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client stopped reading early, e.g. after aborting the stream.
+                self.close_connection = True
+                with stats.lock:
+                    stats.aborted_streams += 1
+
+        def _write_chunk(self, data: bytes) -> None:
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return OpenAIServer(server=server, thread=thread, stats=stats, url=f"http://{host}:{port}/v1")
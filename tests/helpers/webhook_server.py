@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from queue import Queue
-from threading import Thread
+from threading import Lock, Thread
+from typing import Callable
 
 
 @dataclass(frozen=True)
@@ -14,12 +16,21 @@ class WebhookRequest:
     body: bytes
 
 
+@dataclass
+class WebhookServerStats:
+    connections: int = 0
+    active: int = 0
+    max_active: int = 0
+    lock: Lock = field(default_factory=Lock)
+
+
 @dataclass
 class WebhookServer:
-    server: HTTPServer
+    server: ThreadingHTTPServer
     thread: Thread
     queue: Queue[WebhookRequest]
     url: str
+    stats: WebhookServerStats
 
     def close(self) -> None:
         self.server.shutdown()
@@ -27,37 +38,78 @@ class WebhookServer:
         self.thread.join(timeout=2)
 
 
-def start_webhook_server(response_status: int = 200, response_body: bytes | str = b"") -> WebhookServer:
+def start_webhook_server(
+    response_status: int = 200,
+    response_body: bytes | str = b"",
+    response_statuses: list[int] | None = None,
+    keep_alive: bool = False,
+    latency_seconds: float = 0.0,
+    responder: Callable[[bytes], tuple[int, bytes]] | None = None,
+) -> WebhookServer:
     queue: Queue[WebhookRequest] = Queue()
+    stats = WebhookServerStats()
     response_bytes = (
         response_body.encode("utf-8") if isinstance(response_body, str) else response_body
     )
+    # Statuses are handed out per request in order; the last one repeats.
+    statuses = list(response_statuses or [response_status])
+    statuses_lock = Lock()
+
+    def next_status() -> int:
+        with statuses_lock:
+            return statuses.pop(0) if len(statuses) > 1 else statuses[0]
 
     class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" if keep_alive else "HTTP/1.0"
+
+        def setup(self) -> None:
+            super().setup()
+            with stats.lock:
+                stats.connections += 1
+
         def do_POST(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming
-            length = int(self.headers.get("Content-Length", "0"))
-            body = self.rfile.read(length)
-            headers = {key.lower(): value for key, value in self.headers.items()}
-            queue.put(
-                WebhookRequest(
-                    method="POST",
-                    path=self.path,
-                    headers=headers,
-                    body=body,
+            with stats.lock:
+                stats.active += 1
+                stats.max_active = max(stats.max_active, stats.active)
+            try:
+                length = int(self.headers.get("Content-Length", "0"))
+                body = self.rfile.read(length)
+                headers = {key.lower(): value for key, value in self.headers.items()}
+                queue.put(
+                    WebhookRequest(
+                        method="POST",
+                        path=self.path,
+                        headers=headers,
+                        body=body,
+                    )
                 )
-            )
-            self.send_response(response_status)
-            if response_bytes:
-                self.send_header("Content-Length", str(len(response_bytes)))
-            self.end_headers()
-            if response_bytes:
-                self.wfile.write(response_bytes)
+                if latency_seconds:
+                    time.sleep(latency_seconds)
+                if responder is not None:
+                    status, reply = responder(body)
+                else:
+                    status, reply = next_status(), response_bytes
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(reply)))
+                self.end_headers()
+                if reply:
+                    self.wfile.write(reply)
+            finally:
+                with stats.lock:
+                    stats.active -= 1
 
         def log_message(self, format: str, *args: object) -> None:  # noqa: A002
             return
 
-    server = HTTPServer(("127.0.0.1", 0), Handler)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
     thread = Thread(target=server.serve_forever, daemon=True)
     thread.start()
     host, port = server.server_address
-    return WebhookServer(server=server, thread=thread, queue=queue, url=f"http://{host}:{port}")
+    return WebhookServer(
+        server=server,
+        thread=thread,
+        queue=queue,
+        url=f"http://{host}:{port}",
+        stats=stats,
+    )
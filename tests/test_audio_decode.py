@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import app
+from app import AudioDecoder, transcribe_with_model
+
+pytest.importorskip("av")
+
+SAMPLE_MP3 = (
+    Path(__file__).resolve().parents[1]
+    / "audio_samples"
+    / "sample-recording-1-task-with-due-date-and-reminder.mp3"
+)
+
+
+def test_decoder_produces_16khz_mono_float32(test_logger) -> None:
+    audio = AudioDecoder(logger=test_logger).decode(SAMPLE_MP3)
+
+    assert audio.dtype == np.float32
+    assert audio.ndim == 1
+    # The sample is about 9.5 seconds long.
+    assert 9.0 < audio.shape[0] / 16000 < 10.0
+    assert 0 < float(np.abs(audio).max()) <= 1.0
+
+
+def test_decoder_reuses_and_grows_its_buffer(test_logger) -> None:
+    decoder = AudioDecoder(initial_seconds=1, logger=test_logger)
+    first = decoder.decode(SAMPLE_MP3).copy()
+    second = decoder.decode(SAMPLE_MP3)
+    third = decoder.decode(SAMPLE_MP3)
+
+    np.testing.assert_array_equal(first, second)
+    assert np.shares_memory(second, third)
+
+
+def test_decoder_falls_back_to_ffmpeg_loader(tmp_path: Path, test_logger, monkeypatch, caplog) -> None:
+    not_audio = tmp_path / "note.mp3"
+    not_audio.write_text("not audio", encoding="utf-8")
+    loaded: list[str] = []
+
+    def load_audio(path: str) -> np.ndarray:
+        loaded.append(path)
+        return np.zeros(16000, dtype=np.float32)
+
+    monkeypatch.setattr(app.whisper, "load_audio", load_audio)
+    caplog.set_level("WARNING")
+    audio = AudioDecoder(logger=test_logger).decode(not_audio)
+
+    assert loaded == [str(not_audio)]
+    assert audio.shape == (16000,)
+    assert any("falling back to ffmpeg" in record.message for record in caplog.records)
+
+
+def test_transcribe_with_model_accepts_decoded_audio() -> None:
+    received: list[object] = []
+
+    class FakeModel:
+        def transcribe(self, audio: object, language: str) -> dict[str, str]:
+            received.append(audio)
+            return {"text": "ok"}
+
+    samples = np.zeros(16000, dtype=np.float32)
+    assert transcribe_with_model(FakeModel(), samples) == "ok"
+    assert received[0] is samples
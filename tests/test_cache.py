@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app import (
+    CACHE_MAX_MB_ENV,
+    CachedIntentExtractor,
+    CachedTranscriber,
+    ContentCache,
+    get_cache_max_bytes,
+)
+
+
+def test_cache_round_trip_survives_restart(tmp_path: Path) -> None:
+    ContentCache(tmp_path, max_bytes=1024).put("transcripts", "abc", "hello")
+
+    reopened = ContentCache(tmp_path, max_bytes=1024)
+    assert reopened.get("transcripts", "abc") == "hello"
+    assert reopened.get("transcripts", "missing") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ContentCache(tmp_path, max_bytes=30)
+    cache.put("intents", "a", "x" * 10)
+    cache.put("intents", "b", "y" * 10)
+    assert cache.get("intents", "a") == "x" * 10
+    cache.put("intents", "c", "z" * 10)
+
+    assert cache.get("intents", "b") is None
+    assert cache.get("intents", "a") == "x" * 10
+    assert cache.get("intents", "c") == "z" * 10
+    assert cache.total_bytes <= 30
+
+
+def test_cached_transcriber_keys_by_content(tmp_path: Path) -> None:
+    first = tmp_path / "first.mp3"
+    duplicate = tmp_path / "duplicate.mp3"
+    other = tmp_path / "other.mp3"
+    first.write_bytes(b"same audio")
+    duplicate.write_bytes(b"same audio")
+    other.write_bytes(b"other audio")
+    calls: list[str] = []
+
+    def transcribe(path: Path) -> str:
+        calls.append(path.name)
+        return f"text of {path.name}"
+
+    transcriber = CachedTranscriber(ContentCache(tmp_path / "cache", 1024 * 1024), transcribe)
+
+    assert transcriber.transcribe(first) == "text of first.mp3"
+    assert transcriber.transcribe(duplicate) == "text of first.mp3"
+    assert transcriber.transcribe_batch([first, other]) == ["text of first.mp3", "text of other.mp3"]
+    assert calls == ["first.mp3", "other.mp3"]
+
+
+def test_cached_transcriber_model_name_is_part_of_key(tmp_path: Path) -> None:
+    audio = tmp_path / "voice.mp3"
+    audio.write_bytes(b"audio")
+    cache = ContentCache(tmp_path / "cache", 1024 * 1024)
+
+    CachedTranscriber(cache, lambda _: "base text", model_name="base").transcribe(audio)
+    small = CachedTranscriber(cache, lambda _: "small text", model_name="small")
+
+    assert small.transcribe(audio) == "small text"
+
+
+def test_cached_transcriber_backend_and_vad_are_part_of_key(tmp_path: Path) -> None:
+    audio = tmp_path / "voice.mp3"
+    audio.write_bytes(b"audio")
+    cache = ContentCache(tmp_path / "cache", 1024 * 1024)
+
+    CachedTranscriber(cache, lambda _: "fp32 text", backend="whisper").transcribe(audio)
+    int8 = CachedTranscriber(cache, lambda _: "int8 text", backend="ctranslate2")
+    trimmed = CachedTranscriber(cache, lambda _: "trimmed text", backend="whisper", vad_threshold_db=-40.0)
+
+    assert int8.transcribe(audio) == "int8 text"
+    assert trimmed.transcribe(audio) == "trimmed text"
+    assert CachedTranscriber(cache, lambda _: "other", backend="whisper").transcribe(audio) == "fp32 text"
+
+
+def test_cached_intent_skips_failed_extractions(tmp_path: Path) -> None:
+    results = iter([None, {"intent": "create-note", "content": "hello"}])
+    calls: list[str] = []
+
+    def intent(transcript: str) -> dict[str, str] | None:
+        calls.append(transcript)
+        return next(results)
+
+    extractor = CachedIntentExtractor(ContentCache(tmp_path, 1024 * 1024), intent, "qwen2.5-7b")
+
+    assert extractor("hello") is None
+    assert extractor("hello") == {"intent": "create-note", "content": "hello"}
+    assert extractor(" hello ") == {"intent": "create-note", "content": "hello"}
+    assert calls == ["hello", "hello"]
+
+
+
+def test_cached_intent_batch_only_sends_misses(tmp_path: Path) -> None:
+    batches: list[list[str]] = []
+
+    def intent_batch(transcripts: list[str]) -> list[dict[str, str] | None]:
+        batches.append(transcripts)
+        return [
+            None if transcript == "bad" else {"intent": "create-note", "content": transcript}
+            for transcript in transcripts
+        ]
+
+    extractor = CachedIntentExtractor(
+        ContentCache(tmp_path, 1024 * 1024), lambda _: None, "qwen2.5-7b", intent_batch_func=intent_batch
+    )
+
+    assert extractor.extract_batch(["a", "b"]) == [
+        {"intent": "create-note", "content": "a"},
+        {"intent": "create-note", "content": "b"},
+    ]
+    assert extractor.extract_batch(["a", "c", "bad", "b"])[1:3] == [{"intent": "create-note", "content": "c"}, None]
+    assert batches == [["a", "b"], ["c", "bad"]]
+
+def test_cached_intent_extract_async_shares_entries_with_sync_calls(tmp_path: Path) -> None:
+    calls: list[str] = []
+
+    async def intent_async(transcript: str) -> dict[str, str]:
+        calls.append(transcript)
+        return {"intent": "create-note", "content": transcript}
+
+    extractor = CachedIntentExtractor(
+        ContentCache(tmp_path, 1024 * 1024), lambda _: None, "qwen2.5-7b", intent_async_func=intent_async
+    )
+
+    assert asyncio.run(extractor.extract_async("a")) == {"intent": "create-note", "content": "a"}
+    assert asyncio.run(extractor.extract_async("a")) == {"intent": "create-note", "content": "a"}
+    assert extractor("a") == {"intent": "create-note", "content": "a"}
+    assert calls == ["a"]
+
+
+def test_get_cache_max_bytes() -> None:
+    assert get_cache_max_bytes({CACHE_MAX_MB_ENV: "0"}) == 0
+    assert get_cache_max_bytes({CACHE_MAX_MB_ENV: "2"}) == 2 * 1024 * 1024
+    with pytest.raises(ValueError):
+        get_cache_max_bytes({CACHE_MAX_MB_ENV: "-5"})
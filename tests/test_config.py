@@ -11,6 +11,7 @@ from app import (
     VOICE_INBOX_ENV,
     VOICE_PROCESSED_ENV,
     SCAN_INTERVAL_ENV,
+    WATCH_MODE_ENV,
     load_config,
 )
 
@@ -39,3 +40,10 @@ def test_load_config_invalid_scan_interval(tmp_path: Path, value: str) -> None:
     env = {SCAN_INTERVAL_ENV: value}
     with pytest.raises(ValueError):
         load_config(root=tmp_path, environ=env)
+
+
+def test_load_config_watch_mode(tmp_path: Path) -> None:
+    assert load_config(root=tmp_path, environ={}).watch_mode == "auto"
+    assert load_config(root=tmp_path, environ={WATCH_MODE_ENV: "Poll"}).watch_mode == "poll"
+    with pytest.raises(ValueError):
+        load_config(root=tmp_path, environ={WATCH_MODE_ENV: "fanotify"})
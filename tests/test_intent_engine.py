@@ -0,0 +1,417 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app import (
+    INTENT_MODE_ENV,
+    INTENT_STREAM_ENV,
+    INTENT_SYSTEM_PROMPT,
+    METRICS,
+    AsyncIntentEngine,
+    IntentEndpoint,
+    IntentEngine,
+    _JsonObjectScanner,
+    get_intent_mode,
+    get_intent_stream_enabled,
+)
+from tests.helpers.openai_server import default_tool_message, start_openai_server
+
+
+def _resolver_for(url: str):
+    def resolver(_: str) -> IntentEndpoint:
+        return IntentEndpoint(base_url=url, api_key="not-required", model_id="stub-model")
+
+    return resolver
+
+
+def _user_content(request: dict) -> str:
+    return next(message["content"] for message in request["messages"] if message["role"] == "user")
+
+
+def test_engine_resolves_endpoint_once_and_reuses_connection() -> None:
+    server = start_openai_server(intent_payload={"intent": "create-note", "content": "hello"})
+    resolved: list[str] = []
+
+    def resolver(alias: str) -> IntentEndpoint:
+        resolved.append(alias)
+        return IntentEndpoint(base_url=server.url, api_key="not-required", model_id="stub-model")
+
+    engine = IntentEngine(alias="stub-alias", resolver=resolver, mode="multi-turn")
+    try:
+        first = engine.extract("first note")
+        second = engine.extract("second note")
+    finally:
+        engine.close()
+        server.close()
+
+    assert first == {"intent": "create-note", "content": "hello"}
+    assert second == first
+    assert resolved == ["stub-alias"]
+    assert server.stats.requests == 4
+    assert server.stats.connections == 1
+
+
+def test_engine_reconnects_after_service_restart() -> None:
+    first_server = start_openai_server()
+    second_server = start_openai_server(intent_payload={"intent": "create-task", "content": "ping"})
+    urls = iter([first_server.url, second_server.url])
+    resolved: list[str] = []
+
+    def resolver(_: str) -> IntentEndpoint:
+        resolved.append(next(urls))
+        return IntentEndpoint(base_url=resolved[-1], api_key="not-required", model_id="stub-model")
+
+    engine = IntentEngine(alias="stub-alias", resolver=resolver)
+    try:
+        assert engine.extract("before restart") is not None
+        first_server.close()
+        payload = engine.extract("after restart")
+    finally:
+        engine.close()
+        second_server.close()
+
+    assert payload == {"intent": "create-task", "content": "ping"}
+    assert resolved == [first_server.url, second_server.url]
+
+
+def test_single_round_trip_seeds_current_date() -> None:
+    requests: list[dict] = []
+
+    def responder(request: dict) -> dict:
+        requests.append(request)
+        return default_tool_message(request, {"intent": "create-note", "content": "hello"})
+
+    server = start_openai_server(responder=responder)
+    engine = IntentEngine(alias="stub", resolver=_resolver_for(server.url), mode="single")
+    try:
+        payload = engine.extract("random note")
+    finally:
+        engine.close()
+        server.close()
+
+    assert payload == {"intent": "create-note", "content": "hello"}
+    assert len(requests) == 1
+    assert requests[0]["tool_choice"]["function"]["name"] == "emit_intent"
+    roles = [message["role"] for message in requests[0]["messages"]]
+    assert roles == ["system", "system", "user", "assistant", "tool"]
+    assert "date" in requests[0]["messages"][-1]["content"]
+
+
+def test_single_round_trip_falls_back_when_invalid() -> None:
+    payloads = iter(
+        [
+            {"intent": "create-reminder", "content": "call Alex", "due": "2026-08-30T06:00:00Z"},
+            {"intent": "create-task", "content": "call Alex", "due": "2026-08-30T06:00:00Z"},
+        ]
+    )
+    requests: list[dict] = []
+
+    def responder(request: dict) -> dict:
+        requests.append(request)
+        if request["tool_choice"]["function"]["name"] == "get_current_date":
+            return default_tool_message(request, {})
+        return default_tool_message(request, next(payloads))
+
+    server = start_openai_server(responder=responder)
+    engine = IntentEngine(alias="stub", resolver=_resolver_for(server.url), mode="single")
+    try:
+        payload = engine.extract("follow up with Alex, due by August 30th")
+    finally:
+        engine.close()
+        server.close()
+
+    assert payload == {"intent": "create-task", "content": "call Alex", "due": "2026-08-30T06:00:00Z"}
+    assert len(requests) == 3
+
+
+def test_get_intent_mode() -> None:
+    assert get_intent_mode({}) == "single"
+    assert get_intent_mode({INTENT_MODE_ENV: "Multi-Turn"}) == "multi-turn"
+    with pytest.raises(ValueError):
+        get_intent_mode({INTENT_MODE_ENV: "twice"})
+
+
+def test_warm_up_resolves_endpoint_before_first_note() -> None:
+    server = start_openai_server()
+    resolved: list[str] = []
+
+    def resolver(alias: str) -> IntentEndpoint:
+        resolved.append(alias)
+        return IntentEndpoint(base_url=server.url, api_key="not-required", model_id="stub-model")
+
+    engine = IntentEngine(alias="stub-alias", resolver=resolver)
+    try:
+        engine.warm_up()
+        assert resolved == ["stub-alias"]
+        assert engine.extract("a note") is not None
+    finally:
+        engine.close()
+        server.close()
+
+    assert resolved == ["stub-alias"]
+
+
+def test_prompt_prefix_is_identical_across_transcripts() -> None:
+    server = start_openai_server()
+    engine = IntentEngine(alias="stub", resolver=_resolver_for(server.url), mode="single")
+    try:
+        engine.extract("Create a task to renew the car insurance.")
+        engine.extract("Idea: compare local models on battery.")
+    finally:
+        engine.close()
+        server.close()
+
+    prompt_tokens, cached_tokens = server.stats.prompt_tokens, server.stats.cached_tokens
+    # Everything up to the per-call context message is shared, so the second prefill is mostly cached.
+    assert cached_tokens[1] >= len(INTENT_SYSTEM_PROMPT) // 4
+    assert cached_tokens[1] / prompt_tokens[1] > 0.8
+
+
+def test_warm_up_primes_prompt_cache_and_records_usage() -> None:
+    server = start_openai_server(prefill_seconds_per_token=0.0001)
+    engine = IntentEngine(alias="stub", resolver=_resolver_for(server.url), mode="single")
+    before = {
+        "ttft": METRICS.sample("voice_inbox_llm_time_to_first_token_seconds", call="warm_up"),
+        "prompt": METRICS.sample("voice_inbox_llm_prompt_tokens_total", call="single"),
+        "cached": METRICS.sample("voice_inbox_llm_cached_prompt_tokens_total", call="single"),
+    }
+    try:
+        engine.warm_up()
+        assert engine.extract("Note that the offsite moved to June.") is not None
+    finally:
+        engine.close()
+        server.close()
+
+    note_tokens = server.stats.prompt_tokens[1]
+    assert server.stats.cached_tokens[0] == 0
+    assert server.stats.cached_tokens[1] >= len(INTENT_SYSTEM_PROMPT) // 4
+    assert METRICS.sample("voice_inbox_llm_time_to_first_token_seconds", call="warm_up") == before["ttft"] + 1
+    assert METRICS.sample("voice_inbox_llm_prompt_tokens_total", call="single") == before["prompt"] + note_tokens
+    assert (
+        METRICS.sample("voice_inbox_llm_cached_prompt_tokens_total", call="single")
+        == before["cached"] + server.stats.cached_tokens[1]
+    )
+
+
+def test_non_streamed_calls_record_latency_and_prompt_tokens(caplog) -> None:
+    server = start_openai_server()
+    engine = IntentEngine(alias="stub", resolver=_resolver_for(server.url), mode="single", stream=False)
+    before = {
+        "latency": METRICS.sample("voice_inbox_llm_request_seconds", call="single"),
+        "ttft": METRICS.sample("voice_inbox_llm_time_to_first_token_seconds", call="single"),
+    }
+    caplog.set_level("INFO")
+    try:
+        assert engine.extract("Note that the offsite moved to June.") is not None
+    finally:
+        engine.close()
+        server.close()
+
+    assert METRICS.sample("voice_inbox_llm_request_seconds", call="single") == before["latency"] + 1
+    # No first token to time without streaming; the total latency stands in under its own name.
+    assert METRICS.sample("voice_inbox_llm_time_to_first_token_seconds", call="single") == before["ttft"]
+    assert any(
+        record.getMessage().startswith("LLM call single:")
+        and f"{server.stats.prompt_tokens[0]} prompt tokens" in record.getMessage()
+        for record in caplog.records
+    )
+
+
+def test_json_object_scanner_finds_end_across_chunks() -> None:
+    scanner = _JsonObjectScanner()
+    chunks = ['{"content": "a } in', ' a \\"quoted\\" {string}", "nested": {"x"', ": 1}}", ' and then some text']
+
+    results = [scanner.feed(chunk) for chunk in chunks[:3]]
+
+    assert results[:2] == [None, None]
+    assert json.loads(results[2]) == {"content": 'a } in a "quoted" {string}', "nested": {"x": 1}}
+
+
+def test_streaming_returns_on_complete_arguments_and_aborts_trailing_tokens() -> None:
+    payload = {"intent": "create-task", "content": "renew the car insurance"}
+
+    def responder(request: dict) -> dict:
+        message = default_tool_message(request, payload)
+        # Small local models tend to keep generating after the object closes.
+        message["tool_calls"][0]["function"]["arguments"] += " I have created the task for you." * 20
+        return message
+
+    server = start_openai_server(responder=responder, stream_chunk_seconds=0.01)
+    engine = IntentEngine(alias="stub", resolver=_resolver_for(server.url), mode="single", stream=True)
+    early_stops = METRICS.sample("voice_inbox_llm_stream_early_stops_total", call="single")
+    try:
+        started = time.perf_counter()
+        result = engine.extract("Create a task to renew the car insurance.")
+        elapsed = time.perf_counter() - started
+        deadline = time.monotonic() + 2
+        while server.stats.aborted_streams == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        engine.close()
+        server.close()
+
+    assert result == payload
+    assert server.stats.requests == 1
+    assert server.stats.aborted_streams == 1
+    # The trailing text alone is ~40 more chunks at 10 ms each.
+    assert elapsed < 0.3
+    assert METRICS.sample("voice_inbox_llm_stream_early_stops_total", call="single") == early_stops + 1
+
+
+def test_streaming_falls_back_when_streamed_arguments_are_invalid() -> None:
+    server = start_openai_server(intent_payload={"intent": "create-note", "content": ""})
+    engine = IntentEngine(alias="stub", resolver=_resolver_for(server.url), mode="single", stream=True)
+    try:
+        result = engine.extract("a note")
+    finally:
+        engine.close()
+        server.close()
+
+    # Streamed single round trip, then get_current_date and three emit_intent turns that all stay invalid.
+    assert result is None
+    assert server.stats.requests == 5
+
+
+def test_get_intent_stream_enabled() -> None:
+    assert get_intent_stream_enabled({}) is False
+    assert get_intent_stream_enabled({INTENT_STREAM_ENV: "1"}) is True
+    with pytest.raises(ValueError):
+        get_intent_stream_enabled({INTENT_STREAM_ENV: "sometimes"})
+
+
+def test_async_engine_keeps_at_most_concurrency_requests_in_flight() -> None:
+    server = start_openai_server(decode_seconds_per_token=0.005)
+    resolved: list[str] = []
+
+    def resolver(alias: str) -> IntentEndpoint:
+        resolved.append(alias)
+        return IntentEndpoint(base_url=server.url, api_key="not-required", model_id="stub-model")
+
+    engine = AsyncIntentEngine(alias="stub", resolver=resolver, mode="single", concurrency=3)
+
+    async def run() -> list:
+        try:
+            return await asyncio.gather(*(engine.extract(f"note {index}") for index in range(9)))
+        finally:
+            await engine.close()
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        server.close()
+
+    assert results == [{"intent": "create-note", "content": "hello"}] * 9
+    assert resolved == ["stub"]
+    assert server.stats.requests == 9
+    assert server.stats.peak_sequences == 3
+
+
+def test_async_engine_streams_and_falls_back_like_the_sync_engine() -> None:
+    server = start_openai_server(intent_payload={"intent": "create-note", "content": ""})
+    engine = AsyncIntentEngine(alias="stub", resolver=_resolver_for(server.url), mode="single", stream=True)
+
+    async def run():
+        try:
+            return await engine.extract("a note")
+        finally:
+            await engine.close()
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        server.close()
+
+    assert result is None
+    assert server.stats.requests == 5
+
+
+def _batch_tool_message(items: list[dict]) -> dict:
+    return {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [
+            {
+                "id": "call_emit_intents",
+                "type": "function",
+                "function": {"name": "emit_intents", "arguments": json.dumps({"items": items})},
+            }
+        ],
+    }
+
+
+def test_extract_batch_resolves_transcripts_in_one_completion() -> None:
+    requests: list[dict] = []
+
+    def responder(request: dict) -> dict:
+        requests.append(request)
+        notes = json.loads(_user_content(request))
+        return _batch_tool_message(
+            [{"id": note["id"], "intent": note["prefix_intent"], "content": note["transcript"]} for note in notes]
+        )
+
+    server = start_openai_server(responder=responder)
+    engine = IntentEngine(alias="stub", resolver=_resolver_for(server.url))
+    try:
+        payloads = engine.extract_batch(["Remind me to water plants", "Blue is a nice color", "Follow up with Kim"])
+    finally:
+        engine.close()
+        server.close()
+
+    assert payloads == [
+        {"intent": "create-task", "content": "Remind me to water plants"},
+        {"intent": "create-note", "content": "Blue is a nice color"},
+        {"intent": "create-task", "content": "Follow up with Kim"},
+    ]
+    assert len(requests) == 1
+    assert requests[0]["tool_choice"]["function"]["name"] == "emit_intents"
+
+
+def test_extract_batch_retries_missing_and_invalid_items_one_by_one() -> None:
+    single_calls: list[str] = []
+
+    def responder(request: dict) -> dict:
+        if request["tool_choice"]["function"]["name"] == "emit_intents":
+            return _batch_tool_message(
+                [
+                    {"id": "1", "intent": "create-note", "content": "first"},
+                    {"id": "2", "intent": "create-reminder", "content": "second"},
+                ]
+            )
+        single_calls.append(_user_content(request))
+        return default_tool_message(request, {"intent": "create-note", "content": "single"})
+
+    server = start_openai_server(responder=responder)
+    engine = IntentEngine(alias="stub", resolver=_resolver_for(server.url), mode="single")
+    try:
+        payloads = engine.extract_batch(["one", "two", "three"])
+    finally:
+        engine.close()
+        server.close()
+
+    assert payloads == [
+        {"intent": "create-note", "content": "first"},
+        {"intent": "create-note", "content": "single"},
+        {"intent": "create-note", "content": "single"},
+    ]
+    assert single_calls == ["two", "three"]
+
+
+def test_extract_batch_falls_back_when_batch_call_is_unusable() -> None:
+    def responder(request: dict) -> dict:
+        if request["tool_choice"]["function"]["name"] == "emit_intents":
+            return {"role": "assistant", "content": "I cannot do that."}
+        return default_tool_message(request, {"intent": "create-note", "content": _user_content(request)})
+
+    server = start_openai_server(responder=responder)
+    engine = IntentEngine(alias="stub", resolver=_resolver_for(server.url))
+    try:
+        payloads = engine.extract_batch(["one", "two"])
+    finally:
+        engine.close()
+        server.close()
+
+    assert payloads == [{"intent": "create-note", "content": "one"}, {"intent": "create-note", "content": "two"}]
@@ -33,3 +33,14 @@ def test_prompt_includes_fallback_to_create_note() -> None:
     messages = _intent_messages("random note")
     system = messages[0]["content"]
     assert "Otherwise intent must be `create-note`" in system
+
+
+def test_write_intent_output_never_overwrites(tmp_path: Path) -> None:
+    paths = [
+        write_intent_output(tmp_path, {"intent": "create-note", "content": str(index)})
+        for index in range(4)
+    ]
+
+    assert len(set(paths)) == 4
+    stored = [json.loads(path.read_text(encoding="utf-8"))["content"] for path in paths]
+    assert stored == ["0", "1", "2", "3"]
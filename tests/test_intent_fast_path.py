@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from app import (
+    INTENT_FAST_PATH_ENV,
+    METRICS,
+    FastPathIntentExtractor,
+    classify_transcript_locally,
+    get_intent_fast_path_enabled,
+)
+
+FIXTURES = json.loads(
+    (Path(__file__).parent / "fixtures" / "intent_transcripts.json").read_text(encoding="utf-8")
+)
+TODAY = date(2026, 2, 1)
+
+
+def test_plain_transcripts_resolve_locally() -> None:
+    assert classify_transcript_locally(FIXTURES["create_task"], TODAY) == {
+        "intent": "create-task",
+        "content": FIXTURES["create_task"],
+    }
+    assert classify_transcript_locally(f"  {FIXTURES['create_note']} ", TODAY) == {
+        "intent": "create-note",
+        "content": FIXTURES["create_note"],
+    }
+
+
+@pytest.mark.parametrize("key", ["due_date", "reminder"])
+def test_ambiguous_temporal_expressions_need_llm(key: str) -> None:
+    assert classify_transcript_locally(FIXTURES[key], TODAY) is None
+
+
+def test_due_and_reminder_dates_resolve_to_next_occurrence() -> None:
+    transcript = (
+        "Follow-up with my boss. Latest by August 30th. "
+        "Remind me August 20th. We should talk about our AI strategy."
+    )
+    payload = classify_transcript_locally(transcript, date(2026, 9, 1))
+    assert payload == {
+        "intent": "create-task",
+        "content": transcript,
+        "due": "2027-08-30T06:00:00Z",
+        "reminder": "2027-08-20T06:00:00Z",
+    }
+
+
+def test_remind_by_tomorrow() -> None:
+    payload = classify_transcript_locally(
+        "Remind me by tomorrow to upload the performance review files.", TODAY
+    )
+    assert payload is not None
+    assert payload["intent"] == "create-task"
+    assert payload["reminder"] == "2026-02-02T06:00:00Z"
+    assert "due" not in payload
+
+
+@pytest.mark.parametrize(
+    "transcript",
+    [
+        "Call Sam on August 20th",
+        "Remind me tomorrow at 5pm to call Sam",
+        "Follow up with Alex. Latest by February 30th",
+        "Latest by August 1st and latest by August 2nd",
+        "Submit the report by the 5th",
+        "Create a task pay rent on the 1st",
+        "Remind me at 5 to call mom",
+        "Remind me at five to call mom",
+        "Create a task call Bob in 2 hrs",
+        "Create a task to renew the passport, it expires in 3 wks",
+        "Note: flight leaves 10/20",
+        "Remind me on 20.11.",
+        "Create a task to water the plants every 30 mins",
+        "Create a task send the invoice by Fri",
+        "Buy a gift before Christmas",
+        "Buy candy for Halloween",
+        "Call dad tonite",
+        "Remind me to call mom on the first",
+        "Remind me to call mom on the 1st",
+        "Remind me to pay the gas bill on the twenty-first",
+        "Create a task book the table for Thanksgiving",
+        "Create a task pick up the cake tmrw",
+        "Remind me 2morrow to email Sam",
+        "Send the deck by eow",
+    ],
+)
+def test_unresolvable_dates_need_llm(transcript: str) -> None:
+    assert classify_transcript_locally(transcript, TODAY) is None
+
+
+def test_extractor_tracks_hit_rate_and_only_calls_llm_for_misses() -> None:
+    llm_calls: list[str] = []
+
+    def llm(transcript: str) -> dict[str, str]:
+        llm_calls.append(transcript)
+        time.sleep(0.01)
+        return {"intent": "create-task", "content": transcript}
+
+    extractor = FastPathIntentExtractor(llm)
+    hits = METRICS.sample("voice_inbox_intent_fast_path_total", result="hit")
+    misses = METRICS.sample("voice_inbox_intent_fast_path_total", result="miss")
+    extractor(FIXTURES["create_note"])
+    extractor(FIXTURES["create_task"])
+    extractor(FIXTURES["due_date"])
+
+    stats = extractor.stats()
+    assert llm_calls == [FIXTURES["due_date"]]
+    assert METRICS.sample("voice_inbox_intent_fast_path_total", result="hit") == hits + 2
+    assert METRICS.sample("voice_inbox_intent_fast_path_total", result="miss") == misses + 1
+    assert (stats.hits, stats.misses) == (2, 1)
+    assert stats.hit_rate == pytest.approx(2 / 3)
+    assert stats.llm_seconds > 0
+
+    # Hits after the first miss are credited with the mean LLM latency they avoided.
+    saved = METRICS.sample("voice_inbox_intent_fast_path_saved_seconds_total")
+    extractor(FIXTURES["create_task"])
+    assert METRICS.sample("voice_inbox_intent_fast_path_saved_seconds_total") > saved
+
+
+
+def test_extract_batch_sends_only_misses_to_batch_fallback() -> None:
+    batches: list[list[str]] = []
+
+    def llm_batch(transcripts: list[str]) -> list[dict[str, str]]:
+        batches.append(transcripts)
+        return [{"intent": "create-task", "content": transcript} for transcript in transcripts]
+
+    extractor = FastPathIntentExtractor(lambda _: None, fallback_batch=llm_batch)
+    payloads = extractor.extract_batch(
+        [FIXTURES["create_note"], FIXTURES["due_date"], FIXTURES["create_task"], FIXTURES["reminder"]]
+    )
+
+    assert batches == [[FIXTURES["due_date"], FIXTURES["reminder"]]]
+    assert [payload["content"] for payload in payloads] == [
+        FIXTURES["create_note"],
+        FIXTURES["due_date"],
+        FIXTURES["create_task"],
+        FIXTURES["reminder"],
+    ]
+    assert (extractor.stats().hits, extractor.stats().misses) == (2, 2)
+
+def test_extract_async_awaits_async_fallback_for_misses_only() -> None:
+    llm_calls: list[str] = []
+
+    async def llm(transcript: str) -> dict[str, str]:
+        llm_calls.append(transcript)
+        return {"intent": "create-task", "content": transcript}
+
+    extractor = FastPathIntentExtractor(lambda _: None, fallback_async=llm)
+
+    async def run() -> list:
+        return await asyncio.gather(
+            extractor.extract_async(FIXTURES["create_note"]), extractor.extract_async(FIXTURES["due_date"])
+        )
+
+    note, due = asyncio.run(run())
+
+    assert note == {"intent": "create-note", "content": FIXTURES["create_note"]}
+    assert due == {"intent": "create-task", "content": FIXTURES["due_date"]}
+    assert llm_calls == [FIXTURES["due_date"]]
+    assert (extractor.stats().hits, extractor.stats().misses) == (1, 1)
+
+
+def test_fast_path_env_toggle() -> None:
+    assert get_intent_fast_path_enabled({}) is True
+    assert get_intent_fast_path_enabled({INTENT_FAST_PATH_ENV: "0"}) is False
+    with pytest.raises(ValueError):
+        get_intent_fast_path_enabled({INTENT_FAST_PATH_ENV: "maybe"})
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app import (
+    INTENT_CONSTRAINED_ENV,
+    INTENT_VALIDATOR,
+    IntentEndpoint,
+    IntentEngine,
+    get_intent_constrained_enabled,
+)
+from tests.helpers.openai_server import default_tool_message, start_openai_server
+
+
+def _resolver_for(url: str):
+    def resolver(_: str) -> IntentEndpoint:
+        return IntentEndpoint(base_url=url, api_key="not-required", model_id="stub-model")
+
+    return resolver
+
+
+def test_validator_enforces_enum_pattern_and_closed_schema() -> None:
+    assert INTENT_VALIDATOR.errors({"intent": "create-task", "content": "x", "due": "2026-08-30T06:00:00+00:00"}) == []
+    assert INTENT_VALIDATOR.errors({"intent": "create-reminder", "content": "x"}) == [
+        "`intent` must be one of: create-note, create-task"
+    ]
+    assert INTENT_VALIDATOR.errors({"intent": "create-note", "content": "x", "due": "tomorrow"}) == [
+        "`due` must match ^\\d{4}-\\d{2}-\\d{2}T\\d{2}:\\d{2}:\\d{2}(Z|\\+00:00)$"
+    ]
+    assert INTENT_VALIDATOR.errors({"intent": "create-note", "content": "  ", "extra": 1}) == [
+        "`content` must match \\S",
+        "`extra` is not allowed",
+    ]
+    assert INTENT_VALIDATOR.errors({"content": 5}) == ["`intent` is required", "`content` must be a string"]
+    assert INTENT_VALIDATOR.errors(["create-note"]) == ["arguments must be a JSON object"]
+
+
+@pytest.mark.parametrize(
+    ("payload", "expected"),
+    [
+        (
+            {"intent": "create-task", "content": "call Alex", "due": "2026-08-30"},
+            {"intent": "create-task", "content": "call Alex", "due": "2026-08-30T06:00:00Z"},
+        ),
+        (
+            {"intent": "Create-Task", "content": " call Alex ", "due": "T2026-08-30T09:15:00+02:00"},
+            {"intent": "create-task", "content": "call Alex", "due": "2026-08-30T07:15:00Z"},
+        ),
+        (
+            {"intent": "create-task", "content": "call Alex", "due": "2026-08-30T09:15:00", "reminder": True},
+            {
+                "intent": "create-task",
+                "content": "call Alex",
+                "due": "2026-08-30T09:15:00Z",
+                "reminder": "2026-08-30T09:15:00Z",
+            },
+        ),
+        (
+            {"intent": "create-task", "content": "call Alex", "reminder": True, "due": None, "id": "1"},
+            {"intent": "create-task", "content": "call Alex"},
+        ),
+        (
+            {"intent": "create-note", "content": "idea", "reminder": False},
+            {"intent": "create-note", "content": "idea"},
+        ),
+    ],
+)
+def test_repair_fixes_common_model_mistakes(payload: dict, expected: dict) -> None:
+    assert INTENT_VALIDATOR.repair(payload) == expected
+
+
+def test_repair_keeps_valid_payload_and_rejects_unfixable_ones() -> None:
+    payload = {"intent": "create-note", "content": "idea", "due": "2026-08-30T06:00:00+00:00"}
+
+    assert INTENT_VALIDATOR.repair(payload) is payload
+    assert INTENT_VALIDATOR.repair({"intent": "create-reminder", "content": "x"}) is None
+    assert INTENT_VALIDATOR.repair({"intent": "create-note", "content": "   "}) is None
+    assert INTENT_VALIDATOR.repair({"intent": "create-note", "content": "x", "due": "next week"}) is None
+    assert INTENT_VALIDATOR.repair("create-note") is None
+
+
+def test_multi_turn_hands_validation_errors_back_to_the_model() -> None:
+    payloads = iter(
+        [
+            {"intent": "create-reminder", "content": "call Alex"},
+            {"intent": "create-task", "content": "call Alex"},
+        ]
+    )
+    requests: list[dict] = []
+
+    def responder(request: dict) -> dict:
+        requests.append(request)
+        if (request.get("tool_choice") or {}) == {"type": "function", "function": {"name": "get_current_date"}}:
+            return default_tool_message(request, {})
+        return default_tool_message(request, next(payloads))
+
+    server = start_openai_server(responder=responder)
+    engine = IntentEngine(alias="stub", resolver=_resolver_for(server.url), mode="multi-turn")
+    try:
+        payload = engine.extract("follow up with Alex")
+    finally:
+        engine.close()
+        server.close()
+
+    assert payload == {"intent": "create-task", "content": "call Alex"}
+    assert len(requests) == 3
+    feedback = json.loads(requests[-1]["messages"][-1]["content"])
+    assert "`intent` must be one of" in feedback["error"]
+
+
+def test_constrained_mode_sends_strict_schema_and_skips_fallback() -> None:
+    requests: list[dict] = []
+
+    def responder(request: dict) -> dict:
+        requests.append(request)
+        return default_tool_message(request, {"intent": "create-reminder", "content": "x"})
+
+    server = start_openai_server(responder=responder)
+    engine = IntentEngine(alias="stub", resolver=_resolver_for(server.url), mode="single", constrained=True)
+    try:
+        payload = engine.extract("a note")
+    finally:
+        engine.close()
+        server.close()
+
+    assert payload is None
+    assert len(requests) == 1
+    emit_intent = requests[0]["tools"][0]["function"]
+    assert emit_intent["strict"] is True
+    assert emit_intent["parameters"]["required"] == ["intent", "content", "due", "reminder"]
+    assert emit_intent["parameters"]["properties"]["due"]["type"] == ["string", "null"]
+
+
+def test_get_intent_constrained_enabled() -> None:
+    assert get_intent_constrained_enabled({}) is False
+    assert get_intent_constrained_enabled({INTENT_CONSTRAINED_ENV: "true"}) is True
+    with pytest.raises(ValueError):
+        get_intent_constrained_enabled({INTENT_CONSTRAINED_ENV: "grammar"})
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+import app
+from app import INTENT_FILE_SUFFIX, JobJournal, journal_key, process_inbox_once
+from tests.helpers.webhook_server import start_webhook_server
+
+
+def _fail(*_: object) -> str:
+    raise AssertionError("Completed stage must not run again.")
+
+
+def test_journal_records_all_stages(temp_config, test_logger, monkeypatch) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    mp3_file = temp_config.inbox_dir / "voice.mp3"
+    mp3_file.write_text("data", encoding="utf-8")
+    key = journal_key(mp3_file)
+
+    server = start_webhook_server()
+    monkeypatch.setenv("V2A_CREATE_TODO_WEBHOOK_URL", server.url)
+    journal = JobJournal(temp_config.work_dir / "jobs.sqlite3")
+    try:
+        process_inbox_once(
+            temp_config,
+            test_logger,
+            lambda _: "follow up with Sam",
+            set(),
+            lambda transcript: {"intent": "create-task", "content": transcript},
+            journal=journal,
+        )
+        stages = journal.completed_stages(key)
+    finally:
+        journal.close()
+        server.close()
+
+    assert list(stages) == ["transcribed", "intent_written", "webhook_queued", "archived"]
+    assert stages["transcribed"] == {"transcript": "follow up with Sam"}
+    assert not mp3_file.exists()
+
+
+def test_restart_resumes_after_intent_written(temp_config, test_logger, monkeypatch) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.work_dir.mkdir(parents=True, exist_ok=True)
+    mp3_file = temp_config.inbox_dir / "voice.mp3"
+    mp3_file.write_text("data", encoding="utf-8")
+    key = journal_key(mp3_file)
+
+    # State left behind by a crash between writing the intent and delivering/moving.
+    payload = {"intent": "create-task", "content": "call Sam"}
+    intent_path = temp_config.work_dir / f"20260201T010203{INTENT_FILE_SUFFIX}"
+    intent_path.write_text(json.dumps(payload), encoding="utf-8")
+    journal = JobJournal(temp_config.work_dir / "jobs.sqlite3")
+    journal.record(key, "transcribed", {"transcript": "call Sam"})
+    journal.record(key, "intent_written", {"intent_path": str(intent_path), "payload": payload})
+    journal.record(key, "webhook_queued")
+    journal.close()
+
+    monkeypatch.setattr(app, "write_intent_output", _fail)
+    monkeypatch.setattr(app, "send_create_todo_webhook", _fail)
+    monkeypatch.setenv("V2A_CREATE_TODO_WEBHOOK_URL", "http://127.0.0.1:9")
+    journal = JobJournal(temp_config.work_dir / "jobs.sqlite3")
+    try:
+        process_inbox_once(temp_config, test_logger, _fail, set(), _fail, journal=journal)
+        stages = journal.completed_stages(key)
+    finally:
+        journal.close()
+
+    assert (temp_config.processed_dir / "20260201T010203-voice.mp3").exists()
+    assert "archived" in stages
+
+
+def test_restart_reuses_transcript(temp_config, test_logger) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    mp3_file = temp_config.inbox_dir / "voice.mp3"
+    mp3_file.write_text("data", encoding="utf-8")
+    journal = JobJournal(temp_config.work_dir / "jobs.sqlite3")
+    journal.record(journal_key(mp3_file), "transcribed", {"transcript": "from journal"})
+    seen: list[str] = []
+
+    def intent(transcript: str) -> dict[str, str]:
+        seen.append(transcript)
+        return {"intent": "create-note", "content": transcript}
+
+    try:
+        process_inbox_once(
+            temp_config, test_logger, _fail, set(), intent, transcribe_batch_func=_fail, journal=journal
+        )
+    finally:
+        journal.close()
+
+    assert seen == ["from journal"]
+    assert not mp3_file.exists()
+
+
+def test_file_vanishing_before_resume_is_skipped(temp_config, test_logger, monkeypatch) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    for name in ("a.mp3", "b.mp3", "c.mp3"):
+        (temp_config.inbox_dir / name).write_text("data", encoding="utf-8")
+
+    def vanishing_key(audio_path: Path) -> str:
+        # As if the user deleted b.mp3 between listing the inbox and resuming its job.
+        if audio_path.name == "b.mp3":
+            audio_path.unlink()
+        return journal_key(audio_path)
+
+    monkeypatch.setattr(app, "journal_key", vanishing_key)
+    journal = JobJournal(temp_config.work_dir / "jobs.sqlite3")
+    try:
+        process_inbox_once(
+            temp_config,
+            test_logger,
+            lambda path: path.stem,
+            set(),
+            lambda transcript: {"intent": "create-note", "content": transcript},
+            journal=journal,
+        )
+    finally:
+        journal.close()
+
+    assert list(temp_config.inbox_dir.iterdir()) == []
+    assert len(list(temp_config.processed_dir.iterdir())) == 2
+
+def test_journal_uses_wal_and_rejects_unknown_stage(tmp_path: Path) -> None:
+    journal = JobJournal(tmp_path / "jobs.sqlite3")
+    try:
+        mode = journal._connection.execute("PRAGMA journal_mode").fetchone()[0]
+        with pytest.raises(ValueError):
+            journal.record("voice.mp3:4:1", "emailed")
+    finally:
+        journal.close()
+    assert mode == "wal"
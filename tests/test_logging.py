@@ -1,14 +1,136 @@
 from __future__ import annotations
 
+import json
+import logging
+import logging.handlers
+import threading
 from pathlib import Path
 
-from app import LOG_FILE_NAME, setup_logging
+import pytest
+
+import app
+from app import (
+    LOG_FILE_NAME,
+    LOG_FORMAT_ENV,
+    flush_logging,
+    get_log_format,
+    log_context,
+    process_inbox_once,
+    setup_logging,
+    stop_logging,
+)
+
+
+@pytest.fixture(autouse=True)
+def _stop_listener():
+    yield
+    stop_logging()
 
 
 def test_setup_logging_creates_log_file(tmp_path: Path) -> None:
     logger = setup_logging(tmp_path)
     logger.info("log entry")
+    flush_logging()
 
     log_file = tmp_path / LOG_FILE_NAME
     assert log_file.exists()
     assert "log entry" in log_file.read_text(encoding="utf-8")
+
+
+def test_records_are_written_off_the_logging_thread(tmp_path: Path) -> None:
+    logger = setup_logging(tmp_path)
+    writers: list[str] = []
+
+    class RecordingHandler(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            writers.append(threading.current_thread().name)
+
+    assert len(logger.handlers) == 1
+    assert isinstance(logger.handlers[0], logging.handlers.QueueHandler)
+    # The listener thread owns the real handlers; add one to observe where writes happen.
+    app._log_listener.handlers = (*app._log_listener.handlers, RecordingHandler())
+    logger.info("off the hot path")
+    flush_logging()
+
+    assert writers and threading.current_thread().name not in writers
+
+
+def test_json_format_carries_job_context_and_duration(tmp_path: Path) -> None:
+    logger = setup_logging(tmp_path, log_format="json")
+    with log_context(file="voice.mp3", stage="intent", correlation_id="abc123"):
+        logger.info("Intent for %s", "voice.mp3", extra={"duration": 0.25})
+    logger.info("outside")
+    flush_logging()
+
+    lines = (tmp_path / LOG_FILE_NAME).read_text(encoding="utf-8").splitlines()
+    inside, outside = (json.loads(line) for line in lines)
+    assert inside["message"] == "Intent for voice.mp3"
+    assert inside["level"] == "INFO"
+    assert (inside["file"], inside["stage"], inside["correlation_id"]) == ("voice.mp3", "intent", "abc123")
+    assert inside["duration_ms"] == 250.0
+    assert "ts" in inside
+    assert set(outside) == {"ts", "level", "message"}
+
+
+def test_pipeline_logs_share_a_correlation_id_per_file(temp_config) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    for name in ("a.mp3", "b.mp3"):
+        (temp_config.inbox_dir / name).write_text("data", encoding="utf-8")
+    logger = setup_logging(temp_config.work_dir, log_format="json")
+
+    process_inbox_once(
+        temp_config,
+        logger,
+        lambda path: path.stem,
+        set(),
+        lambda transcript: {"intent": "create-note", "content": transcript},
+    )
+    flush_logging()
+
+    entries = [json.loads(line) for line in (temp_config.work_dir / LOG_FILE_NAME).read_text().splitlines()]
+    by_file: dict[str, set[str]] = {}
+    for entry in entries:
+        if "file" in entry:
+            by_file.setdefault(entry["file"], set()).add(entry["correlation_id"])
+    assert set(by_file) == {"a.mp3", "b.mp3"}
+    assert all(len(ids) == 1 for ids in by_file.values())
+    assert by_file["a.mp3"] != by_file["b.mp3"]
+    stages = {entry["stage"] for entry in entries if entry.get("file") == "a.mp3"}
+    assert {"transcribe", "output", "archive"} <= stages
+    done = next(entry for entry in entries if entry["message"].startswith("Processed a.mp3"))
+    assert done["duration_ms"] >= 0
+
+
+def test_log_file_rotates_by_size(tmp_path: Path) -> None:
+    logger = setup_logging(tmp_path, max_bytes=2048, backup_count=2)
+    for index in range(200):
+        logger.info("entry %03d %s", index, "x" * 40)
+    flush_logging()
+
+    assert (tmp_path / LOG_FILE_NAME).stat().st_size <= 2048
+    assert (tmp_path / f"{LOG_FILE_NAME}.1").exists()
+    assert (tmp_path / f"{LOG_FILE_NAME}.2").exists()
+    assert not (tmp_path / f"{LOG_FILE_NAME}.3").exists()
+
+
+def test_get_log_format() -> None:
+    assert get_log_format({}) == "text"
+    assert get_log_format({LOG_FORMAT_ENV: "JSON"}) == "json"
+    with pytest.raises(ValueError):
+        get_log_format({LOG_FORMAT_ENV: "xml"})
+
+
+def test_json_format_keeps_exceptions_in_their_own_field(tmp_path: Path) -> None:
+    logger = setup_logging(tmp_path, log_format="json")
+    try:
+        raise RuntimeError("disk full")
+    except RuntimeError:
+        logger.exception("Failed to write %s", "voice.mp3")
+    flush_logging()
+
+    entry = json.loads((tmp_path / LOG_FILE_NAME).read_text(encoding="utf-8"))
+    assert entry["message"] == "Failed to write voice.mp3"
+    assert entry["level"] == "ERROR"
+    assert entry["exception"].startswith("Traceback")
+    assert "RuntimeError: disk full" in entry["exception"]
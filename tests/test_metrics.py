@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from app import (
+    METRICS,
+    METRICS_HOST_ENV,
+    METRICS_PORT_ENV,
+    IntentEndpoint,
+    IntentEngine,
+    MetricsRegistry,
+    get_metrics_address,
+    process_inbox_once,
+    start_metrics_server,
+)
+from tests.helpers.openai_server import start_openai_server
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe("voice_inbox_decode_seconds", 0.05)
+    registry.observe("voice_inbox_decode_seconds", 0.5)
+    registry.observe("voice_inbox_decode_seconds", 5)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE voice_inbox_decode_seconds histogram" in lines
+    assert 'voice_inbox_decode_seconds_bucket{le="0.1"} 1' in lines
+    assert 'voice_inbox_decode_seconds_bucket{le="1"} 2' in lines
+    assert 'voice_inbox_decode_seconds_bucket{le="+Inf"} 3' in lines
+    assert "voice_inbox_decode_seconds_sum 5.55" in lines
+    assert "voice_inbox_decode_seconds_count 3" in lines
+
+
+def test_counters_gauges_and_callbacks_render_with_labels() -> None:
+    registry = MetricsRegistry()
+    registry.increment("voice_inbox_failures_total", stage="intent")
+    registry.increment("voice_inbox_failures_total", stage="intent")
+    registry.set_gauge("voice_inbox_queue_depth", 3, stage="archive")
+    registry.gauge_callback("voice_inbox_queue_depth", lambda: {(("stage", "webhook_outbox"),): 7})
+
+    lines = registry.render().splitlines()
+
+    assert 'voice_inbox_failures_total{stage="intent"} 2' in lines
+    assert 'voice_inbox_queue_depth{stage="archive"} 3' in lines
+    assert 'voice_inbox_queue_depth{stage="webhook_outbox"} 7' in lines
+    assert registry.sample("voice_inbox_failures_total", stage="intent") == 2
+    assert registry.sample("voice_inbox_failures_total", stage="webhook") == 0
+
+
+def test_metrics_server_serves_registry() -> None:
+    registry = MetricsRegistry()
+    registry.increment("voice_inbox_files_processed_total")
+    server = start_metrics_server(("127.0.0.1", 0), registry)
+    host, port = server.server_address
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            body = response.read().decode("utf-8")
+            content_type = response.headers["Content-Type"]
+        with pytest.raises(urllib.error.HTTPError) as missing:
+            urllib.request.urlopen(f"http://{host}:{port}/other", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert "voice_inbox_files_processed_total 1" in body.splitlines()
+    assert missing.value.code == 404
+
+
+def test_pipeline_records_stage_metrics(temp_config, test_logger) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    for name in ("ok.mp3", "fails.mp3"):
+        (temp_config.inbox_dir / name).write_text("data", encoding="utf-8")
+    before = {
+        "scans": METRICS.sample("voice_inbox_scan_seconds"),
+        "moves": METRICS.sample("voice_inbox_move_seconds"),
+        "processed": METRICS.sample("voice_inbox_files_processed_total"),
+        "failures": METRICS.sample("voice_inbox_failures_total", stage="intent"),
+    }
+
+    def intent(transcript: str) -> dict[str, str] | None:
+        return None if transcript == "fails" else {"intent": "create-note", "content": transcript}
+
+    process_inbox_once(temp_config, test_logger, lambda path: path.stem, set(), intent)
+
+    assert METRICS.sample("voice_inbox_scan_seconds") == before["scans"] + 1
+    assert METRICS.sample("voice_inbox_move_seconds") == before["moves"] + 1
+    assert METRICS.sample("voice_inbox_files_processed_total") == before["processed"] + 1
+    assert METRICS.sample("voice_inbox_failures_total", stage="intent") == before["failures"] + 1
+
+
+def test_each_llm_round_trip_is_timed() -> None:
+    server = start_openai_server()
+    engine = IntentEngine(
+        alias="stub",
+        resolver=lambda _: IntentEndpoint(base_url=server.url, api_key="not-required", model_id="stub-model"),
+        mode="multi-turn",
+    )
+    before = {
+        call: METRICS.sample("voice_inbox_llm_request_seconds", call=call)
+        for call in ("get_current_date", "emit_intent")
+    }
+    try:
+        assert engine.extract("a note") is not None
+    finally:
+        engine.close()
+        server.close()
+
+    for call, count in before.items():
+        assert METRICS.sample("voice_inbox_llm_request_seconds", call=call) == count + 1
+
+
+def test_get_metrics_address() -> None:
+    assert get_metrics_address({}) is None
+    assert get_metrics_address({METRICS_PORT_ENV: "9464"}) == ("127.0.0.1", 9464)
+    assert get_metrics_address({METRICS_PORT_ENV: "9464", METRICS_HOST_ENV: "0.0.0.0"}) == ("0.0.0.0", 9464)
+    with pytest.raises(ValueError):
+        get_metrics_address({METRICS_PORT_ENV: "70000"})
+    with pytest.raises(ValueError):
+        get_metrics_address({METRICS_PORT_ENV: "metrics"})
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import queue
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+import app
+from app import (
+    _STAGE_DONE,
+    INTENT_FILE_SUFFIX,
+    EventLoopThread,
+    InboxJob,
+    JobJournal,
+    PipelineSettings,
+    _drive_async_stage,
+    load_config,
+    process_inbox_once,
+)
+
+
+def _write_mp3s(inbox_dir: Path, count: int) -> list[Path]:
+    inbox_dir.mkdir(parents=True, exist_ok=True)
+    paths = [inbox_dir / f"voice-{index:02d}.mp3" for index in range(count)]
+    for path in paths:
+        path.write_text("data", encoding="utf-8")
+    return paths
+
+
+def test_intent_stage_overlaps_transcription(temp_config, test_logger) -> None:
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    _write_mp3s(temp_config.inbox_dir, 2)
+    first_intent_started = threading.Event()
+    overlapped: list[bool] = []
+
+    def transcriber(path: Path) -> str:
+        if path.name == "voice-01.mp3":
+            # Only returns promptly if the first note already reached the intent stage.
+            overlapped.append(first_intent_started.wait(timeout=5))
+        return path.stem
+
+    def intent(transcript: str) -> dict[str, str]:
+        if transcript == "voice-00":
+            first_intent_started.set()
+        return {"intent": "create-note", "content": transcript}
+
+    process_inbox_once(temp_config, test_logger, transcriber, set(), intent)
+
+    assert overlapped == [True]
+    assert len(list(temp_config.processed_dir.iterdir())) == 2
+
+
+def test_outputs_follow_inbox_order_with_parallel_intents(
+    temp_config, test_logger, monkeypatch
+) -> None:
+    config = replace(
+        temp_config,
+        pipeline=PipelineSettings(intent_workers=4, output_workers=2, queue_size=2),
+    )
+    config.processed_dir.mkdir(parents=True, exist_ok=True)
+    _write_mp3s(config.inbox_dir, 8)
+    written: list[str] = []
+    counter = iter(range(100))
+
+    def fake_write_intent_output(work_dir: Path, payload: dict[str, str]) -> Path:
+        work_dir.mkdir(parents=True, exist_ok=True)
+        written.append(payload["content"])
+        intent_path = work_dir / f"20260201T1010{next(counter):02d}{INTENT_FILE_SUFFIX}"
+        intent_path.write_text(json.dumps(payload), encoding="utf-8")
+        return intent_path
+
+    monkeypatch.setattr(app, "write_intent_output", fake_write_intent_output)
+    release = threading.Event()
+
+    def intent(transcript: str) -> dict[str, str]:
+        # Hold back the first note so later notes finish their intent stage first.
+        if transcript == "voice-00":
+            release.wait(timeout=5)
+        else:
+            release.set()
+        return {"intent": "create-note", "content": transcript}
+
+    process_inbox_once(config, test_logger, lambda path: path.stem, set(), intent)
+
+    assert written == [f"voice-{index:02d}" for index in range(8)]
+    assert list(config.inbox_dir.iterdir()) == []
+    assert len(list(config.processed_dir.iterdir())) == 8
+
+
+def test_failed_intent_does_not_block_later_outputs(temp_config, test_logger) -> None:
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    first, second = _write_mp3s(temp_config.inbox_dir, 2)
+
+    def intent(transcript: str) -> dict[str, str] | None:
+        if transcript == "voice-00":
+            return None
+        return {"intent": "create-note", "content": transcript}
+
+    process_inbox_once(temp_config, test_logger, lambda path: path.stem, set(), intent)
+
+    assert first.exists()
+    assert not second.exists()
+    assert len(list(temp_config.processed_dir.iterdir())) == 1
+
+
+def test_load_pipeline_settings(tmp_path: Path) -> None:
+    config = load_config(
+        root=tmp_path,
+        environ={"V2A_INTENT_WORKERS": "3", "V2A_PIPELINE_QUEUE_SIZE": "16", "V2A_INTENT_CONCURRENCY": "8"},
+    )
+    assert config.pipeline == PipelineSettings(intent_workers=3, queue_size=16, intent_concurrency=8)
+
+    with pytest.raises(ValueError):
+        load_config(root=tmp_path, environ={"V2A_OUTPUT_WORKERS": "0"})
+    with pytest.raises(ValueError):
+        load_config(root=tmp_path, environ={"V2A_INTENT_CONCURRENCY": "0"})
+
+
+def test_intent_stage_batches_waiting_transcripts(temp_config, test_logger) -> None:
+    config = replace(temp_config, pipeline=PipelineSettings(intent_batch_size=8, queue_size=8))
+    config.processed_dir.mkdir(parents=True, exist_ok=True)
+    _write_mp3s(config.inbox_dir, 6)
+    first_intent_started = threading.Event()
+    all_transcribed = threading.Event()
+    transcribed: list[str] = []
+    single: list[str] = []
+    batches: list[list[str]] = []
+
+    def transcriber(path: Path) -> str:
+        if path.stem != "voice-00":
+            first_intent_started.wait(timeout=5)
+        transcribed.append(path.stem)
+        if len(transcribed) == 6:
+            all_transcribed.set()
+        return path.stem
+
+    def intent(transcript: str) -> dict[str, str]:
+        # The first note arrives alone; hold it until the rest of the backlog is waiting.
+        first_intent_started.set()
+        all_transcribed.wait(timeout=5)
+        time.sleep(0.1)  # the last transcript is queued just after the transcriber returns
+        single.append(transcript)
+        return {"intent": "create-note", "content": transcript}
+
+    def intent_batch(transcripts: list[str]) -> list[dict[str, str] | None]:
+        batches.append(transcripts)
+        return [
+            None if transcript == "voice-03" else {"intent": "create-note", "content": transcript}
+            for transcript in transcripts
+        ]
+
+    process_inbox_once(config, test_logger, transcriber, set(), intent, intent_batch_func=intent_batch)
+
+    assert single == ["voice-00"]
+    assert batches == [[f"voice-{index:02d}" for index in range(1, 6)]]
+    # A failed batch item is not retried here: the batch function already did that.
+    assert sorted(path.stem for path in config.inbox_dir.iterdir()) == ["voice-03"]
+    assert len(list(config.processed_dir.iterdir())) == 5
+
+
+def test_intent_stage_falls_back_to_single_calls_when_batch_raises(temp_config, test_logger) -> None:
+    config = replace(temp_config, pipeline=PipelineSettings(intent_batch_size=4, queue_size=4))
+    config.processed_dir.mkdir(parents=True, exist_ok=True)
+    _write_mp3s(config.inbox_dir, 3)
+    single: list[str] = []
+
+    def intent(transcript: str) -> dict[str, str]:
+        single.append(transcript)
+        return {"intent": "create-note", "content": transcript}
+
+    def intent_batch(transcripts: list[str]) -> list[dict[str, str] | None]:
+        raise RuntimeError("model returned garbage")
+
+    process_inbox_once(config, test_logger, lambda path: path.stem, set(), intent, intent_batch_func=intent_batch)
+
+    assert sorted(single) == ["voice-00", "voice-01", "voice-02"]
+    assert len(list(config.processed_dir.iterdir())) == 3
+
+
+def test_async_intent_stage_keeps_concurrency_transcripts_in_flight(temp_config, test_logger) -> None:
+    config = replace(temp_config, pipeline=PipelineSettings(intent_concurrency=3, queue_size=8))
+    config.processed_dir.mkdir(parents=True, exist_ok=True)
+    _write_mp3s(config.inbox_dir, 7)
+    in_flight = 0
+    peak = 0
+    threads: set[str] = set()
+
+    async def intent(transcript: str) -> dict[str, str] | None:
+        nonlocal in_flight, peak
+        threads.add(threading.current_thread().name)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return None if transcript == "voice-04" else {"intent": "create-note", "content": transcript}
+
+    def sync_intent(transcript: str) -> dict[str, str]:
+        raise AssertionError("the async intent function should be used")
+
+    loop = EventLoopThread("test-intent-loop")
+    try:
+        process_inbox_once(
+            config, test_logger, lambda path: path.stem, set(), sync_intent, intent_async_func=intent, intent_loop=loop
+        )
+    finally:
+        loop.close()
+
+    assert peak == 3
+    assert threads == {"test-intent-loop"}
+    assert sorted(path.stem for path in config.inbox_dir.iterdir()) == ["voice-04"]
+    assert len(list(config.processed_dir.iterdir())) == 6
+
+
+def test_stage_exception_fails_only_that_job(temp_config, test_logger) -> None:
+    config = replace(temp_config, pipeline=PipelineSettings(queue_size=2))
+    config.processed_dir.mkdir(parents=True, exist_ok=True)
+    _write_mp3s(config.inbox_dir, 12)
+    journal = JobJournal(config.work_dir / "jobs.sqlite3")
+    record = journal.record
+
+    def failing_record(key: str, stage: str, data: dict | None = None) -> None:
+        if key.startswith(("voice-03", "voice-07")) and stage in ("transcribed", "intent_written"):
+            raise OSError("disk full")
+        record(key, stage, data)
+
+    journal.record = failing_record  # type: ignore[method-assign]
+
+    def intent(transcript: str) -> dict[str, str]:
+        return {"intent": "create-note", "content": transcript}
+
+    # voice-03 breaks the transcribe stage and voice-07 the output stage; neither may stall the scan.
+    scan = threading.Thread(
+        target=process_inbox_once,
+        args=(config, test_logger, lambda path: path.stem, set(), intent),
+        kwargs={"journal": journal},
+        daemon=True,
+    )
+    scan.start()
+    scan.join(timeout=10)
+    journal.close()
+
+    assert not scan.is_alive()
+    assert sorted(path.stem for path in config.inbox_dir.iterdir()) == ["voice-03", "voice-07"]
+    assert len(list(config.processed_dir.iterdir())) == 10
+
+
+def test_async_stage_fails_a_raising_job_and_keeps_draining(test_logger, tmp_path: Path) -> None:
+    source: queue.Queue = queue.Queue()
+    sink: queue.Queue = queue.Queue()
+    jobs = [InboxJob(sequence=index, audio_path=tmp_path / f"voice-{index:02d}.mp3") for index in range(5)]
+    for job in jobs:
+        source.put(job)
+    source.put(_STAGE_DONE)
+
+    async def handler(job: InboxJob) -> InboxJob:
+        await asyncio.sleep(0.01 * job.sequence)
+        if job.sequence == 1:
+            raise RuntimeError("boom")
+        job.transcript = "done"
+        return job
+
+    asyncio.run(_drive_async_stage(handler, "intent", source, sink, 2, test_logger))
+
+    forwarded = [sink.get_nowait() for _ in range(sink.qsize())]
+    assert sorted(job.sequence for job in forwarded) == [0, 1, 2, 3, 4]
+    assert [job.sequence for job in forwarded if job.failed] == [1]
+    assert all(job.transcript == "done" for job in forwarded if not job.failed)
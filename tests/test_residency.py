@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app import (
+    MODEL_IDLE_TIMEOUT_ENV,
+    EventLoopThread,
+    IntentEndpoint,
+    IntentEngine,
+    ModelResidency,
+    TranscriptionBackend,
+    WhisperTranscriber,
+    get_model_idle_timeout,
+    process_resident_bytes,
+)
+from tests.helpers.openai_server import start_openai_server
+
+
+class _CountingBackend(TranscriptionBackend):
+    name = "counting"
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        return f"{audio.shape[0]} samples"
+
+
+def _write_tone(path: Path, seconds: float = 1.0) -> Path:
+    t = np.arange(int(seconds * 16000)) / 16000
+    audio = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(16000)
+        handle.writeframes(audio.tobytes())
+    return path
+
+
+def test_idle_model_is_unloaded_and_reloads_on_next_use() -> None:
+    unloads: list[str] = []
+    residency = ModelResidency(60, check_interval_seconds=3600)
+    residency.register("model", lambda: unloads.append("model"))
+    try:
+        with residency.use("model"):
+            pass
+        assert residency.unload_idle(now=time.monotonic() + 30) == []
+        assert residency.unload_idle(now=time.monotonic() + 61) == ["model"]
+        assert residency.unload_idle(now=time.monotonic() + 120) == []
+
+        with residency.use("model"):
+            pass
+        stats = residency.stats()[0]
+    finally:
+        residency.close()
+
+    assert unloads == ["model"]
+    assert (stats.name, stats.resident, stats.loads, stats.unloads) == ("model", True, 2, 1)
+
+
+def test_model_in_use_is_never_unloaded() -> None:
+    unloads: list[str] = []
+    residency = ModelResidency(0.01, check_interval_seconds=3600)
+    residency.register("model", lambda: unloads.append("model"))
+    try:
+        with residency.use("model"):
+            assert residency.unload_idle(now=time.monotonic() + 10) == []
+        assert residency.unload_idle(now=time.monotonic() + 10) == ["model"]
+    finally:
+        residency.close()
+
+    assert unloads == ["model"]
+
+
+def test_background_checker_unloads_idle_model() -> None:
+    unloaded = threading.Event()
+    residency = ModelResidency(0.05, check_interval_seconds=0.02)
+    residency.register("model", unloaded.set)
+    try:
+        residency.guard("model", lambda: None)()
+        assert unloaded.wait(timeout=2)
+    finally:
+        residency.close()
+
+
+def test_failed_unload_keeps_model_resident() -> None:
+    def unload() -> None:
+        raise RuntimeError("service unavailable")
+
+    residency = ModelResidency(1, check_interval_seconds=3600)
+    residency.register("model", unload)
+    try:
+        with residency.use("model"):
+            pass
+        assert residency.unload_idle(now=time.monotonic() + 5) == []
+        assert residency.stats()[0].resident
+    finally:
+        residency.close()
+
+
+def test_unloading_an_async_model_while_a_request_enters_its_guard() -> None:
+    # The async intent engine closes its client on the event loop; a request entering the guard on that same
+    # loop must not block the loop while the unload waits for it.
+    loop = EventLoopThread("test-residency-loop")
+    residency = ModelResidency(0.01, check_interval_seconds=3600)
+    unload_started = threading.Event()
+
+    def unload() -> None:
+        unload_started.set()
+        time.sleep(0.05)  # let the request reach the guard
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop.loop).result(timeout=2)
+
+    async def request() -> str:
+        return "intent"
+
+    residency.register("intent", unload)
+    guarded = residency.guard_async("intent", request)
+    try:
+        assert loop.run(guarded()) == "intent"
+        time.sleep(0.02)
+        sweeper = threading.Thread(target=residency.unload_idle)
+        sweeper.start()
+        unload_started.wait(timeout=2)
+        result = asyncio.run_coroutine_threadsafe(guarded(), loop.loop).result(timeout=5)
+        sweeper.join(timeout=5)
+        stats = residency.stats()[0]
+    finally:
+        residency.close()
+        loop.close()
+
+    assert result == "intent"
+    assert not sweeper.is_alive()
+    assert (stats.resident, stats.loads, stats.unloads) == (True, 2, 1)
+
+def test_transcriber_unload_drops_backend_until_next_clip(tmp_path: Path) -> None:
+    loaded: list[str] = []
+
+    def loader(model_name: str) -> TranscriptionBackend:
+        loaded.append(model_name)
+        return _CountingBackend()
+
+    transcriber = WhisperTranscriber(model_name="base", backend_loader=loader)
+    audio_path = _write_tone(tmp_path / "note.wav")
+
+    assert transcriber.transcribe(audio_path) == "16000 samples"
+    transcriber.unload()
+    assert loaded == ["base"]
+    assert transcriber.transcribe(audio_path) == "16000 samples"
+    assert loaded == ["base", "base"]
+
+
+def test_intent_engine_unload_asks_foundry_to_unload_and_reconnects() -> None:
+    server = start_openai_server()
+    resolved: list[str] = []
+    unloaded: list[str] = []
+
+    def resolver(alias: str) -> IntentEndpoint:
+        resolved.append(alias)
+        return IntentEndpoint(base_url=server.url, api_key="not-required", model_id="stub-model")
+
+    engine = IntentEngine(alias="stub-alias", resolver=resolver, unloader=unloaded.append)
+    try:
+        assert engine.extract("first") is not None
+        engine.unload()
+        assert unloaded == ["stub-alias"]
+        assert engine.extract("second") is not None
+    finally:
+        engine.close()
+        server.close()
+
+    assert resolved == ["stub-alias", "stub-alias"]
+
+
+def test_process_resident_bytes() -> None:
+    resident = process_resident_bytes()
+    if resident is None:
+        pytest.skip("/proc/self/statm not available")
+    assert resident > 0
+
+
+def test_get_model_idle_timeout() -> None:
+    assert get_model_idle_timeout({}) == 900
+    assert get_model_idle_timeout({MODEL_IDLE_TIMEOUT_ENV: "0"}) == 0
+    assert get_model_idle_timeout({MODEL_IDLE_TIMEOUT_ENV: "120"}) == 120
+    with pytest.raises(ValueError):
+        get_model_idle_timeout({MODEL_IDLE_TIMEOUT_ENV: "-1"})
+    with pytest.raises(ValueError):
+        get_model_idle_timeout({MODEL_IDLE_TIMEOUT_ENV: "soon"})
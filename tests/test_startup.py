@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from app import PREWARM_ENV, PROMPT_WARMUP_ENV, get_prewarm_enabled, get_prompt_warmup_enabled, start_prewarm
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_import_and_empty_scan_do_not_load_heavy_modules(tmp_path: Path) -> None:
+    code = f"""
+import json, pathlib, sys
+import app
+config = app.load_config(pathlib.Path({str(tmp_path)!r}))
+app.ensure_directories(config)
+transcriber = app.WhisperTranscriber()
+engine = app.IntentEngine()
+app.process_inbox_once(config, app.setup_logging(config.work_dir), transcriber.transcribe, set(), engine.extract)
+print(json.dumps([name for name in ("torch", "whisper", "numpy", "openai", "foundry_local") if name in sys.modules]))
+"""
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+
+    assert json.loads(completed.stdout.strip().splitlines()[-1]) == []
+
+
+def test_prewarm_loads_in_background_and_survives_failures(test_logger, caplog) -> None:
+    release = threading.Event()
+    loaded: list[str] = []
+
+    def slow_load() -> None:
+        release.wait(timeout=5)
+        loaded.append("whisper")
+
+    def failing_load() -> None:
+        raise ConnectionError("Foundry Local not running")
+
+    caplog.set_level("INFO")
+    thread = start_prewarm({"transcription model": slow_load, "intent model": failing_load}, test_logger)
+    assert loaded == []
+    release.set()
+    thread.join(timeout=5)
+
+    assert loaded == ["whisper"]
+    assert any("Pre-warming intent model failed" in record.message for record in caplog.records)
+
+
+def test_get_prewarm_enabled() -> None:
+    assert get_prewarm_enabled({}) is False
+    assert get_prewarm_enabled({PREWARM_ENV: "1"}) is True
+
+
+def test_get_prompt_warmup_enabled() -> None:
+    assert get_prompt_warmup_enabled({}) is True
+    assert get_prompt_warmup_enabled({PROMPT_WARMUP_ENV: "0"}) is False
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import logging
+import shutil
+import tracemalloc
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import app
+from app import (
+    TranscriptionBackend,
+    STREAM_MIN_SECONDS_ENV,
+    VoiceActivityDetector,
+    WhisperTranscriber,
+    get_stream_min_seconds,
+    iter_audio_windows,
+    merge_overlapping_text,
+    transcribe_segments,
+)
+
+pytest.importorskip("av")
+
+SAMPLE_RATE = 16000
+WORDS = 95
+
+
+def _frequency(word: int) -> float:
+    return 200.0 + 20 * (word % 40)
+
+
+def _write_long_wav(path: Path, seconds: int = WORDS) -> Path:
+    # One tone per second; the tone encodes the "word" spoken in that second.
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(SAMPLE_RATE)
+        for word in range(seconds):
+            tone = 0.3 * np.sin(2 * np.pi * _frequency(word) * t)
+            handle.writeframes((tone * 32767).astype("<i2").tobytes())
+    return path
+
+
+class _ToneModel(TranscriptionBackend):
+    # Stand-in for Whisper: "recognises" one word per second from the dominant frequency.
+    name = "tone"
+
+    def __init__(self) -> None:
+        self.window_lengths: list[int] = []
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        self.window_lengths.append(audio.shape[0])
+        words = []
+        for start in range(0, audio.shape[0] - SAMPLE_RATE + 1, SAMPLE_RATE):
+            spectrum = np.abs(np.fft.rfft(audio[start : start + SAMPLE_RATE]))
+            words.append(f"f{int(np.argmax(spectrum))}")
+        return " ".join(words)
+
+
+def _expected_words(seconds: int = WORDS) -> list[str]:
+    return [f"f{int(_frequency(word))}" for word in range(seconds)]
+
+
+def test_windows_overlap_and_reuse_one_buffer(tmp_path: Path) -> None:
+    path = _write_long_wav(tmp_path / "memo.wav")
+
+    windows = list(iter_audio_windows(path, window_seconds=30, overlap_seconds=2))
+
+    # 0-30, 28-58, 56-86, 84-95
+    assert [window.shape[0] / SAMPLE_RATE for window in windows] == [30, 30, 30, 11]
+    assert all(np.shares_memory(windows[0], window) for window in windows[1:])
+
+
+def test_segments_stream_before_the_file_is_finished(tmp_path: Path) -> None:
+    path = _write_long_wav(tmp_path / "memo.wav")
+    model = _ToneModel()
+
+    segments = transcribe_segments(model.transcribe, path)
+    first = next(segments)
+
+    assert len(model.window_lengths) == 1
+    assert first.split() == _expected_words()[:30]
+    rest = list(segments)
+    assert " ".join([first, *rest]).split() == _expected_words()
+
+
+def test_streaming_memory_is_bounded_by_the_window(tmp_path: Path) -> None:
+    path = _write_long_wav(tmp_path / "memo.wav")
+
+    tracemalloc.start()
+    for _ in iter_audio_windows(path, window_seconds=10, overlap_seconds=1):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    full_clip_bytes = WORDS * SAMPLE_RATE * 4
+    assert peak < full_clip_bytes / 3
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs the ffmpeg executable")
+def test_ffmpeg_fallback_streams_in_bounded_memory(tmp_path: Path, monkeypatch) -> None:
+    path = _write_long_wav(tmp_path / "memo.wav")
+    monkeypatch.setattr(app, "_load_av", lambda: None)
+    model = _ToneModel()
+
+    tracemalloc.start()
+    text = " ".join(transcribe_segments(model.transcribe, path, window_seconds=10, overlap_seconds=1))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert text.split() == _expected_words()
+    assert peak < WORDS * SAMPLE_RATE * 4 / 3
+
+
+def test_transcriber_streams_long_recordings(tmp_path: Path, test_logger, caplog) -> None:
+    path = _write_long_wav(tmp_path / "memo.wav")
+    model = _ToneModel()
+    transcriber = WhisperTranscriber(backend_loader=lambda _: model, stream_min_seconds=60, logger=test_logger)
+    windows_at_first_segment: list[int] = []
+
+    class FirstSegment(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            if record.getMessage().startswith("Transcript segment 1 "):
+                windows_at_first_segment.append(len(model.window_lengths))
+
+    test_logger.addHandler(FirstSegment())
+    caplog.set_level("INFO")
+
+    text = transcriber.transcribe(path)
+
+    # Segments are published as their window finishes, but `transcribe` (what the pipeline's intent stage
+    # consumes) returns only the joined text of the whole recording.
+    assert windows_at_first_segment == [1]
+    assert len(model.window_lengths) == 4
+    assert text.split() == _expected_words()
+    assert max(model.window_lengths) == 30 * SAMPLE_RATE
+    assert sum("Transcript segment" in record.message for record in caplog.records) == 4
+
+
+def test_streamed_windows_count_towards_the_vad_report(tmp_path: Path, test_logger) -> None:
+    path = _write_long_wav(tmp_path / "memo.wav")
+    model = _ToneModel()
+    vad = VoiceActivityDetector(logger=test_logger)
+    transcriber = WhisperTranscriber(
+        backend_loader=lambda _: model, vad=vad, stream_min_seconds=60, logger=test_logger
+    )
+
+    transcriber.transcribe(path)
+
+    stats = vad.stats()
+    assert stats.inference_audio_seconds == sum(model.window_lengths) / SAMPLE_RATE
+    assert stats.inference_seconds > 0
+
+
+def test_merge_overlapping_text() -> None:
+    assert merge_overlapping_text("we should call Sam about the", "about the budget today") == "budget today"
+    assert merge_overlapping_text("please call Sam.", "Call Sam tomorrow") == "tomorrow"
+    assert merge_overlapping_text("", "hello there") == "hello there"
+    assert merge_overlapping_text("one two", "three four") == "three four"
+
+
+def test_get_stream_min_seconds() -> None:
+    assert get_stream_min_seconds({}) == 120
+    assert get_stream_min_seconds({STREAM_MIN_SECONDS_ENV: "600"}) == 600
@@ -45,3 +45,53 @@ def test_no_transcript_files_written(temp_config) -> None:
     assert log_path in work_files
     intent_files = [path for path in work_files if path.name.endswith("-intent.json")]
     assert len(intent_files) == 1
+
+
+def _dummy_intent(transcript: str) -> dict[str, str]:
+    return {"intent": "create-note", "content": transcript}
+
+
+def test_batch_transcription_used_for_waiting_files(temp_config, test_logger) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    for name in ("a.mp3", "b.mp3", "c.mp3"):
+        (temp_config.inbox_dir / name).write_text("data", encoding="utf-8")
+    batches: list[list[str]] = []
+
+    def single(_: Path) -> str:
+        raise AssertionError("Per-file transcription should not be used for a batch.")
+
+    def batch(paths: list[Path]) -> list[str]:
+        batches.append([path.name for path in paths])
+        return [path.stem for path in paths]
+
+    process_inbox_once(
+        temp_config, test_logger, single, set(), _dummy_intent, transcribe_batch_func=batch
+    )
+
+    assert batches == [["a.mp3", "b.mp3", "c.mp3"]]
+    assert len(list(temp_config.processed_dir.iterdir())) == 3
+
+
+def test_batch_transcription_falls_back_per_file(temp_config, test_logger, caplog) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    for name in ("a.mp3", "b.mp3"):
+        (temp_config.inbox_dir / name).write_text("data", encoding="utf-8")
+    single_calls: list[str] = []
+
+    def single(path: Path) -> str:
+        single_calls.append(path.name)
+        return path.stem
+
+    def batch(_: list[Path]) -> list[str]:
+        raise RuntimeError("decoder out of memory")
+
+    caplog.set_level("ERROR")
+    process_inbox_once(
+        temp_config, test_logger, single, set(), _dummy_intent, transcribe_batch_func=batch
+    )
+
+    assert single_calls == ["a.mp3", "b.mp3"]
+    assert any("Batch transcription failed" in record.message for record in caplog.records)
+    assert len(list(temp_config.processed_dir.iterdir())) == 2
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import app
+from app import (
+    TRANSCRIBE_BACKEND_ENV,
+    CTranslate2WhisperBackend,
+    TranscriptionBackend,
+    WhisperProcessPool,
+    get_transcribe_backend,
+    load_transcription_backend,
+)
+from tests.helpers.fake_whisper import load_sample_count_backend
+
+SAMPLE_MP3 = Path(__file__).resolve().parents[1] / "audio_samples" / "sample-recording-4-remind-by-tomorrow.mp3"
+
+
+def test_get_transcribe_backend() -> None:
+    assert get_transcribe_backend({}) == "whisper"
+    assert get_transcribe_backend({TRANSCRIBE_BACKEND_ENV: " CTranslate2 "}) == "ctranslate2"
+    with pytest.raises(ValueError):
+        get_transcribe_backend({TRANSCRIBE_BACKEND_ENV: "onnx-gpu"})
+
+
+def test_load_transcription_backend_uses_selected_backend(monkeypatch) -> None:
+    created: list[str] = []
+
+    class StubBackend(TranscriptionBackend):
+        name = "stub"
+
+        def __init__(self, model_name: str) -> None:
+            created.append(model_name)
+
+    monkeypatch.setitem(app.TRANSCRIBE_BACKENDS, "ctranslate2", StubBackend)
+    monkeypatch.setenv(TRANSCRIBE_BACKEND_ENV, "ctranslate2")
+
+    assert isinstance(load_transcription_backend("small"), StubBackend)
+    assert created == ["small"]
+
+
+def test_default_batch_transcribes_each_clip() -> None:
+    class LengthBackend(TranscriptionBackend):
+        def transcribe(self, audio: np.ndarray) -> str:
+            return str(audio.shape[0])
+
+    clips = [np.zeros(3, dtype=np.float32), np.zeros(5, dtype=np.float32)]
+    assert LengthBackend().transcribe_batch(clips) == ["3", "5"]
+
+
+def test_ctranslate2_backend_requires_faster_whisper(monkeypatch) -> None:
+    monkeypatch.setitem(sys.modules, "faster_whisper", None)
+    with pytest.raises(RuntimeError, match="faster-whisper"):
+        CTranslate2WhisperBackend("base")
+
+
+def test_pool_workers_pass_decoded_audio_to_backends(test_logger) -> None:
+    pytest.importorskip("av")
+    pool = WhisperProcessPool(1, threads_per_worker=1, model_loader=load_sample_count_backend, logger=test_logger)
+    try:
+        text = pool.transcribe(SAMPLE_MP3)
+    finally:
+        pool.close()
+
+    samples = int(text.split()[0])
+    assert 4.0 < samples / 16000 < 5.0
+
+
+def test_pool_workers_stream_long_recordings(tmp_path: Path, test_logger) -> None:
+    pytest.importorskip("av")
+    path = tmp_path / "memo.wav"
+    tone = 0.3 * np.sin(2 * np.pi * 220 * np.arange(70 * 16000) / 16000)
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(16000)
+        handle.writeframes((tone * 32767).astype("<i2").tobytes())
+    pool = WhisperProcessPool(
+        1, threads_per_worker=1, model_loader=load_sample_count_backend, logger=test_logger, stream_min_seconds=60
+    )
+    try:
+        text = pool.transcribe(path)
+    finally:
+        pool.close()
+
+    # 30-second windows with 2 seconds overlap (0-30, 28-58, 56-70) instead of one 70-second clip; the middle
+    # window reads the same as the first, so the overlap merge drops it.
+    counts = [int(word) for word in text.split() if word.isdigit()]
+    assert counts == [30 * 16000, 14 * 16000]
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import json
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app import (
+    INTENT_VALIDATOR,
+    METRICS,
+    JobJournal,
+    TranscriptionBackend,
+    VAD_THRESHOLD_DB_ENV,
+    VoiceActivityDetector,
+    WhisperProcessPool,
+    WhisperTranscriber,
+    get_vad_enabled,
+    get_vad_threshold_db,
+    journal_key,
+    process_inbox_once,
+    trim_silence,
+)
+from tests.helpers.fake_whisper import load_sample_count_backend
+
+SAMPLE_RATE = 16000
+
+
+def _tone(seconds: float, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.normal(0, 1e-4, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+def _write_wav(path: Path, audio: np.ndarray) -> Path:
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(SAMPLE_RATE)
+        handle.writeframes((audio * 32767).astype("<i2").tobytes())
+    return path
+
+
+def test_trim_silence_cuts_lead_in_and_tail_out() -> None:
+    audio = np.concatenate([_silence(2), _tone(1), _silence(3)])
+
+    trimmed = trim_silence(audio)
+
+    # One second of speech plus up to 300 ms of padding on each side, rounded to 30 ms frames.
+    assert 1.5 <= trimmed.shape[0] / SAMPLE_RATE <= 1.7
+    assert trimmed.dtype == np.float32
+
+
+def test_trim_silence_keeps_short_pauses_and_cuts_long_gaps() -> None:
+    short_pause = np.concatenate([_tone(1), _silence(0.3), _tone(1)])
+    long_gap = np.concatenate([_tone(1), _silence(5), _tone(1)])
+
+    assert trim_silence(short_pause).shape == short_pause.shape
+    assert trim_silence(long_gap).shape[0] / SAMPLE_RATE < 3
+
+
+def test_trim_silence_returns_empty_for_silence() -> None:
+    assert trim_silence(_silence(3)).shape == (0,)
+    assert trim_silence(np.zeros(0, dtype=np.float32)).shape == (0,)
+
+
+def test_detector_reports_removed_seconds_and_saving(test_logger) -> None:
+    detector = VoiceActivityDetector(logger=test_logger)
+    detector.record_inference(audio_seconds=10, elapsed_seconds=2)
+
+    detector.trim(np.concatenate([_silence(4), _tone(1), _silence(5)]), "note.mp3")
+    detector.trim(_silence(2), "silent.mp3")
+    stats = detector.stats()
+
+    assert stats.files == 2
+    assert stats.silent_files == 1
+    assert stats.audio_seconds == pytest.approx(12)
+    assert 10.2 < stats.removed_seconds < 10.6
+    assert stats.saved_seconds == pytest.approx(stats.removed_seconds * 0.2)
+
+
+class _RecordingBackend(TranscriptionBackend):
+    name = "recording"
+
+    def __init__(self) -> None:
+        self.lengths: list[int] = []
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        self.lengths.append(audio.shape[0])
+        return "hello"
+
+
+def test_transcriber_skips_silent_files_without_loading_model(tmp_path: Path, test_logger) -> None:
+    pytest.importorskip("av")
+    loaded: list[str] = []
+    model = _RecordingBackend()
+
+    def loader(name: str) -> _RecordingBackend:
+        loaded.append(name)
+        return model
+
+    transcriber = WhisperTranscriber(vad=VoiceActivityDetector(logger=test_logger), backend_loader=loader)
+    silent = _write_wav(tmp_path / "silent.wav", _silence(5))
+    speech = _write_wav(tmp_path / "speech.wav", np.concatenate([_silence(3), _tone(1), _silence(3)]))
+
+    assert transcriber.transcribe(silent) == ""
+    assert transcriber.transcribe_batch([silent, silent]) == ["", ""]
+    assert loaded == []
+
+    assert transcriber.transcribe(speech) == "hello"
+    assert loaded == ["base"]
+    assert model.lengths[0] / SAMPLE_RATE < 2
+
+
+def test_pool_workers_report_vad_trimming_to_the_parent(tmp_path: Path, test_logger, caplog) -> None:
+    pytest.importorskip("av")
+    silent = _write_wav(tmp_path / "silent.wav", _silence(5))
+    speech = _write_wav(tmp_path / "speech.wav", np.concatenate([_silence(3), _tone(1), _silence(3)]))
+    vad = VoiceActivityDetector(logger=test_logger)
+    silent_files = METRICS.sample("voice_inbox_vad_silent_files_total")
+    removed_seconds = METRICS.sample("voice_inbox_vad_removed_seconds_total")
+    caplog.set_level("INFO")
+    pool = WhisperProcessPool(
+        1, threads_per_worker=1, model_loader=load_sample_count_backend, logger=test_logger, vad=vad
+    )
+    try:
+        assert pool.transcribe(silent) == ""
+        pool.transcribe(speech)
+    finally:
+        pool.close()
+
+    stats = vad.stats()
+    assert stats.files == 2
+    assert stats.silent_files == 1
+    assert stats.removed_seconds > 10
+    assert stats.inference_audio_seconds == pytest.approx(stats.audio_seconds - stats.removed_seconds)
+    assert METRICS.sample("voice_inbox_vad_silent_files_total") == silent_files + 1
+    assert METRICS.sample("voice_inbox_vad_removed_seconds_total") == pytest.approx(
+        removed_seconds + stats.removed_seconds
+    )
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(message.startswith("No speech detected in silent.wav") for message in messages)
+    assert any(message.startswith("VAD removed") and "speech.wav" in message for message in messages)
+
+
+def test_empty_transcript_is_archived_without_intent_extraction(temp_config, test_logger) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    (temp_config.inbox_dir / "silent.mp3").write_text("data", encoding="utf-8")
+    (temp_config.inbox_dir / "spoken.mp3").write_text("data", encoding="utf-8")
+    journal = JobJournal(temp_config.work_dir / "journal.sqlite3")
+    keys = {path.name: journal_key(path) for path in temp_config.inbox_dir.iterdir()}
+
+    def intent(transcript: str) -> dict[str, str]:
+        assert transcript.strip(), "Intent extraction must not run for an empty transcript."
+        return {"intent": "create-note", "content": transcript}
+
+    transcripts = {"silent.mp3": "", "spoken.mp3": "hello"}
+    process_inbox_once(temp_config, test_logger, lambda path: transcripts[path.name], set(), intent, journal=journal)
+
+    assert sorted(path.name.split("-", 1)[1] for path in temp_config.processed_dir.iterdir()) == [
+        "silent.mp3",
+        "spoken.mp3",
+    ]
+    # Only the spoken note leaves an intent file, and every intent file passes the schema.
+    written = [json.loads(path.read_text(encoding="utf-8")) for path in temp_config.work_dir.glob("*-intent.json")]
+    assert written == [{"intent": "create-note", "content": "hello"}]
+    assert all(INTENT_VALIDATOR.is_valid(payload) for payload in written)
+    assert set(journal.completed_stages(keys["silent.mp3"])) == {"transcribed", "archived"}
+
+
+def test_vad_settings() -> None:
+    assert get_vad_enabled({}) is True
+    assert get_vad_enabled({"V2A_VAD": "0"}) is False
+    assert get_vad_threshold_db({}) == -45.0
+    assert get_vad_threshold_db({VAD_THRESHOLD_DB_ENV: "-50"}) == -50.0
+    with pytest.raises(ValueError):
+        get_vad_threshold_db({VAD_THRESHOLD_DB_ENV: "3"})
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import sys
+import threading
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+import app
+from app import InotifyWatcher, create_inbox_watcher, process_inbox_once, run_inbox_loop
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+
+
+@linux_only
+def test_inotify_reports_closed_and_renamed_files(tmp_path: Path) -> None:
+    inbox_dir = tmp_path / "inbox"
+    inbox_dir.mkdir()
+    watcher = InotifyWatcher(inbox_dir)
+    try:
+        (inbox_dir / "written.mp3").write_bytes(b"data")
+        staged = tmp_path / "staged.mp3"
+        staged.write_bytes(b"data")
+        staged.rename(inbox_dir / "renamed.mp3")
+
+        changed = watcher.wait(1.0)
+    finally:
+        watcher.close()
+
+    assert sorted(path.name for path in changed) == ["renamed.mp3", "written.mp3"]
+
+
+@linux_only
+def test_inotify_wait_times_out_without_changes(tmp_path: Path) -> None:
+    watcher = InotifyWatcher(tmp_path)
+    try:
+        assert watcher.wait(0.01) == []
+    finally:
+        watcher.close()
+
+
+def test_poll_mode_disables_watcher(temp_config, test_logger) -> None:
+    config = replace(temp_config, watch_mode="poll")
+    assert create_inbox_watcher(config, test_logger) is None
+
+
+def test_process_only_changed_paths(temp_config, test_logger) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+
+    changed = temp_config.inbox_dir / "changed.mp3"
+    untouched = temp_config.inbox_dir / "untouched.mp3"
+    changed.write_text("data", encoding="utf-8")
+    untouched.write_text("data", encoding="utf-8")
+    transcribed: list[str] = []
+
+    def dummy_transcriber(path: Path) -> str:
+        transcribed.append(path.name)
+        return "hello"
+
+    def dummy_intent(_: str) -> dict[str, str]:
+        return {"intent": "create-note", "content": "hello"}
+
+    process_inbox_once(
+        temp_config,
+        test_logger,
+        dummy_transcriber,
+        set(),
+        dummy_intent,
+        paths=[changed, temp_config.inbox_dir / "already-gone.mp3"],
+    )
+
+    assert transcribed == ["changed.mp3"]
+    assert untouched.exists()
+
+
+class _ScriptedWatcher:
+    def __init__(self, batches: list[tuple[list[Path], bool]], stop_event: threading.Event) -> None:
+        self.batches = batches
+        self.stop_event = stop_event
+        self.overflowed = False
+        self.timeouts: list[float] = []
+
+    def wait(self, timeout_seconds: float) -> list[Path]:
+        self.timeouts.append(timeout_seconds)
+        changed, overflowed = self.batches.pop(0)
+        self.overflowed = overflowed
+        if not self.batches:
+            self.stop_event.set()
+        return changed
+
+
+def _record_scans(monkeypatch) -> list[list[Path] | None]:
+    scans: list[list[Path] | None] = []
+
+    def fake_process_inbox_once(*args, paths=None, **kwargs) -> None:
+        scans.append(paths)
+
+    monkeypatch.setattr(app, "process_inbox_once", fake_process_inbox_once)
+    return scans
+
+
+def test_queue_overflow_forces_a_full_rescan(temp_config, test_logger, monkeypatch) -> None:
+    scans = _record_scans(monkeypatch)
+    stop_event = threading.Event()
+    note = temp_config.inbox_dir / "note.mp3"
+    watcher = _ScriptedWatcher([([note], False), ([], True), ([note], False)], stop_event)
+
+    run_inbox_loop(temp_config, test_logger, str, lambda _: None, watcher, stop_event=stop_event)
+
+    assert scans == [None, [note], None, [note]]
+    assert not watcher.overflowed
+
+
+def test_full_rescan_runs_on_schedule_under_steady_events(temp_config, test_logger, monkeypatch) -> None:
+    scans = _record_scans(monkeypatch)
+    clock = [1000.0]
+    monkeypatch.setattr(app.time, "monotonic", lambda: clock[0])
+    stop_event = threading.Event()
+    note = temp_config.inbox_dir / "note.mp3"
+
+    class _TickingWatcher(_ScriptedWatcher):
+        def wait(self, timeout_seconds: float) -> list[Path]:
+            clock[0] += 20.0
+            return super().wait(timeout_seconds)
+
+    watcher = _TickingWatcher([([note], False)] * 4, stop_event)
+
+    run_inbox_loop(temp_config, test_logger, str, lambda _: None, watcher, stop_event=stop_event)
+
+    # scan_interval_seconds is 30 and every wait returns an event after 20 seconds.
+    assert scans == [None, [note], None, [note], None]
+    assert watcher.timeouts == [30.0, 10.0, 30.0, 10.0]
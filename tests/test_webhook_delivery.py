@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+import app
+from app import (
+    CREATE_TODO_BATCH_WEBHOOK_ENV,
+    JobJournal,
+    WebhookDelivery,
+    get_create_todo_batch_webhook_url,
+    journal_key,
+    parse_batch_webhook_results,
+    process_inbox_once,
+    webhook_retry_delay,
+)
+from tests.helpers.webhook_server import start_webhook_server
+
+
+def _delivery(outbox: Path, test_logger, **kwargs) -> WebhookDelivery:
+    kwargs.setdefault("retry_base_seconds", 0.01)
+    kwargs.setdefault("retry_max_seconds", 0.05)
+    return WebhookDelivery(outbox, test_logger, **kwargs)
+
+
+def test_delivery_reuses_keep_alive_connection(tmp_path: Path, test_logger) -> None:
+    server = start_webhook_server(keep_alive=True)
+    delivery = _delivery(tmp_path / "outbox", test_logger, workers=1, per_endpoint_concurrency=1)
+    try:
+        for index in range(5):
+            delivery.submit(server.url, {"title": f"task {index}"})
+        assert delivery.flush(timeout_seconds=5)
+    finally:
+        delivery.close()
+        server.close()
+
+    titles = [json.loads(server.queue.get_nowait().body)["title"] for _ in range(5)]
+    assert titles == [f"task {index}" for index in range(5)]
+    assert server.stats.connections == 1
+    assert list((tmp_path / "outbox").glob("*.json")) == []
+
+
+def test_delivery_retries_server_errors(tmp_path: Path, test_logger) -> None:
+    server = start_webhook_server(response_statuses=[500, 503, 200])
+    delivery = _delivery(tmp_path / "outbox", test_logger)
+    try:
+        delivery.submit(server.url, {"title": "Ping"})
+        assert delivery.flush(timeout_seconds=5)
+    finally:
+        delivery.close()
+        server.close()
+
+    assert server.queue.qsize() == 3
+    assert list((tmp_path / "outbox").glob("*.json")) == []
+    assert list((tmp_path / "outbox" / "failed").iterdir()) == []
+
+
+def test_client_errors_are_not_retried(tmp_path: Path, test_logger, caplog) -> None:
+    server = start_webhook_server(response_status=400, response_body="bad request")
+    delivery = _delivery(tmp_path / "outbox", test_logger)
+    caplog.set_level("ERROR")
+    try:
+        delivery.submit(server.url, {"title": "Ping"})
+        assert delivery.flush(timeout_seconds=5)
+    finally:
+        delivery.close()
+        server.close()
+
+    assert server.queue.qsize() == 1
+    assert len(list((tmp_path / "outbox" / "failed").glob("*.json"))) == 1
+    assert any("Webhook response payload" in record.message for record in caplog.records)
+
+
+def test_per_endpoint_concurrency_limit(tmp_path: Path, test_logger) -> None:
+    server = start_webhook_server(latency_seconds=0.05)
+    delivery = _delivery(tmp_path / "outbox", test_logger, workers=6, per_endpoint_concurrency=2)
+    try:
+        for index in range(8):
+            delivery.submit(server.url, {"title": f"task {index}"})
+        assert delivery.flush(timeout_seconds=5)
+    finally:
+        delivery.close()
+        server.close()
+
+    assert server.queue.qsize() == 8
+    assert server.stats.max_active <= 2
+
+
+def test_outbox_is_recovered_on_start(tmp_path: Path, test_logger) -> None:
+    outbox = tmp_path / "outbox"
+    unreachable = _delivery(outbox, test_logger, max_attempts=3, retry_base_seconds=30)
+    unreachable.submit("http://127.0.0.1:9/todo", {"title": "Ping"})
+    unreachable.close()
+    pending = list(outbox.glob("*.json"))
+    assert len(pending) == 1
+
+    # Point the persisted record at a live endpoint, as after the to-do service came back.
+    server = start_webhook_server()
+    record = json.loads(pending[0].read_text(encoding="utf-8"))
+    record["url"] = server.url
+    pending[0].write_text(json.dumps(record), encoding="utf-8")
+    delivery = _delivery(outbox, test_logger)
+    try:
+        assert delivery.flush(timeout_seconds=5)
+    finally:
+        delivery.close()
+        server.close()
+
+    assert json.loads(server.queue.get_nowait().body) == {"title": "Ping"}
+    assert list(outbox.glob("*.json")) == []
+
+
+@pytest.mark.parametrize(
+    "write_bad_record",
+    [
+        lambda path: path.write_text('{"url": "http://127.0.0.1:9/todo", "payl', encoding="utf-8"),
+        lambda path: path.write_text(json.dumps({"payload": {"title": "no url"}}), encoding="utf-8"),
+        lambda path: path.write_text(json.dumps(["not", "a", "record"]), encoding="utf-8"),
+        lambda path: path.mkdir(),
+    ],
+    ids=["truncated", "missing-key", "not-an-object", "unreadable"],
+)
+def test_corrupt_outbox_file_is_moved_aside(tmp_path: Path, test_logger, write_bad_record) -> None:
+    outbox = tmp_path / "outbox"
+    outbox.mkdir()
+    write_bad_record(outbox / "1-bad.json")
+    server = start_webhook_server()
+    (outbox / "2-good.json").write_text(json.dumps({"url": server.url, "payload": {"title": "Ping"}}), encoding="utf-8")
+    delivery = _delivery(outbox, test_logger)
+    try:
+        assert delivery.flush(timeout_seconds=5)
+    finally:
+        delivery.close()
+        server.close()
+
+    assert json.loads(server.queue.get_nowait().body) == {"title": "Ping"}
+    assert list(outbox.glob("*.json")) == []
+    assert [path.name for path in (outbox / "corrupt").iterdir()] == ["1-bad.json"]
+
+
+def test_stale_outbox_temp_files_are_removed(tmp_path: Path, test_logger) -> None:
+    outbox = tmp_path / "outbox"
+    outbox.mkdir()
+    # What a crash between writing and renaming in `_persist` leaves behind.
+    (outbox / "1-crashed.tmp").write_text('{"url": "http://127.0.0.1:9/todo"', encoding="utf-8")
+    delivery = _delivery(outbox, test_logger)
+    try:
+        assert delivery.flush(timeout_seconds=5)
+    finally:
+        delivery.close()
+
+    assert list(outbox.glob("*.tmp")) == []
+    assert list(outbox.glob("*.json")) == []
+
+
+def test_processing_does_not_wait_for_delivery(temp_config, test_logger, monkeypatch) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    mp3_file = temp_config.inbox_dir / "voice.mp3"
+    mp3_file.write_text("data", encoding="utf-8")
+
+    def fail_if_called(*_: object, **__: object) -> bool:
+        raise AssertionError("Synchronous webhook must not be used with a delivery subsystem.")
+
+    monkeypatch.setattr(app, "send_create_todo_webhook", fail_if_called)
+    server = start_webhook_server(latency_seconds=0.3)
+    monkeypatch.setenv("V2A_CREATE_TODO_WEBHOOK_URL", server.url)
+    delivery = _delivery(temp_config.work_dir / "outbox", test_logger)
+    try:
+        process_inbox_once(
+            temp_config,
+            test_logger,
+            lambda _: "call Sam",
+            set(),
+            lambda transcript: {"intent": "create-task", "content": transcript},
+            webhook_delivery=delivery,
+        )
+        assert not mp3_file.exists()
+        assert delivery.pending() == 1
+        assert delivery.flush(timeout_seconds=5)
+    finally:
+        delivery.close()
+        server.close()
+
+    assert json.loads(server.queue.get_nowait().body) == {"title": "call Sam"}
+
+
+def test_resumed_job_does_not_queue_its_webhook_twice(temp_config, test_logger, monkeypatch) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    mp3_file = temp_config.inbox_dir / "voice.mp3"
+    mp3_file.write_text("data", encoding="utf-8")
+    # The to-do service is down; every attempt is answered, then retried much later.
+    server = start_webhook_server(response_status=503)
+    monkeypatch.setenv("V2A_CREATE_TODO_WEBHOOK_URL", server.url)
+    outbox = temp_config.work_dir / "outbox"
+    key = journal_key(mp3_file)
+
+    class CrashingJournal(JobJournal):
+        # Stands in for a crash after the outbox write but before the journal entry.
+        def record(self, key: str, stage: str, data: dict[str, object] | None = None) -> None:
+            if stage == "webhook_queued":
+                raise OSError("crashed")
+            super().record(key, stage, data)
+
+    def run(run_journal: JobJournal) -> None:
+        delivery = _delivery(outbox, test_logger, retry_base_seconds=30, retry_max_seconds=30)
+        try:
+            process_inbox_once(
+                temp_config,
+                test_logger,
+                lambda _: "call Sam",
+                set(),
+                lambda transcript: {"intent": "create-task", "content": transcript},
+                journal=run_journal,
+                webhook_delivery=delivery,
+            )
+        finally:
+            delivery.close()
+
+    crashing = CrashingJournal(temp_config.work_dir / "jobs.sqlite3")
+    try:
+        run(crashing)
+    finally:
+        crashing.close()
+    assert mp3_file.exists()
+    assert len(list(outbox.glob("*.json"))) == 1
+    journal = JobJournal(temp_config.work_dir / "jobs.sqlite3")
+    try:
+        run(journal)
+        stages = journal.completed_stages(key)
+    finally:
+        journal.close()
+        server.close()
+
+    # One attempt per start: the resumed job found its payload already in the outbox and did not queue it again.
+    assert server.queue.qsize() == 2
+    assert len(list(outbox.glob("*.json"))) == 1
+    assert "webhook_queued" in stages
+    assert not mp3_file.exists()
+
+
+@pytest.mark.parametrize("attempt", [1, 2, 5, 10])
+def test_retry_delay_is_bounded_with_jitter(attempt: int) -> None:
+    ceiling = min(8.0, 0.5 * 2 ** (attempt - 1))
+    delay = webhook_retry_delay(attempt, 0.5, 8.0)
+    assert ceiling / 2 <= delay <= ceiling
+
+
+def test_batch_mode_posts_one_array_per_full_batch(tmp_path: Path, test_logger) -> None:
+    server = start_webhook_server()
+    delivery = _delivery(
+        tmp_path / "outbox", test_logger, batch_url=f"{server.url}/batch", batch_size=3, batch_window_seconds=30
+    )
+    try:
+        for index in range(3):
+            delivery.submit(f"{server.url}/todo", {"title": f"task {index}"}, source=f"note-{index}.mp3")
+        request = server.queue.get(timeout=5)
+        assert delivery.flush(timeout_seconds=5)
+    finally:
+        delivery.close()
+        server.close()
+
+    assert request.path == "/batch"
+    assert json.loads(request.body) == [{"title": f"task {index}"} for index in range(3)]
+    assert server.queue.empty()
+    assert list((tmp_path / "outbox").glob("*.json")) == []
+
+
+def test_batch_mode_sends_partial_batch_after_window(tmp_path: Path, test_logger) -> None:
+    server = start_webhook_server()
+    delivery = _delivery(
+        tmp_path / "outbox", test_logger, batch_url=server.url, batch_size=50, batch_window_seconds=0.05
+    )
+    try:
+        delivery.submit(server.url, {"title": "first"})
+        delivery.submit(server.url, {"title": "second"})
+        # No flush: the window alone must release the batch.
+        request = server.queue.get(timeout=5)
+        assert delivery.flush(timeout_seconds=5)
+    finally:
+        delivery.close()
+        server.close()
+
+    assert json.loads(request.body) == [{"title": "first"}, {"title": "second"}]
+
+
+def test_batch_item_results_map_back_to_source_files(tmp_path: Path, test_logger, caplog) -> None:
+    replies = iter(
+        [
+            [{"status": 201}, {"status": 400, "error": "title too long"}, {"status": 503}],
+            [{"status": 201}],
+        ]
+    )
+    bodies: list[list[dict]] = []
+
+    def responder(body: bytes) -> tuple[int, bytes]:
+        bodies.append(json.loads(body))
+        return 200, json.dumps(next(replies)).encode("utf-8")
+
+    server = start_webhook_server(responder=responder)
+    outbox = tmp_path / "outbox"
+    delivery = _delivery(outbox, test_logger, batch_url=server.url, batch_size=3, batch_window_seconds=30)
+    caplog.set_level("INFO")
+    try:
+        for name in ("a", "b", "c"):
+            delivery.submit(server.url, {"title": name}, source=f"{name}.mp3")
+        assert delivery.flush(timeout_seconds=5)
+    finally:
+        delivery.close()
+        server.close()
+
+    assert bodies == [[{"title": "a"}, {"title": "b"}, {"title": "c"}], [{"title": "c"}]]
+    failed = [json.loads(path.read_text(encoding="utf-8")) for path in (outbox / "failed").glob("*.json")]
+    assert [(record["source"], record["payload"]) for record in failed] == [("b.mp3", {"title": "b"})]
+    assert list(outbox.glob("*.json")) == []
+    assert any(
+        "b.mp3" in record.message and "title too long" in record.message for record in caplog.records
+    )
+
+
+def test_parse_batch_webhook_results_falls_back_to_http_status() -> None:
+    assert parse_batch_webhook_results(b"", 2, 202) == [(202, ""), (202, "")]
+    assert parse_batch_webhook_results(b'[{"status": 201}]', 2, 200) == [(200, ""), (200, "")]
+    assert parse_batch_webhook_results(b'[{"status": 409, "error": "dup"}, {}]', 2, 200) == [
+        (409, "dup"),
+        (200, ""),
+    ]
+
+
+def test_get_create_todo_batch_webhook_url() -> None:
+    assert get_create_todo_batch_webhook_url({CREATE_TODO_BATCH_WEBHOOK_ENV: " "}) is None
+    assert get_create_todo_batch_webhook_url({CREATE_TODO_BATCH_WEBHOOK_ENV: "https://x/batch"}) == "https://x/batch"
+    with pytest.raises(ValueError):
+        get_create_todo_batch_webhook_url({CREATE_TODO_BATCH_WEBHOOK_ENV: "ftp://x"})
+
+
+def test_processing_uses_batch_url_without_single_url(temp_config, test_logger, monkeypatch) -> None:
+    temp_config.inbox_dir.mkdir(parents=True, exist_ok=True)
+    temp_config.processed_dir.mkdir(parents=True, exist_ok=True)
+    for name in ("one.mp3", "two.mp3"):
+        (temp_config.inbox_dir / name).write_text(name, encoding="utf-8")
+    server = start_webhook_server()
+    monkeypatch.delenv("V2A_CREATE_TODO_WEBHOOK_URL", raising=False)
+    monkeypatch.setenv(CREATE_TODO_BATCH_WEBHOOK_ENV, f"{server.url}/batch")
+    delivery = _delivery(
+        temp_config.work_dir / "outbox",
+        test_logger,
+        batch_url=f"{server.url}/batch",
+        batch_size=2,
+        batch_window_seconds=30,
+    )
+    try:
+        process_inbox_once(
+            temp_config,
+            test_logger,
+            lambda path: f"call {path.stem}",
+            set(),
+            lambda transcript: {"intent": "create-task", "content": transcript},
+            webhook_delivery=delivery,
+        )
+        assert delivery.flush(timeout_seconds=5)
+    finally:
+        delivery.close()
+        server.close()
+
+    request = server.queue.get_nowait()
+    assert json.loads(request.body) == [{"title": "call one"}, {"title": "call two"}]
+    assert server.queue.empty()
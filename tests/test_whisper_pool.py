@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from app import WHISPER_PROCESSES_ENV, WhisperProcessPool, get_whisper_process_count
+from tests.helpers.fake_whisper import load_echo_model, load_failing_model
+
+
+def test_pool_transcribes_and_reports_per_worker_throughput(tmp_path: Path, test_logger) -> None:
+    pool = WhisperProcessPool(2, threads_per_worker=1, model_loader=load_echo_model, logger=test_logger)
+    try:
+        futures = [pool.submit(tmp_path / f"note-{index}.mp3") for index in range(6)]
+        texts = [future.result(timeout=30) for future in futures]
+        stats = pool.worker_stats()
+    finally:
+        pool.close()
+
+    assert texts == [f"note-{index}" for index in range(6)]
+    assert [entry.worker_id for entry in stats] == [0, 1]
+    assert sum(entry.files for entry in stats) == 6
+    assert all(entry.files_per_minute > 0 for entry in stats if entry.files)
+
+
+def test_pool_propagates_transcription_errors(tmp_path: Path, test_logger) -> None:
+    pool = WhisperProcessPool(1, threads_per_worker=1, model_loader=load_echo_model, logger=test_logger)
+    try:
+        with pytest.raises(RuntimeError, match="cannot decode"):
+            pool.transcribe(tmp_path / "fail-1.mp3")
+        assert pool.transcribe(tmp_path / "ok.mp3") == "ok"
+    finally:
+        pool.close()
+
+
+def test_pool_fails_the_job_of_a_killed_worker_and_replaces_it(tmp_path: Path, test_logger) -> None:
+    # A single worker, so everything after the crash has to run on its replacement.
+    pool = WhisperProcessPool(1, threads_per_worker=1, model_loader=load_echo_model, logger=test_logger)
+    try:
+        crashed = pool.submit(tmp_path / "crash-1.mp3")
+        queued = [pool.submit(tmp_path / f"note-{index}.mp3") for index in range(3)]
+        with pytest.raises(RuntimeError, match="exited with code"):
+            crashed.result(timeout=30)
+        texts = [future.result(timeout=30) for future in queued]
+        texts.append(pool.transcribe(tmp_path / "after.mp3"))
+        stats = pool.worker_stats()
+    finally:
+        pool.close()
+
+    assert texts == ["note-0", "note-1", "note-2", "after"]
+    assert stats[0].files == 4
+
+def test_pool_raises_when_model_load_fails(test_logger) -> None:
+    with pytest.raises(RuntimeError, match="failed to load model"):
+        WhisperProcessPool(1, threads_per_worker=1, model_loader=load_failing_model, logger=test_logger)
+
+
+def test_get_whisper_process_count() -> None:
+    assert get_whisper_process_count({}) == 0
+    assert get_whisper_process_count({WHISPER_PROCESSES_ENV: "4"}) == 4
+    with pytest.raises(ValueError):
+        get_whisper_process_count({WHISPER_PROCESSES_ENV: "-1"})